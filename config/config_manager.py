@@ -41,6 +41,15 @@ class ConfigManager:
         exchange = self.get_exchange()
         return exchange.get('trading_fee', 0)
 
+    def use_ws_trade_api(self) -> bool:
+        # 是否通过 WebSocket 交易通道下单/撤单
+        exchange = self.get_exchange()
+        return exchange.get('use_ws_trade_api', False)
+
+    def get_ws_trade_timeout(self) -> float:
+        exchange = self.get_exchange()
+        return exchange.get('ws_trade_timeout_secs', 5.0)
+
     def get_instrument_type(self) ->str:
         return self.config.get('instrument_type', 'spot')
     def get_trading_mode(self) -> Optional[TradingMode]:
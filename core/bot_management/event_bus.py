@@ -1,5 +1,6 @@
-import logging, asyncio, inspect
-from typing import Callable, Dict, List, Any, Awaitable, Union
+import logging, asyncio, inspect, time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Any, Awaitable, Optional, Tuple, Union
 
 class Events:
     """
@@ -19,6 +20,11 @@ class EventBus:
     A simple event bus for managing pub-sub interactions with support for both sync and async publishing.
     """
 
+    # Capacity of the queue backing publish_nowait.
+    QUEUE_MAXSIZE = 1024
+    # Number of recently published events kept in history.
+    HISTORY_MAXLEN = 1000
+
     def __init__(self):
         """
         Initializes the EventBus with an empty subscriber list.
@@ -26,6 +32,12 @@ class EventBus:
         self.logger = logging.getLogger(self.__class__.__name__)
         self.subscribers: Dict[str, List[Callable[[Any], None]]] = {}
         self._tasks: set[asyncio.Task] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        # Most recent (timestamp, event_type) entries from all publish methods; payloads are not kept
+        # so history does not pin orders and balances in memory. The oldest entry is evicted once full.
+        self.history: Deque[Tuple[float, str]] = deque(maxlen=self.HISTORY_MAXLEN)
+        # Number of publish_nowait calls that found the queue full and were published synchronously.
+        self.queue_overflows = 0
 
     def subscribe(
         self, 
@@ -60,6 +72,7 @@ class EventBus:
             self.logger.warning(f"No subscribers for event: {event_type}")
             return
 
+        self.history.append((time.time(), event_type))
         self.logger.info(f"Publishing async event: {event_type} with data: {data}")
         tasks = [
             self._safe_invoke_async(callback, data) if asyncio.iscoroutinefunction(callback) 
@@ -81,6 +94,7 @@ class EventBus:
         Publishes an event synchronously to all subscribers.
         """
         if event_type in self.subscribers:
+            self.history.append((time.time(), event_type))
             self.logger.info(f"Publishing sync event: {event_type} with data: {data}")
             loop = asyncio.get_event_loop()
             for callback in self.subscribers[event_type]:
@@ -89,6 +103,49 @@ class EventBus:
                 else:
                     self._safe_invoke_sync(callback, data)
 
+    def publish_nowait(
+        self,
+        event_type: str,
+        data: Any
+    ) -> None:
+        """
+        Enqueues an event without blocking the caller. A single worker task dispatches queued
+        events to subscribers in publish order; async callbacks are started in that order
+        but may complete out of order. Falls back to publish_sync when the queue is full.
+        """
+        if event_type not in self.subscribers:
+            return
+
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.QUEUE_MAXSIZE)
+            worker = asyncio.create_task(self._dispatch_queued_events(self._queue))
+            self._tasks.add(worker)
+
+        try:
+            self._queue.put_nowait((event_type, data))
+            self.history.append((time.time(), event_type))
+        except asyncio.QueueFull:
+            self.queue_overflows += 1
+            self.logger.warning(f"Event queue full, publishing {event_type} synchronously.")
+            self.publish_sync(event_type, data)
+
+    async def _dispatch_queued_events(self, queue: asyncio.Queue) -> None:
+        """
+        Consumes events enqueued by publish_nowait and invokes their subscribers.
+        Async callbacks run as their own tasks so a slow subscriber does not hold up the queue.
+        """
+        while True:
+            event_type, data = await queue.get()
+            try:
+                self.logger.debug(f"Dispatching queued event: {event_type}")
+                for callback in self.subscribers.get(event_type, ()):
+                    if asyncio.iscoroutinefunction(callback):
+                        await self._safe_invoke_async(callback, data)
+                    else:
+                        self._safe_invoke_sync(callback, data)
+            finally:
+                queue.task_done()
+
     async def _safe_invoke_async(
         self, 
         callback: Callable[[Any], None], 
@@ -140,4 +197,5 @@ class EventBus:
             task.cancel()
         await asyncio.gather(*self._tasks, return_exceptions=True)
         self._tasks.clear()
+        self._queue = None
         self.logger.info("EventBus shutdown complete.")
\ No newline at end of file
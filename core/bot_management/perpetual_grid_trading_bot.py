@@ -176,6 +176,8 @@ class PerpetualGridTradingBot:
                 initial_margin=self.config_manager.get_initial_balance(),
                 exchange_service=self.exchange_service
             )
+            # 订阅余额和持仓推送（回测模式下不生效）
+            self.balance_tracker.start_account_stream(self.exchange_service)
 
             # 启动订单状态追踪
             self.order_status_tracker.start_tracking()
@@ -230,6 +232,8 @@ class PerpetualGridTradingBot:
         try:
             # 停止订单状态追踪
             await self.order_status_tracker.stop_tracking()
+            # 停止余额和持仓推送订阅
+            await self.balance_tracker.stop_account_stream()
             # 停止策略执行
             await self.strategy.stop()
             self.is_running = False
@@ -254,6 +258,7 @@ class PerpetualGridTradingBot:
         try:
             # 重新启动订单状态追踪
             self.order_status_tracker.start_tracking()
+            self.balance_tracker.start_account_stream(self.exchange_service)
             # 重启策略
             await self.strategy.restart()
 
@@ -0,0 +1,22 @@
+"""
+网格下单数量计算内核。
+
+与 PerpetualGridManager.get_order_size_for_grid_level 的公式一致，抽成不依赖 self 的自由函数，
+安装 numba 时会被编译为机器码。
+数量按精度向下取整并与最小下单金额比较，结果必须与纯 Python 版本逐位一致，因此不开启 fastmath。
+"""
+
+import math
+from utils.jit import njit
+
+
+@njit(cache=True)
+def compute_order_quantity(total_margin: float, price: float, num_levels: int, leverage: float, margin_ratio: float, min_order_value: float, amount_precision: float) -> float:
+    # 每个网格分配的保证金 * 杠杆 / 价格，再扣除维持保证金部分
+    quantity = (total_margin / num_levels) * leverage / price * (1.0 - margin_ratio)
+    if amount_precision > 0.0:
+        quantity = math.floor(quantity / amount_precision) * amount_precision
+    # 名义价值不足最小下单金额时返回 0
+    if quantity * price < min_order_value:
+        return 0.0
+    return quantity
@@ -1,12 +1,23 @@
 import logging
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 from config.config_manager import ConfigManager
 from strategies.strategy_type import StrategyType
 from strategies.spacing_type import SpacingType
 from core.grid_management.grid_level import GridLevel, GridCycleState
+from core.grid_management._grid_fast import compute_order_quantity
 from core.order_handling.perpetual_order import PerpetualOrder, PerpetualOrderSide
 
+# (策略类型, 订单方向) -> 允许挂单的网格状态
+_PLACEABLE_STATES = {
+    # 对于 SIMPLE_GRID 策略，买入订单要求状态为 READY_TO_BUY，卖出订单要求状态为 READY_TO_SELL
+    (StrategyType.SIMPLE_GRID, PerpetualOrderSide.BUY_OPEN): frozenset({GridCycleState.READY_TO_BUY}),
+    (StrategyType.SIMPLE_GRID, PerpetualOrderSide.BUY_CLOSE): frozenset({GridCycleState.READY_TO_SELL}),
+    # 对于 HEDGED_GRID 策略，还允许 READY_TO_BUY_OR_SELL 状态
+    (StrategyType.HEDGED_GRID, PerpetualOrderSide.BUY_OPEN): frozenset({GridCycleState.READY_TO_BUY, GridCycleState.READY_TO_BUY_OR_SELL}),
+    (StrategyType.HEDGED_GRID, PerpetualOrderSide.BUY_CLOSE): frozenset({GridCycleState.READY_TO_SELL, GridCycleState.READY_TO_BUY_OR_SELL}),
+}
+
 
 class PerpetualGridManager:
     def __init__(
@@ -31,7 +42,17 @@ class PerpetualGridManager:
         self.reversion_price: float = 0.0
         self.sorted_buy_grids: List[float] = []
         self.sorted_sell_grids: List[float] = []
+        # 与 sorted_buy_grids / sorted_sell_grids 一一对应的 (价格, 网格级别) 列表
+        self.sorted_buy_grid_pairs: List[Tuple[float, GridLevel]] = []
+        self.sorted_sell_grid_pairs: List[Tuple[float, GridLevel]] = []
+        # sorted_buy_grids / sorted_sell_grids 的 float64 数组，用于 np.searchsorted 定位当前价
+        self.sorted_buy_grids_np: np.ndarray = np.empty(0, dtype=np.float64)
+        self.sorted_sell_grids_np: np.ndarray = np.empty(0, dtype=np.float64)
+        # 全部网格价格的升序 float64 数组，回测时用于判断K线是否经过任一网格
+        self.sorted_price_grids_np: np.ndarray = np.empty(0, dtype=np.float64)
         self.grid_levels: dict[float, GridLevel] = {}
+        # 卖出网格 -> 其正下方的网格，作为卖单成交后回补买单的默认配对
+        self.paired_buy_for_sell: Dict[GridLevel, GridLevel] = {}
         self.max_placed_orders: int = max_placed_orders
         self.initialize_grids_and_levels()
 
@@ -202,16 +223,8 @@ class PerpetualGridManager:
         返回:
             计算出的合约数量
         """
-        # 计算该网格可分配的保证金
-        margin_per_grid = total_margin / len(self.grid_levels)
-        
-        # 计算最大可开仓数量（考虑杠杆）
-        max_position_size = (margin_per_grid * self.leverage) / current_price
-        
-        # 考虑维持保证金要求
-        safe_position_size = max_position_size * (1 - self.margin_ratio)
-        
-        return safe_position_size
+        # 每格保证金 * 杠杆 / 价格，并扣除维持保证金部分
+        return compute_order_quantity(float(total_margin), float(current_price), len(self.grid_levels), float(self.leverage), float(self.margin_ratio), 0.0, 0.0)
 
     def get_initial_order_quantity(
         self,
@@ -358,6 +371,16 @@ class PerpetualGridManager:
                 )
                 for price in self.price_grids
             }
+        self.sorted_buy_grid_pairs = [(price, self.grid_levels[price]) for price in self.sorted_buy_grids]
+        self.sorted_sell_grid_pairs = [(price, self.grid_levels[price]) for price in self.sorted_sell_grids]
+        self.sorted_buy_grids_np = np.asarray(self.sorted_buy_grids, dtype=np.float64)
+        self.sorted_sell_grids_np = np.asarray(self.sorted_sell_grids, dtype=np.float64)
+        self.sorted_price_grids_np = np.sort(np.asarray(self.price_grids, dtype=np.float64))
+
+        # 预先计算每个网格正下方的网格，避免成交时重复排序查找
+        sorted_levels = [self.grid_levels[price] for price in sorted(self.grid_levels)]
+        self.paired_buy_for_sell = dict(zip(sorted_levels[1:], sorted_levels[:-1]))
+
         # 记录初始化信息
         self.logger.info(f"Grids and levels initialized. Central price: {self.central_price}")
         self.logger.info(f"Price grids: {self.price_grids}")
@@ -489,22 +512,45 @@ class PerpetualGridManager:
         返回:
             bool: 如果可以放置订单则为 True，否则为 False。
         """
-        if self.strategy_type == StrategyType.SIMPLE_GRID:
-            # 对于 SIMPLE_GRID 策略，买入订单要求状态为 READY_TO_BUY
-            if order_side == PerpetualOrderSide.BUY_OPEN:
-                return grid_level.state == GridCycleState.READY_TO_BUY
-            elif order_side == PerpetualOrderSide.BUY_CLOSE:
-                # 对于 SIMPLE_GRID 策略，卖出订单要求状态为 READY_TO_SELL
-                return grid_level.state == GridCycleState.READY_TO_SELL
-        elif self.strategy_type == StrategyType.HEDGED_GRID:
-            if order_side == PerpetualOrderSide.BUY_OPEN:
-                # 对于 HEDGED_GRID 策略，买入订单要求状态为 READY_TO_BUY 或 READY_TO_BUY_OR_SELL
-                return grid_level.state in {GridCycleState.READY_TO_BUY, GridCycleState.READY_TO_BUY_OR_SELL}
-            elif order_side == PerpetualOrderSide.BUY_CLOSE:
-                # 对于 HEDGED_GRID 策略，卖出订单要求状态为 READY_TO_SELL 或 READY_TO_BUY_OR_SELL
-                return grid_level.state in {GridCycleState.READY_TO_SELL, GridCycleState.READY_TO_BUY_OR_SELL}
+        return grid_level.state in _PLACEABLE_STATES.get((self.strategy_type, order_side), ())
+
+    def eligible_levels(
+        self,
+        order_side: PerpetualOrderSide,
+        below: Optional[float] = None,
+        above: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[float, GridLevel]]:
+        """
+        返回可以挂单的 (价格, 网格级别) 列表，按距离当前价由近到远排列。
+
+        BUY_OPEN 从买入网格中选取价格低于 below 的网格，BUY_CLOSE 从卖出网格中选取价格高于 above 的网格，
+        未指定价格边界时遍历该方向的全部网格。
+
+        参数:
+            order_side: 订单方向。
+            below: 买单的价格上界（不含）。
+            above: 卖单的价格下界（不含）。
+            limit: 最多返回的网格数量，为 None 时不限制。
+
+        返回:
+            List[Tuple[float, GridLevel]]: 满足挂单条件的网格。
+        """
+        allowed_states = _PLACEABLE_STATES.get((self.strategy_type, order_side), ())
+        if order_side == PerpetualOrderSide.BUY_OPEN:
+            cutoff = len(self.sorted_buy_grid_pairs) if below is None else int(np.searchsorted(self.sorted_buy_grids_np, below, side='left'))
+            candidates = reversed(self.sorted_buy_grid_pairs[:cutoff])
         else:
-            return False
+            cutoff = 0 if above is None else int(np.searchsorted(self.sorted_sell_grids_np, above, side='right'))
+            candidates = self.sorted_sell_grid_pairs[cutoff:]
+
+        eligible: List[Tuple[float, GridLevel]] = []
+        for price, grid_level in candidates:
+            if grid_level.state in allowed_states:
+                eligible.append((price, grid_level))
+                if limit is not None and len(eligible) >= limit:
+                    break
+        return eligible
 
     def mark_order_pending(
         self,
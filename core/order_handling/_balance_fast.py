@@ -0,0 +1,21 @@
+"""
+保证金计算的标量内核。
+
+回测时每根K线都会调用保证金率检查，这里把纯浮点运算抽成不依赖 self 的自由函数，
+安装 numba 时会被编译为机器码。
+"""
+
+from utils.jit import njit
+
+
+@njit(cache=True)
+def _margin_ratio_scalar(long_position: float, short_position: float, margin_balance: float, unrealized_pnl: float, price: float) -> float:
+    total_position_value = (long_position + short_position) * price
+    if total_position_value == 0.0:
+        return float('inf')
+    return (margin_balance + unrealized_pnl) / total_position_value
+
+
+@njit(cache=True)
+def _meets_margin_requirement(long_position: float, short_position: float, margin_balance: float, unrealized_pnl: float, price: float, maintenance_margin_ratio: float) -> bool:
+    return _margin_ratio_scalar(long_position, short_position, margin_balance, unrealized_pnl, price) >= maintenance_margin_ratio
@@ -1,6 +1,17 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Union
 from core.order_handling.perpetual_order import PerpetualOrder, PerpetualOrderSide
+from core.services.exceptions import UnsupportedExchangeError
+
+
+class BatchOrderRequest(NamedTuple):
+    """批量限价单中的单个下单请求"""
+    side: PerpetualOrderSide
+    pair: str
+    amount: float
+    price: float
+
 
 class OrderExecutionStrategyInterface(ABC):
     @abstractmethod
@@ -23,6 +34,35 @@ class OrderExecutionStrategyInterface(ABC):
     ) -> Optional[PerpetualOrder]:
         pass
 
+    # 不支持批量接口时并发逐个下单的最大并发数，避免触发交易所限频
+    MAX_CONCURRENT_ORDERS = 20
+
+    async def execute_batch_limit_orders(
+        self,
+        requests: List[BatchOrderRequest]
+    ) -> List[Union[PerpetualOrder, BaseException, None]]:
+        """
+        批量提交限价单，返回结果与 requests 一一对应：成功为订单，失败为对应的异常。
+
+        默认实现逐个调用 execute_limit_order 并发提交（最多 MAX_CONCURRENT_ORDERS 个同时进行），
+        支持批量接口的执行策略应覆盖此方法。
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_ORDERS)
+        results: List[Union[PerpetualOrder, BaseException, None]] = [None] * len(requests)
+
+        async def execute(index: int, request: BatchOrderRequest) -> None:
+            # 单笔下单失败只记录到对应结果中，不影响同组其他订单；外部取消时整组一起取消
+            async with semaphore:
+                try:
+                    results[index] = await self.execute_limit_order(request.side, request.pair, request.amount, request.price)
+                except Exception as e:
+                    results[index] = e
+
+        async with asyncio.TaskGroup() as task_group:
+            for index, request in enumerate(requests):
+                task_group.create_task(execute(index, request))
+        return results
+
     @abstractmethod
     async def get_order(
         self, 
@@ -31,10 +71,34 @@ class OrderExecutionStrategyInterface(ABC):
     ) -> Optional[PerpetualOrder]:
         pass
 
+    async def get_open_orders(self, pair: str) -> List[PerpetualOrder]:
+        """
+        一次性获取交易对的全部未成交订单。
+
+        默认不支持批量查询，抛出 UnsupportedExchangeError，调用方应退回到逐个 get_order。
+        """
+        raise UnsupportedExchangeError(f"{self.__class__.__name__} does not support fetching open orders in bulk")
+
+    async def get_positions(self, pairs: List[str]) -> List[Dict[str, Any]]:
+        """
+        一次性获取多个交易对的持仓快照（ccxt 持仓结构）。
+
+        默认不支持，抛出 UnsupportedExchangeError。
+        """
+        raise UnsupportedExchangeError(f"{self.__class__.__name__} does not support fetching positions")
+
+    async def watch_orders(self, pair: str) -> List[PerpetualOrder]:
+        """
+        等待交易所推送下一批订单状态更新。
+
+        默认不支持推送，抛出 UnsupportedExchangeError，调用方应退回到 get_order 轮询。
+        """
+        raise UnsupportedExchangeError(f"{self.__class__.__name__} does not support order streams")
+
     @abstractmethod
     async def get_funding_rate(self, pair: str) -> float:
         pass
 
     @abstractmethod
     async def cancel_order(self, order: PerpetualOrder):
-        pass
\ No newline at end of file
+        pass
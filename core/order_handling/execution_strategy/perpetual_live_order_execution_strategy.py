@@ -1,9 +1,10 @@
-import logging, asyncio
-from typing import Optional
+import logging, asyncio, time
+from functools import partial
+from typing import Optional, Dict, List, Set, Tuple, Union
 from enum import Enum
 from core.services.exchange_interface import ExchangeInterface
-from core.services.exceptions import DataFetchError
-from .order_execution_strategy_interface import OrderExecutionStrategyInterface
+from core.services.exceptions import DataFetchError, UnsupportedExchangeError
+from .order_execution_strategy_interface import OrderExecutionStrategyInterface, BatchOrderRequest
 from ..exceptions import OrderExecutionFailedError
 from ..perpetual_order import PerpetualOrderSide, PerpetualOrder, PerpetualOrderType, MarginType, PerpetualOrderStatus
 
@@ -16,7 +17,33 @@ class MarginMode(Enum):
     ISOLATED = "isolated"
     CROSS = "cross"
 
+    @classmethod
+    def _missing_(cls, value):
+        # 配置文件中全仓写作 "crossed"
+        if isinstance(value, str) and value.lower() == "crossed":
+            return cls.CROSS
+        return None
+
+# 订单方向 -> 滑点调整方向（买单上调价格，卖单下调价格）
+# SELL_CLOSE / BUY_CLOSE 分别是 BUY_OPEN / SELL_OPEN 的别名，两个键即覆盖全部方向
+_SLIPPAGE_SIGN = {
+    PerpetualOrderSide.BUY_OPEN: 1.0,
+    PerpetualOrderSide.SELL_OPEN: -1.0,
+}
+
+# 订单方向 -> 仓位方向
+_POSITION_SIDE = {
+    PerpetualOrderSide.BUY_OPEN: PositionSide.LONG,
+    PerpetualOrderSide.SELL_OPEN: PositionSide.SHORT,
+}
+
 class PerpetualLiveOrderExecutionStrategy(OrderExecutionStrategyInterface):
+    # 标记价格缓存有效期（秒），重试期间复用同一标记价格以节省交易所请求权重
+    MARK_PRICE_CACHE_TTL = 0.2
+
+    # 单次批量下单的最大订单数（OKX batch-orders 接口上限为 20）
+    BATCH_ORDER_LIMIT = 20
+
     def __init__(
         self, 
         exchange_service: ExchangeInterface, 
@@ -31,8 +58,16 @@ class PerpetualLiveOrderExecutionStrategy(OrderExecutionStrategyInterface):
         self.retry_delay = retry_delay
         self.max_slippage = max_slippage
         self.leverage = leverage
-        self.margin_mode = margin_mode
+        # 配置文件中的保证金模式为字符串，统一转换为枚举
+        self.margin_mode = MarginMode(margin_mode)
         self.logger = logging.getLogger(self.__class__.__name__)
+        # 已按 leverage、margin_mode 完成设置的交易对；设置只在首次下单前执行一次，锁保证并发下单时只发送一次设置请求
+        self._configured_pairs: Set[str] = set()
+        self._configure_lock = asyncio.Lock()
+        self._mark_price_cache: Dict[str, Tuple[float, float]] = {}
+        self._mark_price_inflight: Dict[str, asyncio.Task] = {}
+        # 每个交易对的限价单请求模板，只包含不随订单变化的字段
+        self._limit_order_templates: Dict[str, dict] = {}
 
     async def execute_market_order(
         self, 
@@ -62,6 +97,8 @@ class PerpetualLiveOrderExecutionStrategy(OrderExecutionStrategyInterface):
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1} failed with error: {str(e)}")
                 await asyncio.sleep(self.retry_delay)
+                # 下一次重试以标记价格为基准，并按重试次数放宽滑点
+                price = await self._adjust_price(order_side, price, attempt + 1, pair)
 
         raise OrderExecutionFailedError("Failed to execute Perpetual Market order after maximum retries.",
                                         order_side, PerpetualOrderType.MARKET, pair, amount, price)
@@ -96,6 +133,117 @@ class PerpetualLiveOrderExecutionStrategy(OrderExecutionStrategyInterface):
             raise OrderExecutionFailedError(f"Unexpected error during perpetual order execution: {e}",
                                             order_side, PerpetualOrderType.LIMIT, pair, amount, price)
 
+    async def execute_batch_limit_orders(
+        self,
+        requests: List[BatchOrderRequest]
+    ) -> List[Union[PerpetualOrder, BaseException, None]]:
+        """
+        通过交易所批量下单接口提交限价单，按 BATCH_ORDER_LIMIT 分批，各批并发发送。
+        交易所不支持批量下单时退回到逐个并发下单。
+
+        参数:
+            requests: 批量下单请求列表。
+        返回:
+            与 requests 一一对应的结果：成功为订单，失败为 OrderExecutionFailedError。
+        """
+        if not self.exchange_service.supports_batch_orders():
+            return await super().execute_batch_limit_orders(requests)
+
+        limit = self.BATCH_ORDER_LIMIT
+        chunks = [requests[i:i + limit] for i in range(0, len(requests), limit)]
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [task_group.create_task(self._execute_limit_order_chunk(chunk)) for chunk in chunks]
+        return [result for task in tasks for result in task.result()]
+
+    def _limit_order_body(self, request: BatchOrderRequest) -> dict:
+        """基于交易对的缓存模板生成批量下单请求体，只填入方向、数量和价格。"""
+        template = self._limit_order_templates.get(request.pair)
+        if template is None:
+            template = self._limit_order_templates[request.pair] = {'symbol': request.pair, 'type': PerpetualOrderType.LIMIT.value}
+        return template | {'side': request.side.value, 'amount': request.amount, 'price': request.price}
+
+    async def _execute_limit_order_chunk(
+        self,
+        requests: List[BatchOrderRequest]
+    ) -> List[Union[PerpetualOrder, BaseException]]:
+        """提交一批限价单，整批失败时每个请求都返回同一错误信息。"""
+        try:
+            raw_orders = await self.exchange_service.place_orders([self._limit_order_body(request) for request in requests])
+        except DataFetchError as e:
+            self.logger.error(f"DataFetchError during perpetual batch order execution - {e}")
+            return [
+                OrderExecutionFailedError(f"Failed to execute Perpetual Limit order on {request.pair}: {e}",
+                                          request.side, PerpetualOrderType.LIMIT, request.pair, request.amount, request.price)
+                for request in requests
+            ]
+
+        results: List[Union[PerpetualOrder, BaseException]] = []
+        for request, raw_order in zip(requests, raw_orders):
+            # 批量接口中单笔订单被拒绝时不会抛出异常，而是返回没有 id 的结果
+            if not raw_order.get("id"):
+                info = raw_order.get("info") or {}
+                results.append(OrderExecutionFailedError(f"Perpetual Limit order rejected on {request.pair}: {info.get('sMsg', info)}",
+                                                         request.side, PerpetualOrderType.LIMIT, request.pair, request.amount, request.price))
+                continue
+            # 订单已被交易所接受，解析响应出错也不能当作下单失败，否则调用方会重复下单；此时只用请求和 id 构建订单
+            try:
+                results.append(self._order_from_batch_response(request, raw_order))
+            except Exception as e:
+                self.logger.warning(f"Failed to parse batch order response for order {raw_order['id']}, using request fields: {e}")
+                results.append(self._order_from_batch_response(request, {"id": raw_order["id"]}))
+        return results
+
+    def _order_from_batch_response(
+        self,
+        request: BatchOrderRequest,
+        raw_order: dict
+    ) -> PerpetualOrder:
+        """
+        由批量下单请求和交易所返回的订单 id 构建订单对象。
+
+        批量接口的单笔结果通常只有 id（如 OKX 只返回 ordId/sCode/sMsg），方向、交易对、数量和价格以请求为准，
+        响应中带有的字段才覆盖请求中的值；无法识别的状态按未成交处理。
+        """
+        def present(key: str, default):
+            value = raw_order.get(key)
+            return default if value is None else value
+
+        try:
+            status = PerpetualOrderStatus(raw_order.get("status") or PerpetualOrderStatus.OPEN.value)
+        except ValueError:
+            status = PerpetualOrderStatus.OPEN
+        info = raw_order.get("info") or {}
+        filled = float(present("filled", 0.0))
+        amount = float(present("amount", request.amount))
+        return PerpetualOrder(
+            identifier=raw_order["id"],
+            status=status,
+            order_type=PerpetualOrderType.LIMIT,
+            side=request.side,
+            price=float(present("price", request.price)),
+            average=raw_order.get("average"),
+            amount=amount,
+            filled=filled,
+            remaining=float(present("remaining", amount - filled)),
+            timestamp=int(present("timestamp", 0)),
+            datetime=raw_order.get("datetime"),
+            last_trade_timestamp=raw_order.get("lastTradeTimestamp"),
+            symbol=present("symbol", request.pair),
+            time_in_force=raw_order.get("timeInForce"),
+            trades=present("trades", []),
+            fee=raw_order.get("fee"),
+            cost=raw_order.get("cost"),
+            contracts=0.0,
+            contract_size=0.0,
+            leverage=0.0,
+            margin_type=MarginType.CROSS,
+            position_side=PositionSide.LONG,
+            info={
+                "leverage": info.get("lever"),
+                "marginMode": info.get("tdMode"),
+            }
+        )
+
     async def get_order(
         self, 
         order_id: str,
@@ -112,6 +260,18 @@ class PerpetualLiveOrderExecutionStrategy(OrderExecutionStrategyInterface):
         except Exception as e:
             raise DataFetchError(f"Unexpected error during perpetual order status retrieval: {str(e)}")
 
+    async def get_open_orders(self, pair: str) -> List[PerpetualOrder]:
+        """一次请求获取交易对的全部未成交订单"""
+        raw_orders = await self.exchange_service.fetch_open_orders(pair)
+        return [await self._parse_order_result(raw_order) for raw_order in raw_orders]
+
+    async def watch_orders(self, pair: str) -> List[PerpetualOrder]:
+        """等待交易所推送下一批订单更新并解析为订单对象，交易所不支持推送时抛出 UnsupportedExchangeError"""
+        if not self.exchange_service.supports_order_stream():
+            raise UnsupportedExchangeError(f"Order stream is not supported for {pair}")
+        raw_orders = await self.exchange_service.watch_orders(pair)
+        return [await self._parse_order_result(raw_order) for raw_order in raw_orders]
+
     def parse_order_status(self, raw_order_result: dict) -> PerpetualOrder:
         status = PerpetualOrderStatus.OPEN
         if raw_order_result.get("status") == "closed":
@@ -182,23 +342,60 @@ class PerpetualLiveOrderExecutionStrategy(OrderExecutionStrategyInterface):
             }
         )
 
+    async def _fetch_mark_price(
+        self,
+        pair: str
+    ) -> float:
+        """
+        获取标记价格，带短时缓存与并发请求合并。
+
+        缓存未过期时直接返回缓存值；已有同一交易对的请求在进行中时等待该请求结果，
+        避免突发重试时重复请求交易所。
+        """
+        cached = self._mark_price_cache.get(pair)
+        if cached is not None and time.monotonic() - cached[1] < self.MARK_PRICE_CACHE_TTL:
+            return cached[0]
+
+        # 请求在独立任务中进行，所有调用方通过 shield 等待；某个调用方被取消时请求继续，其余调用方不受影响
+        inflight = self._mark_price_inflight.get(pair)
+        if inflight is None:
+            inflight = asyncio.create_task(self._request_mark_price(pair))
+            self._mark_price_inflight[pair] = inflight
+            inflight.add_done_callback(partial(self._on_mark_price_done, pair))
+        return await asyncio.shield(inflight)
+
+    async def _request_mark_price(self, pair: str) -> float:
+        """向交易所请求标记价格并写入缓存"""
+        mark_price = await self.exchange_service.get_mark_price(pair)
+        self._mark_price_cache[pair] = (mark_price, time.monotonic())
+        return mark_price
+
+    def _on_mark_price_done(self, pair: str, task: asyncio.Task) -> None:
+        """标记价格请求结束后移除进行中的记录"""
+        self._mark_price_inflight.pop(pair, None)
+        # 等待者都已取消时读取一次异常，避免输出 "Task exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
     async def _adjust_price(
         self, 
         order_side: PerpetualOrderSide,
         price: float, 
-        attempt: int
+        attempt: int,
+        pair: str
     ) -> float:
         """调整永续合约订单价格，考虑标记价格。"""
         try:
             # 获取标记价格，如果可用的话
-            mark_price = await self.exchange_service.fetch_mark_price()
+            mark_price = await self._fetch_mark_price(pair)
             if mark_price:
                 price = mark_price
-        except:
-            pass  # 如果无法获取标记价格，使用原始价格
+        except Exception as e:
+            # 如果无法获取标记价格，使用原始价格
+            self.logger.warning(f"Failed to fetch mark price for {pair}, keeping price {price}: {e}")
             
         adjustment = self.max_slippage / self.max_retries * attempt
-        return price * (1 + adjustment) if order_side == PerpetualOrderSide.BUY_OPEN else price * (1 - adjustment)
+        return price * (1 + _SLIPPAGE_SIGN[order_side] * adjustment)
     
     async def _handle_partial_fill(
         self, 
@@ -237,23 +434,32 @@ class PerpetualLiveOrderExecutionStrategy(OrderExecutionStrategyInterface):
         self,
         pair: str
     ) -> None:
-        """设置永续合约的杠杆和保证金模式。"""
-        try:
-            await self.exchange_service.set_leverage(self.leverage, pair)
-            await self.exchange_service.set_margin_mode(self.margin_mode.value, pair)
-        except Exception as e:
-            self.logger.error(f"Failed to setup leverage and margin mode: {str(e)}")
-            raise
+        """设置永续合约的杠杆和保证金模式，每个交易对只向交易所设置一次，失败时下次调用再重试。"""
+        if pair in self._configured_pairs:
+            return
+        async with self._configure_lock:
+            if pair in self._configured_pairs:
+                return
+            try:
+                await self.exchange_service.set_leverage(pair, self.leverage)
+                await self.exchange_service.set_margin_type(pair, self.margin_mode.value, self.leverage)
+            except Exception as e:
+                self.logger.error(f"Failed to setup leverage and margin mode: {str(e)}")
+                raise
+            self._configured_pairs.add(pair)
 
     def _determine_position_side(
         self,
         order_side: PerpetualOrderSide,
     ) -> PositionSide:
         """根据订单方向确定仓位方向。"""
-        return PositionSide.LONG if order_side == PerpetualOrderSide.BUY_OPEN else PositionSide.SHORT
+        return _POSITION_SIDE[order_side]
 
     async def get_funding_rate(self, pair: str)->float:
         return await self.exchange_service.get_funding_rate(pair)
 
+    async def get_positions(self, pairs: List[str]) -> List[Dict]:
+        return await self.exchange_service.get_positions(pairs)
+
     async def cancel_order(self, order: PerpetualOrder):
         await self._retry_cancel_order(order.identifier, order.symbol)
\ No newline at end of file
@@ -1,8 +1,10 @@
+import asyncio
 import logging
 from decimal import Decimal
 from typing import Optional
 from config.trading_mode import TradingMode
 from .fee_calculator import FeeCalculator
+from ._balance_fast import _margin_ratio_scalar, _meets_margin_requirement
 from core.order_handling.perpetual_order import PerpetualOrder, PerpetualOrderSide, PerpetualOrderStatus
 from core.bot_management.event_bus import EventBus, Events
 from ..validation.exceptions import InsufficientBalanceError, InsufficientMarginError
@@ -46,6 +48,7 @@ class PerpetualBalanceTracker:
         # 余额相关
         self.margin_balance: float = 0.0  # 保证金余额（USDT）
         self.reserved_margin: float = 0.0  # 已冻结的保证金
+        self.locked_margin: float = 0.0  # 实盘中交易所已占用的保证金（总余额 - 可用余额），回测中为 0
         self.total_fees: float = 0.0  # 累计手续费
 
         # 持仓相关
@@ -54,9 +57,13 @@ class PerpetualBalanceTracker:
         self.long_avg_price: float = 0.0  # 多头平均持仓价格
         self.short_avg_price: float = 0.0  # 空头平均持仓价格
         self.unrealized_pnl: float = 0.0  # 未实现盈亏
+        self._unrealized_pnl_by_side: dict[str, float] = {}  # 持仓推送中各方向的未实现盈亏，合计即 unrealized_pnl
         self.realized_pnl: float = 0.0  # 已实现盈亏
         self.funding_fees: float = 0.0  # 累计资金费用
 
+        # 实盘模式下由交易所推送更新余额和持仓的后台任务
+        self._account_stream_tasks: list[asyncio.Task] = []
+
         # 订阅事件
         self.event_bus.subscribe(Events.ORDER_FILLED, self._update_balance_on_order_completion)
         self.event_bus.subscribe(Events.FUNDING_FEE_CHARGED, self._handle_funding_fee)
@@ -83,6 +90,7 @@ class PerpetualBalanceTracker:
             self.long_avg_price = balances['long_avg_price']
             self.short_avg_price = balances['short_avg_price']
             self.unrealized_pnl = balances['unrealized_pnl']
+            self.locked_margin = balances['locked_margin']
 
     async def _fetch_live_balances(self, exchange_service: ExchangeInterface) -> dict:
         """
@@ -100,7 +108,8 @@ class PerpetualBalanceTracker:
             'short_position': 0.0,
             'long_avg_price': 0.0,
             'short_avg_price': 0.0,
-            'unrealized_pnl': 0.0
+            'unrealized_pnl': 0.0,
+            'locked_margin': 0.0
         }
         
         # 获取余额信息
@@ -111,6 +120,10 @@ class PerpetualBalanceTracker:
         # 获取保证金余额
         usdt_balance = balances['free'].get('USDT', 0.0)  # 如果没有USDT键，默认值为0.0
         result['margin_balance'] = float(usdt_balance)
+        # 持仓和挂单占用的保证金不在可用余额中，计算账户总价值时需要加回
+        usdt_total = (balances.get('total') or {}).get('USDT')
+        if usdt_total is not None:
+            result['locked_margin'] = max(float(usdt_total) - result['margin_balance'], 0.0)
         
         # 获取持仓信息
         symbol = self.base_currency + '/' + self.quote_currency + ':' + self.quote_currency
@@ -120,21 +133,123 @@ class PerpetualBalanceTracker:
         position_size = 0.0
         # 查找当前交易对的持仓
         if position['symbol'] == symbol:
-            position_size = abs(float(position.get('contracts', 0)))
-            if not position.get('unrealizedPnl'):
-                result['unrealized_pnl'] = 0.0
-
-            # 判断多空方向并设置相应的持仓信息
-            if position.get('side') == 'long' or float(position.get('contracts', 0)) > 0:
-                result['long_position'] = position_size
-                result['long_avg_price'] = float(position.get('entryPrice', 0))
-            elif position.get('side') == 'short' or float(position.get('contracts', 0)) < 0:
-                result['short_position'] = position_size
-                result['short_avg_price'] = float(position.get('entryPrice', 0))
+            position_size = abs(float(position.get('contracts') or 0))
+            result.update(self._parse_position(position))
 
         self.logger.info(f"合约账户余额 - 可用保证金: {result['margin_balance']}, 持仓量: {position_size}")
         return result
 
+    def _parse_position(self, position: dict) -> dict:
+        """
+        从交易所持仓数据中解析多空持仓数量和均价。
+
+        参数:
+            position: ccxt 格式的持仓数据。
+
+        返回:
+            dict: 包含 long_position、short_position、long_avg_price、short_avg_price 的字典。
+        """
+        fields = {'long_position': 0.0, 'short_position': 0.0, 'long_avg_price': 0.0, 'short_avg_price': 0.0}
+        contracts = float(position.get('contracts') or 0)
+        side = position.get('side')
+        # 判断多空方向并设置相应的持仓信息，ccxt 的 contracts 恒为正数，有 side 时以 side 为准
+        if side == 'long' or (side is None and contracts > 0):
+            fields['long_position'] = abs(contracts)
+            fields['long_avg_price'] = float(position.get('entryPrice') or 0)
+        elif side == 'short' or (side is None and contracts < 0):
+            fields['short_position'] = abs(contracts)
+            fields['short_avg_price'] = float(position.get('entryPrice') or 0)
+        return fields
+
+    def start_account_stream(self, exchange_service: ExchangeInterface) -> None:
+        """
+        实盘/模拟盘模式下订阅交易所的余额和持仓推送，收到推送后直接更新内存中的余额和持仓，
+        下单路径读取余额时无需再请求交易所。回测模式下不做任何事。
+
+        参数:
+            exchange_service: 交易所接口实例。
+        """
+        if self.trading_mode == TradingMode.BACKTEST:
+            return
+        if self._account_stream_running():
+            self.logger.warning("Account stream is already running.")
+            return
+
+        self._account_stream_tasks = [
+            asyncio.create_task(self._watch_balance_updates(exchange_service)),
+            asyncio.create_task(self._watch_position_updates(exchange_service)),
+        ]
+        self.logger.info("Started account balance and position stream.")
+
+    def _account_stream_running(self) -> bool:
+        """余额和持仓推送是否正在运行，运行时推送是持仓和保证金余额的唯一来源"""
+        return any(not task.done() for task in self._account_stream_tasks)
+
+    async def stop_account_stream(self) -> None:
+        """停止余额和持仓推送订阅"""
+        for task in self._account_stream_tasks:
+            task.cancel()
+        for task in self._account_stream_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._account_stream_tasks = []
+
+    async def _watch_balance_updates(self, exchange_service: ExchangeInterface) -> None:
+        """持续接收余额推送并更新保证金余额"""
+        while True:
+            try:
+                balances = await exchange_service.watch_balance()
+                # 推送中可能只包含发生变化的币种，没有保证金币种时保留原值
+                free = balances.get('free') or {}
+                if free.get(self.quote_currency) is not None:
+                    self.margin_balance = float(free[self.quote_currency])
+                    total = (balances.get('total') or {}).get(self.quote_currency)
+                    if total is not None:
+                        self.locked_margin = max(float(total) - self.margin_balance, 0.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Error while watching balance updates: %s. Retrying in 5 seconds.", e)
+                await asyncio.sleep(5)
+
+    async def _watch_position_updates(self, exchange_service: ExchangeInterface) -> None:
+        """持续接收持仓推送并更新多空持仓"""
+        symbol = self.base_currency + '/' + self.quote_currency + ':' + self.quote_currency
+        while True:
+            try:
+                positions = await exchange_service.watch_positions([symbol])
+                for position in positions:
+                    if position.get('symbol') == symbol:
+                        self._apply_position_update(position)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Error while watching position updates: %s. Retrying in 5 seconds.", e)
+                await asyncio.sleep(5)
+
+    def _apply_position_update(self, position: dict) -> None:
+        """
+        用一条持仓推送更新内存中的持仓。
+
+        双向持仓模式下多空分别推送，带 side 的推送只更新对应方向的数量、均价和未实现盈亏；
+        单向持仓模式下没有 side 时同时更新多空两个方向。
+
+        参数:
+            position: ccxt 格式的持仓数据。
+        """
+        fields = self._parse_position(position)
+        side = position.get('side')
+        sides = (side,) if side in ('long', 'short') else ('long', 'short')
+        pnl = float(position.get('unrealizedPnl') or 0.0)
+        for index, position_side in enumerate(sides):
+            setattr(self, f'{position_side}_position', fields[f'{position_side}_position'])
+            setattr(self, f'{position_side}_avg_price', fields[f'{position_side}_avg_price'])
+            # 单向持仓时未实现盈亏只计入一次
+            self._unrealized_pnl_by_side[position_side] = pnl if index == 0 else 0.0
+        self.unrealized_pnl = sum(self._unrealized_pnl_by_side.values())
+
     def _calculate_required_margin(self, quantity: float, price: float) -> float:
         """
         计算开仓所需的保证金。
@@ -205,6 +320,9 @@ class PerpetualBalanceTracker:
         返回:
             float: 当前保证金率。
         """
+        if self.trading_mode == TradingMode.BACKTEST:
+            return _margin_ratio_scalar(float(self.long_position), float(self.short_position), float(self.margin_balance), float(self.unrealized_pnl), float(current_price))
+
         total_position_value = (self.long_position + self.short_position) * current_price
         if total_position_value == 0:
             return float('inf')
@@ -220,6 +338,11 @@ class PerpetualBalanceTracker:
         返回:
             bool: 是否满足保证金要求。
         """
+        if self.trading_mode == TradingMode.BACKTEST:
+            return _meets_margin_requirement(
+                float(self.long_position), float(self.short_position), float(self.margin_balance), float(self.unrealized_pnl), float(current_price), float(self.maintenance_margin_ratio)
+            )
+
         margin_ratio = self.get_margin_ratio(current_price)
         return margin_ratio >= self.maintenance_margin_ratio
 
@@ -242,6 +365,9 @@ class PerpetualBalanceTracker:
         """
         订单完成时更新余额和持仓。
 
+        余额和持仓推送运行时，交易所推送的持仓和余额已包含这笔成交及其手续费，
+        只释放预留保证金并统计手续费，不再在本地重复记账。
+
         参数:
             order: 已完成的订单对象。
         """
@@ -250,7 +376,11 @@ class PerpetualBalanceTracker:
 
         # 计算订单所需的保证金
         required_margin = self._calculate_required_margin(order.filled, order.price)
-        
+
+        if self._account_stream_running():
+            self.reserved_margin = max(self.reserved_margin - required_margin, 0)
+            return
+
         if order.side == PerpetualOrderSide.BUY_OPEN:  # 开多或平空
             if self.short_position > 0:  # 平空
                 self._handle_close_position(order, PerpetualOrderSide.SELL_OPEN)
@@ -322,13 +452,19 @@ class PerpetualBalanceTracker:
         """
         fee = fee_data.get('amount', 0)
         self.funding_fees += fee
+        # 余额推送运行时资金费用已体现在推送的余额中
+        if self._account_stream_running():
+            return
         self.margin_balance -= fee
         self.logger.info(f"Funding fee applied: {fee} USDT. New margin balance: {self.margin_balance} USDT")
 
 
     def get_total_balance_value(self, price: float) -> float:
         """
-        计算以法币计的账户总价值，包括预留资金。
+        计算以法币计的账户总价值，即保证金余额、交易所已占用的保证金与按给定价格计算的多空未实现盈亏之和。
+
+        回测中预留保证金本身就包含在保证金余额中，locked_margin 为 0；实盘中保证金余额是交易所的可用余额，
+        持仓和挂单占用的部分记在 locked_margin 中。
 
         参数:
             price: 加密货币的当前市场价格。
@@ -336,25 +472,29 @@ class PerpetualBalanceTracker:
         返回:
             float: 以法币计的账户总价值。
         """
-        return 0.0
+        long_pnl = self.long_position * (price - self.long_avg_price)
+        short_pnl = self.short_position * (self.short_avg_price - price)
+        return self.margin_balance + self.locked_margin + long_pnl + short_pnl
 
     def update_after_initial_purchase(self, initial_order):
         pass
 
     def get_adjusted_fiat_balance(self) -> float:
         """
-        返回包括预留资金在内的总法币余额。
+        返回扣除持仓开仓成本后的法币余额：保证金余额 + 已占用保证金 - 多头持仓成本 + 空头开仓所得。
+
+        与 get_adjusted_crypto_balance 配合使用时，法币余额 + 净持仓 * 价格 等于 get_total_balance_value(价格)。
 
         返回:
-            float: 总法币余额。
+            float: 调整后的法币余额。
         """
-        return 0.0
+        return self.margin_balance + self.locked_margin - self.long_position * self.long_avg_price + self.short_position * self.short_avg_price
 
     def get_adjusted_crypto_balance(self) -> float:
         """
-        返回包括预留资金在内的总加密货币余额。
+        返回净持仓数量（多头持仓 - 空头持仓）。
 
         返回:
-            float: 总加密货币余额。
+            float: 净持仓数量，空头多于多头时为负数。
         """
-        return 0.0
\ No newline at end of file
+        return self.long_position - self.short_position
@@ -51,6 +51,14 @@ class PositionSide(Enum):
 class PerpetualOrder:
     """永续合约订单类"""
 
+    # amount 为只读计算属性，setter 写入的原始值保存在 _amount
+    __slots__ = (
+        'identifier', 'status', 'order_type', 'side', '_amount', 'price', 'average', 'contracts', 'contract_size',
+        'filled', 'remaining', 'timestamp', 'datetime', 'last_trade_timestamp', 'symbol', 'time_in_force',
+        'leverage', 'margin_type', 'position_side', 'reduce_only', 'stop_price', 'activation_price',
+        'callback_rate', 'trades', 'fee', 'cost', 'info',
+    )
+
     def __init__(
             self,
             identifier: str,
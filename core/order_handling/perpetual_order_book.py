@@ -1,29 +1,81 @@
+import sys
+import numpy as np
 from typing import List, Dict, Optional, Tuple
 from .perpetual_order import PerpetualOrder, PerpetualOrderSide, PerpetualOrderStatus, PerpetualOrderType
 from ..grid_management.grid_level import GridLevel
 
 """永续合约U本位订单簿管理类，负责维护所有合约订单及其与网格层级的关联"""
 
+# 条件订单类型（止损、止盈、跟踪止损）
+_CONDITIONAL_TYPES = frozenset({
+    PerpetualOrderType.STOP_MARKET,
+    PerpetualOrderType.STOP_LIMIT,
+    PerpetualOrderType.TAKE_PROFIT_MARKET,
+    PerpetualOrderType.TAKE_PROFIT_LIMIT,
+    PerpetualOrderType.TRAILING_STOP,
+})
+
+# 订单方向 -> 订单簿中存放该方向订单的属性名
+# 注意：SELL_CLOSE 与 BUY_OPEN、BUY_CLOSE 与 SELL_OPEN 取值相同，是同一个枚举成员，
+# 因此只有两个键，与原有 if/else 分支的实际行为一致
+_SIDE_BUCKET = {
+    PerpetualOrderSide.BUY_OPEN: 'long_open',
+    PerpetualOrderSide.SELL_OPEN: 'short_open',
+}
+
 class PerpetualOrderBook:
+    # 订单簿只在事件循环线程中访问，所有修改方法都是不含 await 的同步代码，
+    # 并发的协程无法在一次写入中途交错执行，因此不需要任何锁，add_order 等写入不会相互阻塞
+    __slots__ = (
+        'long_open', 'long_close', 'short_open', 'short_close',
+        'long_open_with_grid', 'long_close_with_grid', 'short_open_with_grid', 'short_close_with_grid',
+        'conditional_orders', 'order_to_grid_map', 'non_grid_orders', 'orders_by_id',
+        '_open_orders', '_filled_orders', '_side_lists', '_side_lists_with_grid', '_filled_arrays',
+    )
+
     def __init__(self):
         # 按持仓方向和操作类型分类存储订单
-        self.long_orders: Dict[str, List[PerpetualOrder]] = {
-            'open': [],   # 开多仓订单
-            'close': []    # 平多仓订单
-        }
-        self.short_orders: Dict[str, List[PerpetualOrder]] = {
-            'open': [],   # 开空仓订单
-            'close': []    # 平空仓订单
-        }
+        self.long_open: List[PerpetualOrder] = []    # 开多仓订单
+        self.long_close: List[PerpetualOrder] = []   # 平多仓订单
+        self.short_open: List[PerpetualOrder] = []   # 开空仓订单
+        self.short_close: List[PerpetualOrder] = []  # 平空仓订单
         
+        # 与上面各分类一一对应的 (订单, 网格层级) 列表，在 add_order 时写入
+        self.long_open_with_grid: List[Tuple[PerpetualOrder, Optional[GridLevel]]] = []
+        self.long_close_with_grid: List[Tuple[PerpetualOrder, Optional[GridLevel]]] = []
+        self.short_open_with_grid: List[Tuple[PerpetualOrder, Optional[GridLevel]]] = []
+        self.short_close_with_grid: List[Tuple[PerpetualOrder, Optional[GridLevel]]] = []
+
         # 条件订单（如止损、止盈等）
         self.conditional_orders: List[PerpetualOrder] = []
         
-        # 网格订单映射关系
+        # 网格订单映射关系（以订单ID为键，避免对订单对象本身做哈希并长期持有其引用）
         self.order_to_grid_map: Dict[str, GridLevel] = {}
         
         # 未关联网格的独立订单（如止盈/止损单）
         self.non_grid_orders: List[PerpetualOrder] = []
+
+        # 订单ID索引，用于按ID直接定位订单
+        self.orders_by_id: Dict[str, PerpetualOrder] = {}
+
+        # 未成交/已成交订单，在写入时维护，查询时无需遍历全部订单；
+        # 用值为 None 的字典代替集合，查询结果保持订单入簿的先后顺序
+        self._open_orders: Dict[PerpetualOrder, None] = {}
+        self._filled_orders: Dict[PerpetualOrder, None] = {}
+
+        # 按方向查询订单时使用的列表映射（BUY_CLOSE 与 SELL_OPEN 为同一枚举成员，
+        # 与原 if/elif 判断顺序一致，落在平多列表）
+        self._side_lists: Dict[PerpetualOrderSide, List[PerpetualOrder]] = {
+            PerpetualOrderSide.BUY_OPEN: self.long_open,
+            PerpetualOrderSide.BUY_CLOSE: self.long_close,
+        }
+        self._side_lists_with_grid: Dict[PerpetualOrderSide, List[Tuple[PerpetualOrder, Optional[GridLevel]]]] = {
+            PerpetualOrderSide.BUY_OPEN: self.long_open_with_grid,
+            PerpetualOrderSide.BUY_CLOSE: self.long_close_with_grid,
+        }
+
+        # 按方向缓存的已成交订单 (数量, 价格, 手续费) 数组，订单入簿、状态更新或移除时清空
+        self._filled_arrays: Dict[PerpetualOrderSide, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
     
     def add_order(
         self,
@@ -37,23 +89,48 @@ class PerpetualOrderBook:
             grid_level: 可选参数，该订单关联的网格层级（None表示非网格订单）
         """
         # 根据订单类型和方向分类存储
-        if order.order_type in [PerpetualOrderType.STOP_MARKET, PerpetualOrderType.STOP_LIMIT,
-                         PerpetualOrderType.TAKE_PROFIT_MARKET, PerpetualOrderType.TAKE_PROFIT_LIMIT,
-                         PerpetualOrderType.TRAILING_STOP]:
+        if order.order_type in _CONDITIONAL_TYPES:
             self.conditional_orders.append(order)
         else:
-            if order.side in [PerpetualOrderSide.BUY_OPEN, PerpetualOrderSide.SELL_CLOSE]:
-                target_list = self.long_orders['open'] if order.side == PerpetualOrderSide.BUY_OPEN \
-                    else self.long_orders['close']
-                target_list.append(order)
-            else:  # OPEN_SHORT or CLOSE_LONG
-                target_list = self.short_orders['open'] if order.side == PerpetualOrderSide.SELL_OPEN \
-                    else self.short_orders['close']
-                target_list.append(order)
-        
+            bucket = _SIDE_BUCKET[order.side]
+            getattr(self, bucket).append(order)
+            getattr(self, f"{bucket}_with_grid").append((order, grid_level))
+
+        self._index_order(order, grid_level)
+
+    def add_orders(self, orders_with_grid: List[Tuple[PerpetualOrder, Optional[GridLevel]]]) -> None:
+        """批量添加订单到订单簿（用于网格初始化等一次性提交多笔订单的场景）
+
+        同一分类的订单先分组，再通过一次 extend 写入，目标列表只需扩容一次。
+
+        参数:
+            orders_with_grid: (订单, 网格层级) 列表，网格层级为None表示非网格订单
+        """
+        conditional_orders: List[PerpetualOrder] = []
+        bucket_entries: Dict[str, List[Tuple[PerpetualOrder, Optional[GridLevel]]]] = {}
+        for order, grid_level in orders_with_grid:
+            if order.order_type in _CONDITIONAL_TYPES:
+                conditional_orders.append(order)
+            else:
+                bucket_entries.setdefault(_SIDE_BUCKET[order.side], []).append((order, grid_level))
+            self._index_order(order, grid_level)
+
+        self.conditional_orders.extend(conditional_orders)
+        for bucket, entries in bucket_entries.items():
+            getattr(self, bucket).extend([order for order, _ in entries])
+            getattr(self, f"{bucket}_with_grid").extend(entries)
+
+    def _index_order(self, order: PerpetualOrder, grid_level: Optional[GridLevel]) -> None:
+        """登记订单ID索引、未成交/已成交订单以及网格关联"""
+        # 驻留订单ID，订单对象、ID索引与网格映射共用同一个字符串对象，键比较可直接按指针命中
+        order_id = order.identifier = sys.intern(order.identifier)
+        self.orders_by_id[order_id] = order
+        self._track_status(order)
+        self._filled_arrays.clear()
+
         # 处理网格关联逻辑
         if grid_level:
-            self.order_to_grid_map[order.identifier] = grid_level
+            self.order_to_grid_map[order_id] = grid_level
         else:
             self.non_grid_orders.append(order)
     
@@ -65,15 +142,32 @@ class PerpetualOrderBook:
         返回值:
             符合指定方向的订单列表
         """
-        if side == PerpetualOrderSide.BUY_OPEN:
-            return self.long_orders['open']
-        elif side == PerpetualOrderSide.BUY_CLOSE:
-            return self.long_orders['close']
-        elif side == PerpetualOrderSide.SELL_OPEN:
-            return self.short_orders['open']
-        else:  # CLOSE_SHORT
-            return self.short_orders['close']
+        return self._side_lists[side]
     
+    def filled_arrays(self, side: PerpetualOrderSide) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """获取指定方向已成交订单的数量、价格和手续费数组
+
+        数组按订单列表顺序在首次查询时构建并缓存（只读），订单入簿、状态更新或移除后重新构建。
+
+        参数:
+            side: 订单方向（与 get_orders_by_side 的取值一致）
+        返回值:
+            (数量, 价格, 手续费) 三个等长的 float64 数组，无手续费信息的订单记为 0
+        """
+        arrays = self._filled_arrays.get(side)
+        if arrays is None:
+            filled = [order for order in self._side_lists[side] if order.is_filled()]
+            count = len(filled)
+            arrays = (
+                np.fromiter((order.amount for order in filled), dtype=np.float64, count=count),
+                np.fromiter((order.price for order in filled), dtype=np.float64, count=count),
+                np.fromiter(((order.fee or {}).get('cost', 0.0) for order in filled), dtype=np.float64, count=count),
+            )
+            for array in arrays:
+                array.flags.writeable = False
+            self._filled_arrays[side] = arrays
+        return arrays
+
     def get_conditional_orders(self) -> List[PerpetualOrder]:
         """获取所有条件订单（止损、止盈等）"""
         return self.conditional_orders
@@ -86,28 +180,15 @@ class PerpetualOrderBook:
         返回值:
             订单和对应网格层级的元组列表
         """
-        orders = self.get_orders_by_side(side)
-        return [(order, self.order_to_grid_map.get(order.identifier)) for order in orders]
+        return self._side_lists_with_grid[side]
     
     def get_open_orders(self) -> List[PerpetualOrder]:
         """获取所有未成交订单（包括所有方向）"""
-        all_orders = []
-        for orders in self.long_orders.values():
-            all_orders.extend([order for order in orders if order.is_open()])
-        for orders in self.short_orders.values():
-            all_orders.extend([order for order in orders if order.is_open()])
-        all_orders.extend([order for order in self.conditional_orders if order.is_open()])
-        return all_orders
+        return list(self._open_orders)
     
     def get_completed_orders(self) -> List[PerpetualOrder]:
         """获取所有已成交订单（包括所有方向）"""
-        all_orders = []
-        for orders in self.long_orders.values():
-            all_orders.extend([order for order in orders if order.is_filled()])
-        for orders in self.short_orders.values():
-            all_orders.extend([order for order in orders if order.is_filled()])
-        all_orders.extend([order for order in self.conditional_orders if order.is_filled()])
-        return all_orders
+        return list(self._filled_orders)
     
     def get_grid_level_for_order(self, order: PerpetualOrder) -> Optional[GridLevel]:
         """查询订单对应的网格层级（返回None表示非网格订单）"""
@@ -124,32 +205,71 @@ class PerpetualOrderBook:
             order_id: 需要更新的订单ID
             new_status: 新状态（如FILLED/CANCELED/LIQUIDATED等）
         """
-        # 遍历所有可能的订单列表
-        all_orders = []
-        for orders in self.long_orders.values():
-            all_orders.extend(orders)
-        for orders in self.short_orders.values():
-            all_orders.extend(orders)
-        all_orders.extend(self.conditional_orders)
-        
-        # 查找并更新匹配的订单
-        for order in all_orders:
-            if order.identifier == order_id:
-                order.status = new_status
-                break
+        order_id = sys.intern(order_id)
+        order = self.orders_by_id.get(order_id)
+        if order is None:
+            # 索引未命中时（如订单ID在入簿后被改写）退回逐个分类查找，原地遍历不复制列表
+            order = self._find_order(order_id)
+            if order is None:
+                return
+            self.orders_by_id[order_id] = order
+
+        order.status = new_status
+        self._open_orders.pop(order, None)
+        self._filled_orders.pop(order, None)
+        self._track_status(order)
+        self._filled_arrays.clear()
+
+    def _find_order(self, order_id: str) -> Optional[PerpetualOrder]:
+        """在各订单分类中按ID查找订单，找到第一个即返回"""
+        for bucket in (self.long_open, self.long_close, self.short_open, self.short_close, self.conditional_orders):
+            for order in bucket:
+                if order.identifier == order_id:
+                    return order
+        return None
+
+    def _track_status(self, order: PerpetualOrder) -> None:
+        """根据订单当前状态将其放入未成交/已成交订单"""
+        if order.is_open():
+            self._open_orders[order] = None
+        elif order.is_filled():
+            self._filled_orders[order] = None
+
+    def remove_order(self, order_id: str) -> Optional[PerpetualOrder]:
+        """从订单簿中移除订单，并同步清理索引和网格映射
+
+        参数:
+            order_id: 需要移除的订单ID
+        返回值:
+            被移除的订单对象，订单不存在时返回None
+        """
+        order = self.orders_by_id.pop(order_id, None)
+        if order is None:
+            return None
+
+        for orders in (self.long_open, self.long_close, self.short_open, self.short_close, self.conditional_orders, self.non_grid_orders):
+            if order in orders:
+                orders.remove(order)
+        for orders_with_grid in (self.long_open_with_grid, self.long_close_with_grid, self.short_open_with_grid, self.short_close_with_grid):
+            orders_with_grid[:] = [entry for entry in orders_with_grid if entry[0] is not order]
+        self.order_to_grid_map.pop(order_id, None)
+        self._open_orders.pop(order, None)
+        self._filled_orders.pop(order, None)
+        self._filled_arrays.clear()
+        return order
 
     def get_all_buy_orders(self) -> List[PerpetualOrder]:
         """获取全部买单（不区分网格订单）"""
-        return self.long_orders['open']
+        return self.long_open
 
     def get_all_sell_orders(self) -> List[PerpetualOrder]:
         """获取全部卖单（不区分网格订单）"""
-        return self.long_orders['close']
+        return self.long_close
 
     def get_buy_orders_with_grid(self) -> List[Tuple[PerpetualOrder, Optional[GridLevel]]]:
         """获取带网格信息的买单列表（返回格式：订单对象 + 关联的网格层级）"""
-        return [(order, self.order_to_grid_map.get(order.identifier, None)) for order in self.long_orders['open']]
+        return self.long_open_with_grid
 
     def get_sell_orders_with_grid(self) -> List[Tuple[PerpetualOrder, Optional[GridLevel]]]:
         """获取带网格信息的卖单列表（返回格式：订单对象 + 关联的网格层级）"""
-        return [(order, self.order_to_grid_map.get(order.identifier, None)) for order in self.long_orders['close']]
\ No newline at end of file
+        return self.long_close_with_grid
\ No newline at end of file
@@ -1,10 +1,11 @@
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+import asyncio
 import logging
 from config.trading_mode import TradingMode
 from core.bot_management.notification.notification_content import NotificationType
 from core.bot_management.notification.notification_handler import NotificationHandler
 from core.order_handling.exceptions import OrderExecutionFailedError
-from core.order_handling.execution_strategy.order_execution_strategy_interface import OrderExecutionStrategyInterface
+from core.order_handling.execution_strategy.order_execution_strategy_interface import OrderExecutionStrategyInterface, BatchOrderRequest
 from core.order_handling.perpetual_order import PerpetualOrder, PerpetualOrderSide, PerpetualOrderType, \
     PerpetualOrderStatus
 from core.order_handling.perpetual_order_book import PerpetualOrderBook
@@ -16,10 +17,46 @@ from core.bot_management.event_bus import EventBus, Events
 from core.services.perpetual_exchange_service import PerpetualExchangeService
 from strategies.strategy_type import StrategyType
 
+# 网格挂单方向 -> 日志及网格配对中使用的名称
+_GRID_ORDER_LABELS = {
+    PerpetualOrderSide.BUY_OPEN: "buy",
+    PerpetualOrderSide.BUY_CLOSE: "sell",
+}
+
+# 减仓时按持仓方向选择的下单方向：平多卖出、平空买入
+# （SELL_CLOSE / BUY_CLOSE 是 BUY_OPEN / SELL_OPEN 的别名，这里按提交给交易所的买卖方向取值）
+_REDUCE_SIDES = {
+    True: PerpetualOrderSide.SELL_OPEN,
+    False: PerpetualOrderSide.BUY_OPEN,
+}
+
+# 按网格挂单方向预先定义的日志模板，参数在日志实际输出时才格式化
+_LOG_TEMPLATES = {
+    PerpetualOrderSide.BUY_OPEN: {
+        'completed': "Buy order completed at grid level %s.",
+        'max_limit': "Place buy order for %s reach max limit %s.",
+        'placing_initial': "Placing initial buy limit order at grid level %s for %s %s.",
+    },
+    PerpetualOrderSide.BUY_CLOSE: {
+        'completed': "Sell order completed at grid level %s.",
+        'max_limit': "Place buy close order for %s reach max limit %s.",
+        'placing_initial': "Placing initial sell limit order at grid level %s for %s %s.",
+    },
+}
+
 
 class PerpetualOrderManager:
     """永续合约U本位订单管理器，负责处理合约订单的创建、执行和状态跟踪"""
 
+    # 一次批量减仓最多包含的仓位数，超出时分组依次提交
+    MAX_REDUCE_BATCH = 50
+
+    __slots__ = (
+        'logger', 'grid_manager', 'order_validator', 'balance_tracker', 'order_book', 'event_bus',
+        'order_execution_strategy', 'notification_handler', 'trading_mode', 'trading_pair', 'strategy_type',
+        'exchange_service', 'min_order_value', '_amount_precision', '_pending_placed', '_filled_handlers',
+    )
+
     def __init__(
             self,
             grid_manager: PerpetualGridManager,
@@ -63,6 +100,17 @@ class PerpetualOrderManager:
         self.strategy_type: StrategyType = strategy_type  # 策略类型
         self.exchange_service = exchange_service
         self.min_order_value = min_order_value
+        # 交易所数量精度，exchange_service.initialize() 之后才可用，首次使用时读取并缓存
+        self._amount_precision: Optional[float] = None
+
+        # 待发送的挂单通知，一次处理流程结束后合并为一条发送
+        self._pending_placed: List[str] = []
+
+        # 成交订单按方向分发的处理函数，其他方向的成交不做网格处理
+        self._filled_handlers = {
+            PerpetualOrderSide.BUY_OPEN: self._handle_buy_order_completion,
+            PerpetualOrderSide.BUY_CLOSE: self._handle_sell_order_completion,
+        }
 
         # 订阅订单状态变更事件
         self.event_bus.subscribe(Events.ORDER_FILLED, self._on_order_filled)
@@ -78,26 +126,44 @@ class PerpetualOrderManager:
         Args:
             order: The filled Order instance.
         """
+        handler = self._filled_handlers.get(order.side)
+        if handler is None:
+            return
+
         try:
             grid_level = self.order_book.get_grid_level_for_order(order)
 
             if not grid_level:  # 非网格订单不处理
                 self.logger.warning(
-                    f"Could not handle Order completion - No grid level found for the given filled order {order}")
+                    "Could not handle Order completion - No grid level found for the given filled order %s", order)
                 return
 
-            await self._handle_order_completion(order, grid_level)
+            # 根据买卖方向处理成交
+            await handler(order, grid_level)
 
         except OrderExecutionFailedError as e:
-            self.logger.error(f"Failed while handling filled order - {str(e)}", exc_info=True)
+            self.logger.error("Failed while handling filled order - %s", e, exc_info=True)
             await self.notification_handler.async_send_notification(NotificationType.ORDER_FAILED,
                                                                     error_details=f"Failed handling filled order. {e}")
 
         except Exception as e:
-            self.logger.error(f"Error while handling filled order {order.identifier}: {e}", exc_info=True)
+            self.logger.error("Error while handling filled order %s: %s", order.identifier, e, exc_info=True)
             await self.notification_handler.async_send_notification(NotificationType.ORDER_FAILED,
                                                                     error_details=f"Failed handling filled order. {e}")
 
+        finally:
+            await self._flush_placed_notifications()
+
+    async def _flush_placed_notifications(self) -> None:
+        """
+        将缓存的挂单信息合并为一条 ORDER_PLACED 通知发送。
+        """
+        if not self._pending_placed:
+            return
+        order_details = "\n".join(self._pending_placed)
+        self._pending_placed.clear()
+        await self.notification_handler.async_send_notification(NotificationType.ORDER_PLACED, order_details=order_details)
+
     async def _on_order_cancelled(
             self,
             order: PerpetualOrder
@@ -112,25 +178,6 @@ class PerpetualOrderManager:
         await self.notification_handler.async_send_notification(NotificationType.ORDER_CANCELLED,
                                                                 order_details=str(order))
 
-    async def _handle_order_completion(
-            self,
-            order: PerpetualOrder,
-            grid_level: GridLevel
-    ) -> None:
-        """
-        处理订单（买入或卖出）的成交完成。
-
-        参数:
-            order: 已成交的订单实例。
-            grid_level: 与已成交订单关联的网格层级。
-        """
-        # 根据买卖方向处理成交
-        if order.side == PerpetualOrderSide.BUY_OPEN:
-            await self._handle_buy_order_completion(order, grid_level)
-
-        elif order.side == PerpetualOrderSide.BUY_CLOSE:
-            await self._handle_sell_order_completion(order, grid_level)
-
     async def _handle_buy_order_completion(
             self,
             order: PerpetualOrder,
@@ -143,7 +190,7 @@ class PerpetualOrderManager:
             order: 已完成的买入订单实例。
             grid_level: 与已完成买入订单关联的网格层级。
         """
-        self.logger.info(f"Buy order completed at grid level {grid_level}.")
+        self.logger.info(_LOG_TEMPLATES[PerpetualOrderSide.BUY_OPEN]['completed'], grid_level)
         # 标记网格层级完成状态
         self.grid_manager.complete_order(grid_level, PerpetualOrderSide.BUY_OPEN)
         # 获取配对卖单层级
@@ -154,7 +201,7 @@ class PerpetualOrderManager:
             await self._place_sell_order(grid_level, paired_sell_level, 0.1)
         else:
             self.logger.warning(
-                f"No valid sell grid level found for buy grid level {grid_level}. Skipping sell order placement.")
+                "No valid sell grid level found for buy grid level %s. Skipping sell order placement.", grid_level)
         # 此时卖单多了一个，买单少了一个，需要取消最上方的卖单，增加最下方的买单
         up_grid_level = self.grid_manager.get_grid_level_up_bound(grid_level)
         if up_grid_level:
@@ -166,44 +213,54 @@ class PerpetualOrderManager:
     async def _cancel_grid_orders(self, grid_level: GridLevel):
         for order in grid_level.orders:
             await self.order_execution_strategy.cancel_order(order)
-    async def _place_simple_buy_order(
+    async def _place_grid_order(
             self,
+            order_side: PerpetualOrderSide,
             grid_level: GridLevel,
-            amount: float # 这里amount对应的应该是合约的张数，不是币的数量,每张合约的数量是0.01
+            amount: float,
+            paired_level: Optional[GridLevel] = None
     ) -> None:
-        buy_order = await self.order_execution_strategy.execute_limit_order(
-            PerpetualOrderSide.BUY_OPEN,
+        """
+        在指定网格层级挂限价单，成功后更新网格配对、网格状态与订单簿。
+
+        参数:
+            order_side: 订单方向（BUY_OPEN 挂买单，BUY_CLOSE 挂卖单）。
+            grid_level: 挂单的网格层级。
+            amount: 下单数量（合约张数）。
+            paired_level: 与之配对的网格层级，为 None 时不建立配对关系。
+        """
+        label = _GRID_ORDER_LABELS[order_side]
+        order = await self.order_execution_strategy.execute_limit_order(
+            order_side,
             self.trading_pair,
             amount,
             grid_level.price
         )
 
-        if buy_order:
-            self.grid_manager.mark_order_pending(grid_level, buy_order)
-            self.order_book.add_order(buy_order, grid_level)
-            await self.notification_handler.async_send_notification(NotificationType.ORDER_PLACED, order_details=str(buy_order))
+        if order:
+            if paired_level is not None:
+                # 建立网格层级配对关系
+                self.grid_manager.pair_grid_levels(paired_level, grid_level, pairing_type=label)
+            # 更新订单簿与网格状态
+            self.grid_manager.mark_order_pending(grid_level, order)
+            self.order_book.add_order(order, grid_level)
+            self._pending_placed.append(str(order))
         else:
-            self.logger.error(f"Failed to place buy order at grid level {grid_level}")
+            self.logger.error("Failed to place %s order at grid level %s.", label, grid_level)
+
+    async def _place_simple_buy_order(
+            self,
+            grid_level: GridLevel,
+            amount: float # 这里amount对应的应该是合约的张数，不是币的数量,每张合约的数量是0.01
+    ) -> None:
+        await self._place_grid_order(PerpetualOrderSide.BUY_OPEN, grid_level, amount)
 
     async def _place_simple_sell_order(
             self,
             grid_level: GridLevel,
             amount: float
     ) -> None:
-        sell_order = await self.order_execution_strategy.execute_limit_order(
-            PerpetualOrderSide.BUY_CLOSE,
-            self.trading_pair,
-            amount,
-            grid_level.price
-        )
-
-        if sell_order:
-            self.grid_manager.mark_order_pending(grid_level, sell_order)
-            self.order_book.add_order(sell_order, grid_level)
-            await self.notification_handler.async_send_notification(NotificationType.ORDER_PLACED,
-                                                                    order_details=str(sell_order))
-        else:
-            self.logger.error(f"Failed to place buy order at grid level {grid_level}")
+        await self._place_grid_order(PerpetualOrderSide.BUY_CLOSE, grid_level, amount)
 
     async def _place_sell_order(
             self,
@@ -221,25 +278,7 @@ class PerpetualOrderManager:
         # 数量验证与调整
         # adjusted_quantity = self.order_validator.adjust_and_validate_sell_quantity(self.balance_tracker.crypto_balance, quantity)
         adjusted_quantity = 1.0
-        # 执行限价卖单
-        sell_order = await self.order_execution_strategy.execute_limit_order(
-            PerpetualOrderSide.BUY_CLOSE,
-            self.trading_pair,
-            adjusted_quantity,
-            sell_grid_level.price
-        )
-
-        if sell_order:
-            # 建立网格层级配对关系
-            self.grid_manager.pair_grid_levels(buy_grid_level, sell_grid_level, pairing_type="sell")
-            # 冻结加密货币余额
-            # self.balance_tracker.reserve_funds_for_sell(sell_order.amount)
-            # 更新订单簿与网格状态
-            self.grid_manager.mark_order_pending(sell_grid_level, sell_order)
-            self.order_book.add_order(sell_order, sell_grid_level)
-            await self.notification_handler.async_send_notification(NotificationType.ORDER_PLACED, order_details=str(sell_order))
-        else:
-            self.logger.error(f"Failed to place sell order at grid level {sell_grid_level}.")
+        await self._place_grid_order(PerpetualOrderSide.BUY_CLOSE, sell_grid_level, adjusted_quantity, paired_level=buy_grid_level)
 
     def _get_or_create_paired_buy_level(self, sell_grid_level: GridLevel) -> Optional[GridLevel]:
         """
@@ -254,16 +293,16 @@ class PerpetualOrderManager:
         paired_buy_level = sell_grid_level.paired_buy_level
 
         if paired_buy_level and self.grid_manager.can_place_order(paired_buy_level, PerpetualOrderSide.BUY_OPEN):
-            self.logger.info(f"Found valid paired buy level {paired_buy_level} for sell level {sell_grid_level}.")
+            self.logger.info("Found valid paired buy level %s for sell level %s.", paired_buy_level, sell_grid_level)
             return paired_buy_level
 
-        fallback_buy_level = self.grid_manager.get_grid_level_below(sell_grid_level)
+        fallback_buy_level = self.grid_manager.paired_buy_for_sell.get(sell_grid_level)
 
         if fallback_buy_level:
-            self.logger.info(f"Paired fallback buy level {fallback_buy_level} with sell level {sell_grid_level}.")
+            self.logger.info("Paired fallback buy level %s with sell level %s.", fallback_buy_level, sell_grid_level)
             return fallback_buy_level
 
-        self.logger.warning(f"No valid fallback buy level found below sell level {sell_grid_level}.")
+        self.logger.warning("No valid fallback buy level found below sell level %s.", sell_grid_level)
         return None
 
     async def _place_buy_order(
@@ -282,37 +321,20 @@ class PerpetualOrderManager:
         # 数量验证与调整
         # adjusted_quantity = self.order_validator.adjust_and_validate_sell_quantity(self.balance_tracker.crypto_balance, quantity)
         adjusted_quantity = 1.0
-        # 执行限价卖单
-        buy_order = await self.order_execution_strategy.execute_limit_order(
-            PerpetualOrderSide.BUY_OPEN,
-            self.trading_pair,
-            adjusted_quantity,
-            buy_grid_level.price
-        )
-        if buy_order:
-            # 建立网格层级配对关系
-            self.grid_manager.pair_grid_levels(sell_grid_level, buy_grid_level, pairing_type="buy")
-            # 冻结加密货币余额
-            # self.balance_tracker.reserve_funds_for_sell(sell_order.amount)
-            # 更新订单簿与网格状态
-            self.grid_manager.mark_order_pending(buy_grid_level, buy_order)
-            self.order_book.add_order(buy_order, buy_grid_level)
-            await self.notification_handler.async_send_notification(NotificationType.ORDER_PLACED, order_details=str(buy_order))
-        else:
-            self.logger.error(f"Failed to place buy order at grid level {buy_grid_level}.")
+        await self._place_grid_order(PerpetualOrderSide.BUY_OPEN, buy_grid_level, adjusted_quantity, paired_level=sell_grid_level)
 
     async def _handle_sell_order_completion(
             self,
             order: PerpetualOrder,
             grid_level: GridLevel
     ) -> None:
-        self.logger.info(f"Sell order completed at grid level {grid_level}.")
+        self.logger.info(_LOG_TEMPLATES[PerpetualOrderSide.BUY_CLOSE]['completed'], grid_level)
         self.grid_manager.complete_order(grid_level, PerpetualOrderSide.BUY_CLOSE)
         paired_buy_level = self._get_or_create_paired_buy_level(grid_level)
         if paired_buy_level:
             await self._place_buy_order(grid_level, paired_buy_level, 0.1)
         else:
-            self.logger.error(f"Failed to find or create a paired buy grid level for grid level {grid_level}.")
+            self.logger.error("Failed to find or create a paired buy grid level for grid level %s.", grid_level)
 
         # 此时买单多了一个，卖单少了一个，需要取消最下方的买单，增加最上方的卖单
         blow_grid_level = self.grid_manager.get_grid_level_below_bound(grid_level)
@@ -338,17 +360,17 @@ class PerpetualOrderManager:
             self.logger.warning("Initial purchase quantity is zero or negative. Skipping initial purchase.")
             return
 
-        self.logger.info(f"Performing initial crypto purchase: {initial_quantity} at price {current_price}.")
+        self.logger.info("Performing initial crypto purchase: %s at price %s.", initial_quantity, current_price)
 
         try:  # 执行市价单建仓
-            buy_amount = max(initial_quantity / current_price, self.exchange_service.amount_precision)
+            buy_amount = max(initial_quantity / current_price, self._get_amount_precision())
             buy_order = await self.order_execution_strategy.execute_market_order(
                 PerpetualOrderSide.BUY_OPEN,
                 self.trading_pair,
                 buy_amount,  # 这里算出来的initial_quantity是总价值
                 current_price
             )
-            self.logger.info(f"Initial crypto purchase completed. Order details: {buy_order}")
+            self.logger.info("Initial crypto purchase completed. Order details: %s", buy_order)
             self.order_book.add_order(buy_order)
             #await self.notification_handler.async_send_notification(NotificationType.ORDER_PLACED, order_details=f"Initial purchase done: {str(buy_order)}")
 
@@ -359,114 +381,180 @@ class PerpetualOrderManager:
                 self.balance_tracker.update_after_initial_purchase(initial_order=buy_order)
 
         except OrderExecutionFailedError as e:
-            self.logger.error(f"Failed while executing initial purchase - {str(e)}", exc_info=True)
+            self.logger.error("Failed while executing initial purchase - %s", e, exc_info=True)
             #await self.notification_handler.async_send_notification(NotificationType.ORDER_FAILED, error_details=f"Error while performing initial purchase. {e}")
 
         except Exception as e:
-            self.logger.error(f"Failed to perform initial purchase at current_price: {current_price} - error: {e}",
+            self.logger.error("Failed to perform initial purchase at current_price: %s - error: %s", current_price, e,
                               exc_info=True)
             #await self.notification_handler.async_send_notification(NotificationType.ORDER_FAILED, error_details=f"Error while performing initial purchase. {e}")
 
+    def _get_amount_precision(self) -> float:
+        """获取交易所数量精度，读取到有效值后缓存，之后不再访问 exchange_service。"""
+        if self._amount_precision is None:
+            self._amount_precision = self.exchange_service.amount_precision
+        return self._amount_precision
+
     async def _simulate_fill(self, buy_order, timestamp):
         pass
 
+    async def reduce_positions_batch(self, reductions: List[Dict[str, Any]]) -> None:
+        """
+        批量减仓：每项按持仓方向提交一笔反向市价单。按 MAX_REDUCE_BATCH 分组，同一组内的减仓并发提交，整组完成后再提交下一组。
+
+        参数:
+            reductions: 减仓请求列表，每项包含 position_id、size（减仓数量）、is_long（是否为多头持仓）。
+        """
+        if not reductions:
+            return
+
+        # 同一批减仓共用一次查询到的当前价格
+        current_price = await self.exchange_service.get_current_price(self.trading_pair)
+        for start in range(0, len(reductions), self.MAX_REDUCE_BATCH):
+            chunk = reductions[start:start + self.MAX_REDUCE_BATCH]
+            results = await asyncio.gather(*(self._reduce_position(current_price, **reduction) for reduction in chunk), return_exceptions=True)
+            # 单个仓位减仓失败只记录日志，不影响同组其他仓位
+            for reduction, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    self.logger.error("Failed to reduce position %s by %s - %s", reduction['position_id'], reduction['size'], result, exc_info=result)
+
+    async def _reduce_position(
+            self,
+            current_price: float,
+            position_id: str,
+            size: float,
+            is_long: bool
+    ) -> Optional[PerpetualOrder]:
+        """
+        提交一笔反向市价单减少指定仓位，数量经 order_validator 调整为不超过当前持仓。
+
+        参数:
+            current_price: 当前价格。
+            position_id: 仓位ID（用于日志）。
+            size: 减仓数量。
+            is_long: 是否为多头持仓。
+        返回:
+            减仓订单。
+        """
+        if is_long:
+            quantity = self.order_validator.adjust_and_validate_close_long(self.balance_tracker.long_position, size)
+        else:
+            quantity = self.order_validator.adjust_and_validate_close_short(self.balance_tracker.short_position, size)
+
+        order = await self.order_execution_strategy.execute_market_order(_REDUCE_SIDES[is_long], self.trading_pair, quantity, current_price)
+        self.logger.info("Reduced %s position %s by %s.", "long" if is_long else "short", position_id, quantity)
+        return order
+
     async def initialize_grid_orders(self, current_price: float):
-        # 初始化买单（仅挂低于当前价的网格）
-        buy_order_nums = 0
-        for price in reversed(self.grid_manager.sorted_buy_grids):
-            if price >= current_price:
-                self.logger.info(f"Skipping grid level at price: {price} for BUY order: Above current price.")
-                continue  # 跳过高于当前价的网格
-            # 获取网格层级对象
-            grid_level = self.grid_manager.grid_levels[price]
-
-            if self.grid_manager.can_place_order(grid_level, PerpetualOrderSide.BUY_OPEN):
-                try:
-                    # 执行限价买单 , TODO 这里需要计算正确的订单数量
-                    adjusted_buy_order_quantity = 1.0
-                    self.logger.info(
-                        f"Placing initial buy limit order at grid level {price} for  {self.trading_pair}.")
-                    order = await self.order_execution_strategy.execute_limit_order(
-                        PerpetualOrderSide.BUY_OPEN,
-                        self.trading_pair,
-                        adjusted_buy_order_quantity,
-                        price
-                    )
-
-                    if order is None:
-                        self.logger.error(f"Failed to place buy order at {price}: No order returned.")
-                        continue
-                    # 更新网格状态
-                    self.grid_manager.mark_order_pending(grid_level, order)
-                    # 记录订单到订单簿
-                    self.order_book.add_order(order, grid_level)
-                    # 计算数量, 一次最多放置5个多单
-                    buy_order_nums += 1
-                    if buy_order_nums >= self.grid_manager.max_placed_orders:
-                        self.logger.info(
-                            f"Place buy order for {self.trading_pair} reach max limit {self.grid_manager.max_placed_orders}.")
-                        break
-
-                except OrderExecutionFailedError as e:
-                    self.logger.error(f"Failed to initialize buy order at grid level {price} - {str(e)}", exc_info=True)
-                    #await self.notification_handler.async_send_notification(NotificationType.ORDER_FAILED, error_details=f"Error while placing initial buy order. {e}")
-
-                except Exception as e:
-                    self.logger.error(f"Unexpected error during buy order initialization at grid level {price}: {e}",
-                                      exc_info=True)
-                    #await self.notification_handler.async_send_notification(NotificationType.ERROR_OCCURRED, error_details=f"Error while placing initial buy order: {str(e)}")
-
-        buy_close_order_nums = 0
-        for price in self.grid_manager.sorted_sell_grids:
-            if price <= current_price:
-                self.logger.info(
-                    f"Skipping grid level at price: {price} for SELL order: Below or equal to current price.")
+        # 循环内反复使用的属性提前绑定为局部变量
+        grid_manager = self.grid_manager
+        max_placed_orders = grid_manager.max_placed_orders
+        log_info = self.logger.info
+        info_enabled = self.logger.isEnabledFor(logging.INFO)
+        trading_pair = self.trading_pair
+
+        # 初始化买单（仅挂低于当前价的网格，从最接近当前价的网格向下挂单，一次最多放置 max_placed_orders 个多单）
+        buy_candidates = grid_manager.eligible_levels(PerpetualOrderSide.BUY_OPEN, below=current_price, limit=max_placed_orders)
+        if len(buy_candidates) >= max_placed_orders and info_enabled:
+            log_info(_LOG_TEMPLATES[PerpetualOrderSide.BUY_OPEN]['max_limit'], trading_pair, max_placed_orders)
+
+        # 初始化卖单（仅挂高于当前价的网格）
+        # total_balance_value = self.balance_tracker.get_total_balance_value(current_price)
+        # order_quantity = self.grid_manager.get_order_size_for_grid_level(total_balance_value, current_price)
+        sell_candidates = grid_manager.eligible_levels(PerpetualOrderSide.BUY_CLOSE, above=current_price, limit=max_placed_orders)
+        if len(sell_candidates) >= max_placed_orders and info_enabled:
+            log_info(_LOG_TEMPLATES[PerpetualOrderSide.BUY_CLOSE]['max_limit'], trading_pair, max_placed_orders)
+
+        # 方向 -> 本轮待提交的 (价格, 网格层级)；remaining 为各方向还需放置的挂单数，tried 为已提交过的网格价格
+        pending = {PerpetualOrderSide.BUY_OPEN: buy_candidates, PerpetualOrderSide.BUY_CLOSE: sell_candidates}
+        remaining = {order_side: max_placed_orders for order_side in pending}
+        tried = {order_side: set() for order_side in pending}
+        bounds = {PerpetualOrderSide.BUY_OPEN: {'below': current_price}, PerpetualOrderSide.BUY_CLOSE: {'above': current_price}}
+        placed_orders: List[Tuple[PerpetualOrder, GridLevel]] = []
+
+        while any(pending.values()):
+            # 执行限价单，各网格的下单数量在提交前一次算好
+            batch_requests: List[BatchOrderRequest] = []
+            for order_side, candidates in pending.items():
+                placing_template = _LOG_TEMPLATES[order_side]['placing_initial']
+                for (price, _), quantity in zip(candidates, self._initial_order_quantities(candidates)):
+                    if info_enabled:
+                        log_info(placing_template, price, quantity, trading_pair)
+                    batch_requests.append(BatchOrderRequest(order_side, trading_pair, quantity, price))
+
+            # 买卖挂单一次性通过批量下单接口提交，结果与请求顺序一致
+            results = await self.order_execution_strategy.execute_batch_limit_orders(batch_requests)
+
+            offset = 0
+            for order_side, candidates in pending.items():
+                label = _GRID_ORDER_LABELS[order_side]
+                num_placed = self._collect_initial_grid_orders(label, candidates, results[offset:offset + len(candidates)], placed_orders)
+                offset += len(candidates)
+                remaining[order_side] -= num_placed
+                tried[order_side].update(price for price, _ in candidates)
+
+                # 与逐个挂单时一样，失败的网格由更远的网格补上，直到放满 max_placed_orders 个或没有可用网格
+                num_failed = len(candidates) - num_placed
+                if num_failed == 0 or remaining[order_side] <= 0:
+                    pending[order_side] = []
+                    continue
+                backfill = [candidate for candidate in grid_manager.eligible_levels(order_side, **bounds[order_side]) if candidate[0] not in tried[order_side]][:remaining[order_side]]
+                if backfill:
+                    self.logger.warning("%s initial %s orders failed, retrying with %s further grid levels.", num_failed, label, len(backfill))
+                else:
+                    self.logger.warning("%s initial %s orders failed and no further grid levels are available.", num_failed, label)
+                pending[order_side] = backfill
+
+        # 一次性记录到订单簿；与逐个挂单时一样，启动时的初始挂单不发送挂单通知
+        self.order_book.add_orders(placed_orders)
+
+    def _initial_order_quantities(self, candidates: List[Tuple[float, GridLevel]]) -> List[float]:
+        """
+        计算一组初始网格挂单的下单数量，与原有逐个挂单时一样，每个网格固定下单 1.0。
+
+        参数:
+            candidates: (价格, 网格层级) 列表。
+        返回:
+            与 candidates 一一对应的下单数量。
+        """
+        return [1.0] * len(candidates)
+
+    def _collect_initial_grid_orders(
+            self,
+            label: str,
+            candidates: List[Tuple[float, GridLevel]],
+            results: List[Union[PerpetualOrder, BaseException, None]],
+            placed_orders: List[Tuple[PerpetualOrder, GridLevel]]
+    ) -> int:
+        """
+        处理一组初始网格挂单的返回结果：记录失败，成功的订单标记网格待成交并加入 placed_orders。
+
+        参数:
+            label: 日志中使用的方向名称（buy/sell）。
+            candidates: (价格, 网格层级) 列表。
+            results: 与 candidates 一一对应的下单结果。
+            placed_orders: 收集成功挂单的 (订单, 网格层级) 列表。
+        返回:
+            本组成功挂单的数量。
+        """
+        num_placed = 0
+        for (price, grid_level), result in zip(candidates, results):
+            if isinstance(result, OrderExecutionFailedError):
+                self.logger.error("Failed to initialize %s order at grid level %s - %s", label, price, result, exc_info=result)
+                #await self.notification_handler.async_send_notification(NotificationType.ORDER_FAILED, error_details=f"Error while placing initial {label} order. {result}")
                 continue
 
-            grid_level = self.grid_manager.grid_levels[price]
-            # total_balance_value = self.balance_tracker.get_total_balance_value(current_price)
-            # order_quantity = self.grid_manager.get_order_size_for_grid_level(total_balance_value, current_price)
-            if self.grid_manager.can_place_order(grid_level, PerpetualOrderSide.BUY_CLOSE):
-                try:
-                    # adjusted_sell_order_quantity = self.order_validator.adjust_and_validate_sell_quantity(
-                    #     crypto_balance=self.balance_tracker.crypto_balance,
-                    #     order_quantity=order_quantity
-                    # )
-
-                    adjusted_sell_order_quantity = 1.0
-
-                    self.logger.info(
-                        f"Placing initial sell limit order at grid level {price} for {adjusted_sell_order_quantity} {self.trading_pair}.")
-                    order = await self.order_execution_strategy.execute_limit_order(
-                        PerpetualOrderSide.BUY_CLOSE,
-                        self.trading_pair,
-                        adjusted_sell_order_quantity,
-                        price
-                    )
-
-                    if order is None:
-                        self.logger.error(f"Failed to place sell order at {price}: No order returned.")
-                        continue
-
-                    #self.balance_tracker.reserve_funds_for_sell(adjusted_sell_order_quantity)
-                    self.grid_manager.mark_order_pending(grid_level, order)
-                    self.order_book.add_order(order, grid_level)
-
-                    buy_close_order_nums += 1
-                    if buy_close_order_nums >= self.grid_manager.max_placed_orders:
-                        self.logger.info(
-                            f"Place buy close order for {self.trading_pair} reach max limit {self.grid_manager.max_placed_orders}.")
-                        break
-
-                except OrderExecutionFailedError as e:
-                    self.logger.error(f"Failed to initialize sell order at grid level {price} - {str(e)}",
-                                      exc_info=True)
-                    #await self.notification_handler.async_send_notification(NotificationType.ORDER_FAILED, error_details=f"Error while placing initial sell order. {e}")
-                except Exception as e:
-                    self.logger.error(f"Unexpected error during sell order initialization at grid level {price}: {e}",
-                                      exc_info=True)
-                    #await self.notification_handler.async_send_notification(NotificationType.ERROR_OCCURRED,
-                    #error_details=f"Error while placing initial sell order: {str(e)}")
+            if isinstance(result, BaseException):
+                self.logger.error("Unexpected error during %s order initialization at grid level %s: %s", label, price, result, exc_info=result)
+                #await self.notification_handler.async_send_notification(NotificationType.ERROR_OCCURRED, error_details=f"Error while placing initial {label} order: {str(result)}")
+                continue
 
-        pass
+            if result is None:
+                self.logger.error("Failed to place %s order at %s: No order returned.", label, price)
+                continue
 
+            # 更新网格状态
+            self.grid_manager.mark_order_pending(grid_level, result)
+            placed_orders.append((result, grid_level))
+            num_placed += 1
+        return num_placed
@@ -1,12 +1,16 @@
-import asyncio, logging
-from typing import Optional
+import asyncio, logging, random, time
+from typing import Dict, List, Tuple
 from core.bot_management.event_bus import EventBus, Events
+from core.services.exceptions import UnsupportedExchangeError
 from core.order_handling.execution_strategy.order_execution_strategy_interface import OrderExecutionStrategyInterface
 from core.order_handling.execution_strategy.perpetual_live_order_execution_strategy import \
     PerpetualLiveOrderExecutionStrategy
 from core.order_handling.perpetual_order import PerpetualOrderStatus, PerpetualOrder
 from core.order_handling.perpetual_order_book import PerpetualOrderBook
 
+# 仍需向交易所查询状态的本地订单状态，其余状态（成交、撤销、强平等）已是终态
+_ACTIVE_STATUSES = frozenset({PerpetualOrderStatus.OPEN, PerpetualOrderStatus.PARTIAL_CLOSE})
+
 
 class PerpetualEvents:
     """永续合约特有的事件类型"""
@@ -18,6 +22,15 @@ class PerpetualEvents:
 class PerpetualOrderStatusTracker:
     """永续合约订单状态追踪器，专门处理U本位永续合约的订单状态变化"""
 
+    # 同时向交易所查询订单状态的最大请求数
+    MAX_CONCURRENT_QUERIES = 16
+    # 连续出错时退避等待的上限（秒）
+    ERROR_BACKOFF_CAP = 60.0
+    # 资金费率检查连续出错时，退避上限为 max(ERROR_BACKOFF_CAP, 检查间隔) 的倍数，间隔本身不小于 ERROR_BACKOFF_CAP 时仍能退避
+    FUNDING_BACKOFF_MULTIPLIER = 8
+    # 使用订单推送时，后台对账轮询的间隔（秒），补上断线重连或推送丢失期间的状态变化
+    RECONCILE_INTERVAL = 30.0
+
     def __init__(
         self,
         order_book: PerpetualOrderBook,
@@ -27,6 +40,9 @@ class PerpetualOrderStatusTracker:
         quote_currency: str,
         polling_interval: float = 5.0,  # 合约默认使用更短的轮询间隔
         funding_check_interval: float = 60.0,  # 资金费率检查间隔
+        min_polling_interval: float = 1.0,  # 有订单成交时使用的最短轮询间隔
+        max_polling_interval: float = 60.0,  # 没有未成交订单时退避到的最长轮询间隔
+        jitter: float = 0.2,  # 轮询间隔随机缩短的最大比例
     ):
         """初始化永续合约订单状态追踪器
 
@@ -36,17 +52,29 @@ class PerpetualOrderStatusTracker:
             event_bus: 事件总线
             polling_interval: 订单状态轮询间隔（秒）
             funding_check_interval: 资金费率检查间隔（秒）
+            min_polling_interval: 上一轮有订单成交时的轮询间隔（秒）
+            max_polling_interval: 连续没有未成交订单时轮询间隔的上限（秒）
+            jitter: 每次休眠在 [interval * (1 - jitter), interval] 内随机取值，避免多个实例同时请求交易所
         """
         self.order_book = order_book
         self.order_execution_strategy = order_execution_strategy
         self.event_bus = event_bus
         self.polling_interval = polling_interval
         self.funding_check_interval = funding_check_interval
+        self.min_polling_interval = min_polling_interval
+        self.max_polling_interval = max_polling_interval
+        self.jitter = jitter
+        self._fills_in_cycle = 0  # 本轮轮询中检测到的成交数
+        self._empty_cycles = 0  # 连续没有未成交订单的轮询次数
         self._monitoring_task = None
         self._funding_check_task = None
         self.base_currency = base_currency
         self.quote_currency = quote_currency
-        self._active_tasks = set()
+        # U本位永续合约交易对，只在初始化时拼接一次
+        self.symbol = f"{base_currency}/{quote_currency}:{quote_currency}"
+        # 查询失败的订单ID -> (连续失败次数, 可再次查询的时间戳)
+        self._order_backoff: Dict[str, Tuple[int, float]] = {}
+        self._query_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_QUERIES)
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def start_tracking(self) -> None:
@@ -55,7 +83,7 @@ class PerpetualOrderStatusTracker:
             self.logger.warning("PerpetualOrderStatusTracker is already running.")
             return
 
-        self._monitoring_task = asyncio.create_task(self._track_open_order_statuses())
+        self._monitoring_task = asyncio.create_task(self._watch_order_updates())
         self._funding_check_task = asyncio.create_task(self._check_funding_rate())
         self.logger.info("Started perpetual order tracking and funding rate monitoring.")
 
@@ -77,38 +105,173 @@ class PerpetualOrderStatusTracker:
                 pass
             self._funding_check_task = None
 
-        await self._cancel_active_tasks()
         self.logger.info("Stopped perpetual order tracking and funding rate monitoring.")
 
+    async def _watch_order_updates(self) -> None:
+        """通过交易所推送追踪订单状态，同时以 RECONCILE_INTERVAL 慢速轮询对账；执行策略或交易所不支持推送时退回轮询"""
+        err_count = 0
+        reconcile_task = None
+        try:
+            # 先轮询一次，补上订阅建立之前已经发生的状态变化
+            await self._process_open_orders()
+            reconcile_task = asyncio.create_task(self._reconcile_open_orders())
+            while True:
+                try:
+                    remote_orders = await self.order_execution_strategy.watch_orders(self.symbol)
+                except UnsupportedExchangeError:
+                    self.logger.info("Order stream unavailable, falling back to polling order statuses.")
+                    break
+                except Exception as error:
+                    err_count += 1
+                    delay = min(self.ERROR_BACKOFF_CAP, self.min_polling_interval * 2 ** err_count)
+                    self.logger.error(f"Error watching order updates ({err_count} consecutive failures, retrying in {delay:.1f}s): {error}", exc_info=True)
+                    await asyncio.sleep(self._jittered(delay))
+                    continue
+
+                err_count = 0
+                self._handle_streamed_orders(remote_orders)
+        except asyncio.CancelledError:
+            self.logger.info("Perpetual order monitoring task was cancelled.")
+            return
+        finally:
+            if reconcile_task is not None:
+                reconcile_task.cancel()
+
+        await self._track_open_order_statuses()
+
+    def _handle_streamed_orders(self, remote_orders: List[PerpetualOrder]) -> None:
+        """
+        处理一批推送的订单更新。
+
+        推送中可能包含其他实例或手动下的订单，只处理订单簿中仍未完成的订单；
+        同一订单在一批推送中出现多次时只处理最后一条，状态和成交量与本地一致的推送不做处理。
+
+        Args:
+            remote_orders: 推送的订单列表
+        """
+        latest_by_id = {remote_order.identifier: remote_order for remote_order in remote_orders}
+        orders_by_id = self.order_book.orders_by_id
+        for order_id, remote_order in latest_by_id.items():
+            local_order = orders_by_id.get(order_id)
+            # 未知订单，或本地已是成交、撤销等终态（轮询或更早的推送已处理过）
+            if local_order is None or local_order.status not in _ACTIVE_STATUSES or self._is_unchanged(local_order, remote_order):
+                continue
+            self._handle_order_status_change(remote_order)
+
+    async def _reconcile_open_orders(self) -> None:
+        """推送模式下的后台对账，按 RECONCILE_INTERVAL 轮询一次全部未成交订单"""
+        while True:
+            await asyncio.sleep(self._jittered(self.RECONCILE_INTERVAL))
+            try:
+                await self._process_open_orders()
+            except Exception as error:
+                self.logger.error(f"Error reconciling open orders: {error}", exc_info=True)
+
     async def _track_open_order_statuses(self) -> None:
         """持续追踪所有未成交订单状态"""
         try:
             while True:
-                await self._process_open_orders()
-                await asyncio.sleep(self.polling_interval)
+                open_count = await self._process_open_orders()
+                await asyncio.sleep(self._jittered(self._next_polling_interval(open_count)))
         except asyncio.CancelledError:
             self.logger.info("Perpetual order monitoring task was cancelled.")
-            await self._cancel_active_tasks()
         except Exception as error:
             self.logger.error(f"Unexpected error in PerpetualOrderStatusTracker: {error}")
 
-    async def _process_open_orders(self) -> None:
-        """批量处理所有未完成订单"""
+    def _jittered(self, interval: float) -> float:
+        """对休眠间隔加入随机抖动，平均轮询频率基本不变，但多个实例的请求不再同步"""
+        return interval * (1 - self.jitter * random.random())
+
+    def _next_polling_interval(self, open_count: int) -> float:
+        """根据上一轮的未成交订单数和成交情况计算下一次轮询间隔
+
+        有成交时缩短到 min_polling_interval；没有未成交订单时按连续空轮次数指数退避，
+        最长不超过 max_polling_interval；其余情况使用 polling_interval。
+
+        Args:
+            open_count: 上一轮处理的未成交订单数
+        """
+        fills, self._fills_in_cycle = self._fills_in_cycle, 0
+        if fills:
+            self._empty_cycles = 0
+            return self.min_polling_interval
+        if open_count == 0:
+            self._empty_cycles += 1
+            return min(self.polling_interval * 2 ** self._empty_cycles, self.max_polling_interval)
+        self._empty_cycles = 0
+        return self.polling_interval
+
+    async def _process_open_orders(self) -> int:
+        """批量处理所有未完成订单，返回本轮处理的订单数"""
         open_orders = self.order_book.get_open_orders()
-        tasks = [self._create_task(self._query_and_handle_order(order)) for order in open_orders]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for result in results:
-            if isinstance(result, Exception):
-                self.logger.error(f"Error during order processing: {result}", exc_info=True)
+        if not open_orders:
+            return 0
+
+        # 先用一次请求取回交易所仍挂着的订单，只有已不在挂单列表中的订单（成交、撤销等）才需要逐个查询最终状态
+        remaining_orders = open_orders
+        try:
+            remote_by_id = {remote_order.identifier: remote_order for remote_order in await self.order_execution_strategy.get_open_orders(self.symbol)}
+        except UnsupportedExchangeError:
+            pass
+        except Exception as error:
+            self.logger.error(f"Failed to fetch open orders for {self.symbol}, querying orders individually: {error}")
+        else:
+            remaining_orders = []
+            for local_order in open_orders:
+                # 等待批量查询期间订单可能已由推送更新为终态，不再重复处理
+                if local_order.status not in _ACTIVE_STATUSES:
+                    continue
+                remote_order = remote_by_id.get(local_order.identifier)
+                if remote_order is None:
+                    remaining_orders.append(local_order)
+                elif not self._is_unchanged(local_order, remote_order):
+                    self._handle_order_status_change(remote_order)
+
+        # 每个订单的查询任务在完成时立即处理自身结果，不必等待最慢的查询；退出时 TaskGroup 已等待全部任务
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for order in remaining_orders:
+                    # 订单可能已在本轮更早的处理中或由推送更新为终态，无需再查询
+                    if order.status in _ACTIVE_STATUSES:
+                        task_group.create_task(self._query_and_handle_order(order))
+        except* Exception as error_group:
+            for error in error_group.exceptions:
+                self.logger.error(f"Error during order processing: {error}", exc_info=error)
+
+        return len(open_orders)
 
     async def _query_and_handle_order(self, local_order: PerpetualOrder):
         """查询并处理单个订单状态"""
+        order_id = local_order.identifier
+        backoff = self._order_backoff.get(order_id)
+        if backoff is not None and time.monotonic() < backoff[1]:
+            return
+
         try:
-            remote_order = await self.order_execution_strategy.get_order(local_order.identifier, local_order.symbol)
-            self._handle_order_status_change(remote_order)
+            async with self._query_semaphore:
+                # 等待查询名额期间订单可能已由推送更新为终态
+                if local_order.status not in _ACTIVE_STATUSES:
+                    return
+                remote_order = await self.order_execution_strategy.get_order(order_id, local_order.symbol)
         except Exception as error:
-            self.logger.error(f"Failed to query remote order with identifier {local_order.identifier}: {error}", exc_info=True)
+            # 连续失败时按 polling_interval * 2**n 推迟该订单的下一次查询
+            failures = backoff[0] + 1 if backoff is not None else 1
+            delay = min(self.ERROR_BACKOFF_CAP, self.polling_interval * 2 ** failures)
+            self._order_backoff[order_id] = (failures, time.monotonic() + delay)
+            self.logger.error(f"Failed to query remote order with identifier {order_id} ({failures} consecutive failures, retrying in {delay:.1f}s): {error}", exc_info=True)
+            return
+
+        self._order_backoff.pop(order_id, None)
+        # 查询期间推送可能已处理了同一次成交，此时再处理会重复发布 ORDER_FILLED
+        if local_order.status not in _ACTIVE_STATUSES:
+            return
+        if not self._is_unchanged(local_order, remote_order):
+            self._handle_order_status_change(remote_order)
+
+    @staticmethod
+    def _is_unchanged(local_order: PerpetualOrder, remote_order: PerpetualOrder) -> bool:
+        """交易所返回的订单状态和成交量与本地一致时无需处理"""
+        return remote_order.status == local_order.status and remote_order.filled == local_order.filled
 
     def _handle_order_status_change(self, remote_order: PerpetualOrder) -> None:
         """处理合约订单状态变更
@@ -118,117 +281,83 @@ class PerpetualOrderStatusTracker:
         """
         try:
             if remote_order.status == PerpetualOrderStatus.UNKNOWN:
-                self.logger.error(f"Missing status in remote order: {remote_order}", exc_info=True)
+                self.logger.error("Missing status in remote order: %s", remote_order, exc_info=True)
                 raise ValueError("Order data missing status field")
 
-            if remote_order.status == PerpetualOrderStatus.LIQUIDATED:
-                self._handle_liquidation(remote_order)
-            elif remote_order.status == PerpetualOrderStatus.ADL:
-                self._handle_adl(remote_order)
-            elif remote_order.status == PerpetualOrderStatus.PARTIAL_CLOSE:
-                self._handle_partial_close(remote_order)
-            elif remote_order.status == PerpetualOrderStatus.CLOSED:
-                self.order_book.update_order_status(remote_order.identifier, PerpetualOrderStatus.CLOSED)
-                self.event_bus.publish_sync(Events.ORDER_FILLED, remote_order)
-                self.logger.info(f"Order {remote_order.identifier} filled.")
-            elif remote_order.status == PerpetualOrderStatus.CANCELED:
-                self.order_book.update_order_status(remote_order.identifier, PerpetualOrderStatus.CANCELED)
-                self.event_bus.publish_sync(Events.ORDER_CANCELLED, remote_order)
-                self.logger.warning(f"Order {remote_order.identifier} was canceled.")
-            elif remote_order.status == PerpetualOrderStatus.OPEN:
-                if remote_order.filled > 0:
-                    self.logger.info(f"Order {remote_order} partially filled. Filled: {remote_order.filled}, Remaining: {remote_order.remaining}.")
-                # else:
-                #     self.logger.info(f"Order {remote_order} is still open. No fills yet.")
+            handler = self._STATUS_HANDLERS.get(remote_order.status)
+            if handler is None:
+                self.logger.warning("Unhandled order status '%s' for order %s.", remote_order.status, remote_order.identifier)
             else:
-                self.logger.warning(f"Unhandled order status '{remote_order.status}' for order {remote_order.identifier}.")
-
-            #self._check_liquidation_risk(remote_order)
+                handler(self, remote_order)
 
         except Exception as e:
-            self.logger.error(f"Error handling perpetual order status change: {e}", exc_info=True)
+            self.logger.error("Error handling perpetual order status change: %s", e, exc_info=True)
+
+    def _handle_filled(self, order: PerpetualOrder) -> None:
+        """处理完全成交订单"""
+        self.order_book.update_order_status(order.identifier, PerpetualOrderStatus.CLOSED)
+        self._fills_in_cycle += 1
+        self.event_bus.publish_nowait(Events.ORDER_FILLED, order)
+        self.logger.info("Order %s filled.", order.identifier)
+
+    def _handle_canceled(self, order: PerpetualOrder) -> None:
+        """处理已取消订单"""
+        self.order_book.update_order_status(order.identifier, PerpetualOrderStatus.CANCELED)
+        self.event_bus.publish_nowait(Events.ORDER_CANCELLED, order)
+        self.logger.warning("Order %s was canceled.", order.identifier)
+
+    def _handle_open(self, order: PerpetualOrder) -> None:
+        """处理仍未完全成交的订单"""
+        if order.filled > 0:
+            self.logger.info("Order %s partially filled. Filled: %s, Remaining: %s.", order, order.filled, order.remaining)
 
     def _handle_liquidation(self, order: PerpetualOrder) -> None:
         """处理强平订单"""
         self.order_book.update_order_status(order.identifier, PerpetualOrderStatus.LIQUIDATED)
-        self.event_bus.publish_sync(PerpetualEvents.POSITION_UPDATE, order)
-        self.logger.warning(f"Order {order.identifier} was liquidated.")
+        self.event_bus.publish_nowait(PerpetualEvents.POSITION_UPDATE, order)
+        self.logger.warning("Order %s was liquidated.", order.identifier)
 
     def _handle_adl(self, order: PerpetualOrder) -> None:
         """处理自动减仓订单"""
         self.order_book.update_order_status(order.identifier, PerpetualOrderStatus.ADL)
-        self.event_bus.publish_sync(PerpetualEvents.ADL_TRIGGERED, order)
-        self.logger.warning(f"Order {order.identifier} was automatically deleveraged.")
+        self.event_bus.publish_nowait(PerpetualEvents.ADL_TRIGGERED, order)
+        self.logger.warning("Order %s was automatically deleveraged.", order.identifier)
 
     def _handle_partial_close(self, order: PerpetualOrder) -> None:
         """处理部分平仓订单"""
         self.order_book.update_order_status(order.identifier, PerpetualOrderStatus.PARTIAL_CLOSE)
-        self.event_bus.publish_sync(PerpetualEvents.POSITION_UPDATE, order)
-        self.logger.info(
-            f"Order {order.identifier} partially closed. "
-            f"Filled: {order.filled}, Remaining: {order.remaining}"
-        )
+        self.event_bus.publish_nowait(PerpetualEvents.POSITION_UPDATE, order)
+        self.logger.info("Order %s partially closed. Filled: %s, Remaining: %s", order.identifier, order.filled, order.remaining)
+
+    # 订单状态 -> 处理方法，_handle_order_status_change 通过一次字典查找完成分发
+    _STATUS_HANDLERS = {
+        PerpetualOrderStatus.LIQUIDATED: _handle_liquidation,
+        PerpetualOrderStatus.ADL: _handle_adl,
+        PerpetualOrderStatus.PARTIAL_CLOSE: _handle_partial_close,
+        PerpetualOrderStatus.CLOSED: _handle_filled,
+        PerpetualOrderStatus.CANCELED: _handle_canceled,
+        PerpetualOrderStatus.OPEN: _handle_open,
+    }
 
     async def _check_funding_rate(self) -> None:
         """定期检查资金费率并处理资金费用结算"""
-        symbol = f"{self.base_currency}/{self.quote_currency}:{self.quote_currency}"
+        err_count = 0
         try:
             while True:
+                sleep = self.funding_check_interval
                 try:
-                    funding_rate = await self.order_execution_strategy.get_funding_rate(symbol)
-                    self.event_bus.publish_sync(
+                    funding_rate = await self.order_execution_strategy.get_funding_rate(self.symbol)
+                    self.event_bus.publish_nowait(
                         PerpetualEvents.FUNDING_FEE,
-                        {"symbol": symbol, "rate": funding_rate}
+                        {"symbol": self.symbol, "rate": funding_rate}
                     )
+                    err_count = 0
                 except Exception as e:
-                    self.logger.error(f"Error checking funding rates: {e}", exc_info=True)
-                await asyncio.sleep(self.funding_check_interval)
+                    # 连续出错时指数退避，避免交易所故障期间持续刷日志和请求
+                    err_count += 1
+                    backoff_cap = max(self.ERROR_BACKOFF_CAP, self.funding_check_interval) * self.FUNDING_BACKOFF_MULTIPLIER
+                    sleep = min(backoff_cap, self.funding_check_interval * 2 ** err_count)
+                    self.logger.error(f"Error checking funding rates ({err_count} consecutive failures): {e}", exc_info=True)
+                await asyncio.sleep(self._jittered(sleep))
         except asyncio.CancelledError:
             self.logger.info("Funding rate check task cancelled.")
-
-    def _check_liquidation_risk(self, order: PerpetualOrder) -> None:
-        """检查订单的强平风险
-
-        Args:
-            order: 需要检查的订单对象
-        """
-        try:
-            margin_ratio = self.order_execution_strategy.get_position_margin_ratio(
-                order.symbol, order.position_side
-            )
-            
-            if margin_ratio and margin_ratio < 0.1:  # 10%作为警戒线
-                self.event_bus.publish_sync(
-                    PerpetualEvents.LIQUIDATION_WARNING,
-                    {
-                        "order": order,
-                        "margin_ratio": margin_ratio,
-                        "liquidation_price": self.order_execution_strategy.get_liquidation_price(
-                            order.symbol, order.position_side
-                        )
-                    }
-                )
-                self.logger.warning(
-                    f"Liquidation warning for {order.identifier}: "
-                    f"margin ratio {margin_ratio:.2%}"
-                )
-        except Exception as e:
-            self.logger.error(f"Error checking liquidation risk: {e}", exc_info=True)
-
-    def _create_task(self, coro):
-        """创建并管理异步任务
-
-        Args:
-            coro: 要执行的协程
-        """
-        task = asyncio.create_task(coro)
-        self._active_tasks.add(task)
-        task.add_done_callback(self._active_tasks.discard)
-        return task
-
-    async def _cancel_active_tasks(self):
-        """取消所有活跃任务"""
-        for task in self._active_tasks:
-            task.cancel()
-        await asyncio.gather(*self._active_tasks, return_exceptions=True)
-        self._active_tasks.clear()
\ No newline at end of file
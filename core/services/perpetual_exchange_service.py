@@ -1,7 +1,7 @@
-import ccxt, logging, asyncio, os
-from ccxt.base.errors import NetworkError, BaseError, ExchangeError, OrderNotFound
+import ccxt, logging, asyncio, os, time, uuid
+from ccxt.base.errors import NetworkError, BaseError, ExchangeError, OrderNotFound, RateLimitExceeded, DDoSProtection
 import ccxt.pro as ccxtpro
-from typing import Dict, Union, Callable, Any, Optional, List
+from typing import Dict, Union, Callable, Any, Optional, List, Tuple, Awaitable
 import pandas as pd
 from ccxt.base.types import OrderType
 
@@ -10,24 +10,39 @@ from .exchange_interface import ExchangeInterface
 from .exceptions import UnsupportedExchangeError, DataFetchError, OrderCancellationError, MissingEnvironmentVariableError
 
 class PerpetualExchangeService(ExchangeInterface):
+    # 交易所不支持持仓推送时的后台持仓轮询周期（秒），下单/撤单后会立即触发一次额外刷新；
+    # 持仓推送出错后也按该间隔重新订阅
+    POSITION_REFRESH_INTERVAL = 2.0
+
+    # 资金费率缓存有效期（秒），资金费率结算周期为数小时，风控检查和资金费用事件中的重复查询无需每次请求交易所
+    FUNDING_RATE_CACHE_TTL = 60.0
+
+    # 行情推送缓存的最新价在该时间（秒）内视为有效，get_current_price 直接返回而不请求交易所
+    LAST_PRICE_MAX_AGE = 2.0
+
+    # 下单/撤单被交易所限频时的重试次数与首次退避时间（秒），之后每次翻倍
+    RATE_LIMIT_MAX_RETRIES = 4
+    RATE_LIMIT_BACKOFF = 0.5
+
     async def get_margin_ratio(self) -> float:
         if self.exchange_name == 'okx':
             # 获取账户风险信息
             try:
                 # 获取 U 本位永续合约仓位信息
-                position = await self.exchange.fetch_position(self.symbol)
+                position = await self.get_position(self.symbol)
                 if position['info']['instType'] == 'SWAP' and position['info']['ccy'] == 'USDT':
                     # 查找U本位永续合约仓位信息
-                    self.logger.info(f"Symbol: {position['symbol']}")
-                    self.logger.info(f"持仓合约方向: {position['side']}")
-                    self.logger.info(f"平均入场价格: {position['entryPrice']}")
-                    self.logger.info(f"持仓合约数量: {position['contracts']}")
-                    self.logger.info(f"持仓合约大小: {position['contractSize']}")
-                    self.logger.info(f"持仓合约杠杆: x{position['leverage']}")
-                    self.logger.info(f"保证金模式: {position['marginMode']}")
-                    self.logger.info(f"保证金比率: {position['marginRatio']}")
-                    self.logger.info(f"维持保证金: {position['maintenanceMargin']}")
-                    self.logger.info(f"清算价格: {position['liquidationPrice']}")
+                    if self.logger.isEnabledFor(logging.INFO):
+                        self.logger.info("Symbol: %s", position['symbol'])
+                        self.logger.info("持仓合约方向: %s", position['side'])
+                        self.logger.info("平均入场价格: %s", position['entryPrice'])
+                        self.logger.info("持仓合约数量: %s", position['contracts'])
+                        self.logger.info("持仓合约大小: %s", position['contractSize'])
+                        self.logger.info("持仓合约杠杆: x%s", position['leverage'])
+                        self.logger.info("保证金模式: %s", position['marginMode'])
+                        self.logger.info("保证金比率: %s", position['marginRatio'])
+                        self.logger.info("维持保证金: %s", position['maintenanceMargin'])
+                        self.logger.info("清算价格: %s", position['liquidationPrice'])
                     return float(position['marginRatio'])
             except Exception as e:
                 print(f"Error: {e}")
@@ -59,6 +74,19 @@ class PerpetualExchangeService(ExchangeInterface):
         self.base_currency = config_manager.get_base_currency()
         self.quote_currency = config_manager.get_quote_currency()
         self.symbol = f"{self.base_currency}/{self.quote_currency}:{self.quote_currency}"
+        # 后台任务维护的持仓快照（交易对 -> 持仓），每次更新整体替换，读取方无需加锁
+        self._positions: Dict[str, Any] = {}
+        self._positions_refresh_task: Optional[asyncio.Task] = None
+        self._positions_refresh_requested = asyncio.Event()
+        # 持仓快照是否由交易所推送维护，推送模式下下单/撤单后无需主动刷新
+        self._positions_streaming = False
+        # 交易对 -> (资金费率, 过期时间)
+        self._funding_rate_cache: Dict[str, Tuple[float, float]] = {}
+        # 交易对 -> (ticker 推送的最新价, 接收时间)
+        self._last_price: Dict[str, Tuple[float, float]] = {}
+        # 开启后下单/撤单走交易所的 WebSocket 交易通道（复用已认证的长连接），交易所不支持时仍使用 REST
+        self.use_ws_trade_api = config_manager.use_ws_trade_api()
+        self.ws_trade_timeout = config_manager.get_ws_trade_timeout()
 
     async def initialize(self):
         self.markets = await self.exchange.load_markets()
@@ -79,6 +107,61 @@ class PerpetualExchangeService(ExchangeInterface):
             if len(positions) > 0:
                 self.logger.info(f"{self.symbol}仓位信息: {positions}")
 
+        if self._positions_refresh_task is None:
+            self._positions_refresh_task = asyncio.create_task(self._refresh_positions_loop([self.symbol]))
+
+    async def _refresh_positions_loop(self, pairs: List[str]) -> None:
+        """
+        后台维护持仓快照，get_position 直接读取快照而不必每次请求交易所。
+
+        交易所支持持仓推送时由 watch_positions 更新快照，否则每 POSITION_REFRESH_INTERVAL 轮询一次。
+
+        参数:
+            pairs: 需要维护持仓的交易对列表。
+        """
+        await self._fetch_positions_snapshot(pairs)
+        if self.exchange.has.get('watchPositions'):
+            await self._stream_positions(pairs)
+        else:
+            await self._poll_positions(pairs)
+
+    async def _fetch_positions_snapshot(self, pairs: List[str]) -> None:
+        """通过 REST 查询一次持仓并整体替换快照"""
+        try:
+            positions = await self.exchange.fetch_positions(pairs)
+            positions_by_symbol = {position['symbol']: position for position in positions}
+            self._positions = {pair: positions_by_symbol.get(pair) for pair in pairs}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"Failed to refresh positions: {e}")
+
+    async def _stream_positions(self, pairs: List[str]) -> None:
+        """持续接收持仓推送更新快照，推送出错时等待 POSITION_REFRESH_INTERVAL 后用 REST 补一次快照再重新订阅"""
+        self._positions_streaming = True
+        try:
+            while True:
+                try:
+                    await self.watch_positions(pairs)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.warning(f"Error watching positions: {e}. Resubscribing in {self.POSITION_REFRESH_INTERVAL} seconds.")
+                    await asyncio.sleep(self.POSITION_REFRESH_INTERVAL)
+                    await self._fetch_positions_snapshot(pairs)
+        finally:
+            self._positions_streaming = False
+
+    async def _poll_positions(self, pairs: List[str]) -> None:
+        """交易所不支持持仓推送时定期轮询持仓，下单/撤单触发的刷新请求会提前唤醒"""
+        while True:
+            try:
+                await asyncio.wait_for(self._positions_refresh_requested.wait(), self.POSITION_REFRESH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            # 先清除刷新请求再查询，查询期间发生的下单/撤单会再触发一次刷新
+            self._positions_refresh_requested.clear()
+            await self._fetch_positions_snapshot(pairs)
 
     def _get_env_variable(self, key: str) -> str:
         value = os.getenv(key)
@@ -126,6 +209,7 @@ class PerpetualExchangeService(ExchangeInterface):
             try:
                 ticker = await self.exchange.watch_ticker(pair)
                 current_price: float = ticker['last']
+                self._last_price[pair] = (current_price, time.monotonic())
                 self.logger.info(f"Connected to WebSocket for {pair} ticker current price: {current_price}")
 
                 if not self.connection_active:
@@ -156,14 +240,13 @@ class PerpetualExchangeService(ExchangeInterface):
                 self.logger.error(f"WebSocket connection error: {e}. Reconnecting...")
                 await asyncio.sleep(5)
 
-            finally:
-                if not self.connection_active:
-                    try:
-                        self.logger.info("Connection to Websocket no longer active.")
-                        await self.exchange.close()
+        # 循环结束后只关闭一次交易所连接
+        try:
+            self.logger.info("Connection to Websocket no longer active.")
+            await self.exchange.close()
 
-                    except Exception as e:
-                        self.logger.error(f"Error while closing WebSocket connection: {e}", exc_info=True)
+        except Exception as e:
+            self.logger.error(f"Error while closing WebSocket connection: {e}", exc_info=True)
 
     async def listen_to_ticker_updates(
         self, 
@@ -175,6 +258,9 @@ class PerpetualExchangeService(ExchangeInterface):
 
     async def close_connection(self) -> None:
         self.connection_active = False
+        if self._positions_refresh_task is not None:
+            self._positions_refresh_task.cancel()
+            self._positions_refresh_task = None
         self.logger.info("Closing WebSocket connection...")
 
     async def get_balance(self) -> Dict[str, Any]:
@@ -185,7 +271,44 @@ class PerpetualExchangeService(ExchangeInterface):
         except BaseError as e:
             raise DataFetchError(f"Error fetching balance: {str(e)}")
     
+    async def watch_balance(self) -> Dict[str, Any]:
+        """等待交易所推送下一次合约账户余额更新"""
+        return await self.exchange.watch_balance({'type': 'swap'})
+
+    async def watch_positions(self, pairs: List[str]) -> List[Dict[str, Any]]:
+        """等待交易所推送下一次持仓更新，推送的持仓直接写入持仓快照，无需再请求交易所"""
+        positions = await self.exchange.watch_positions(pairs)
+        pushed = {position['symbol']: position for position in positions if position.get('symbol') in pairs}
+        if pushed:
+            self._positions = self._positions | pushed
+        return positions
+
+    def supports_order_stream(self) -> bool:
+        """交易所是否支持通过 WebSocket 推送订单状态更新"""
+        return bool(self.exchange.has.get('watchOrders'))
+
+    async def watch_orders(self, pair: str) -> List[Dict[str, Any]]:
+        """等待交易所推送下一批订单状态更新"""
+        try:
+            orders = await self.exchange.watch_orders(pair)
+        except ccxt.NotSupported as e:
+            raise UnsupportedExchangeError(f"Order stream is not supported by {self.exchange_name}: {str(e)}")
+        except BaseError as e:
+            raise DataFetchError(f"Error watching orders: {str(e)}")
+        self.invalidate_position_cache(pair)
+        return orders
+
+    def get_last_price(self, pair: str) -> Optional[float]:
+        """返回行情推送缓存的最新价，没有推送或已超过 LAST_PRICE_MAX_AGE 时返回 None"""
+        cached = self._last_price.get(pair)
+        if cached is not None and time.monotonic() - cached[1] < self.LAST_PRICE_MAX_AGE:
+            return cached[0]
+        return None
+
     async def get_current_price(self, pair: str) -> float:
+        last_price = self.get_last_price(pair)
+        if last_price is not None:
+            return last_price
         try:
             ticker = await self.exchange.fetch_ticker(pair)
             return ticker['last']
@@ -193,6 +316,43 @@ class PerpetualExchangeService(ExchangeInterface):
         except BaseError as e:
             raise DataFetchError(f"Error fetching current price: {str(e)}")
 
+    async def get_mark_price(self, pair: str) -> float:
+        """获取交易对的标记价格，交易所没有标记价格接口或未返回标记价格时使用最新成交价"""
+        try:
+            if self.exchange.has.get('fetchMarkPrice'):
+                ticker = await self.exchange.fetch_mark_price(pair)
+            else:
+                ticker = await self.exchange.fetch_ticker(pair)
+            return float(ticker.get('markPrice') or ticker['last'])
+
+        except BaseError as e:
+            raise DataFetchError(f"Error fetching mark price: {str(e)}")
+
+    async def _retry_on_rate_limit(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行交易所请求，被限频（RateLimitExceeded / DDoSProtection）时按指数退避重试。
+
+        请求本身的节流由 ccxt 的 enableRateLimit 负责，这里只处理仍被交易所拒绝的情况。
+
+        参数:
+            request: 每次调用返回一个新的请求协程。
+        返回:
+            请求结果。
+        """
+        delay = self.RATE_LIMIT_BACKOFF
+        for attempt in range(self.RATE_LIMIT_MAX_RETRIES):
+            try:
+                return await request()
+            except (RateLimitExceeded, DDoSProtection) as e:
+                self.logger.warning("Rate limited by %s (attempt %s/%s): %s. Retrying in %s seconds.", self.exchange_name, attempt + 1, self.RATE_LIMIT_MAX_RETRIES, e, delay)
+                await asyncio.sleep(delay)
+                delay *= 2
+        return await request()
+
+    def _use_ws(self, capability: str) -> bool:
+        """是否通过 WebSocket 交易通道执行指定操作（需开启 use_ws_trade_api 且交易所支持）"""
+        return self.use_ws_trade_api and bool(self.exchange.has.get(capability))
+
     async def place_order(
         self, 
         pair: str,
@@ -203,9 +363,16 @@ class PerpetualExchangeService(ExchangeInterface):
     ) -> Dict[str, Union[str, float]]:
         try:
             correct_amount = self.exchange.amount_to_precision(pair, amount)
-            order = await self.exchange.create_order(pair, order_type, order_side, correct_amount, price)
+            if self._use_ws('createOrderWs'):
+                order = await self._create_order_ws(pair, order_type, order_side, correct_amount, price)
+            else:
+                order = await self._retry_on_rate_limit(lambda: self.exchange.create_order(pair, order_type, order_side, correct_amount, price))
+            self.invalidate_position_cache(pair)
             return order
 
+        except DataFetchError:
+            raise
+
         except NetworkError as e:
             raise DataFetchError(f"Network issue occurred while placing order: {str(e)}")
 
@@ -215,6 +382,67 @@ class PerpetualExchangeService(ExchangeInterface):
         except Exception as e:
             raise DataFetchError(f"Unexpected error placing order: {str(e)}")
 
+    async def _create_order_ws(
+        self,
+        pair: str,
+        order_type: str,
+        order_side: str,
+        amount: str,
+        price: Optional[float]
+    ) -> Dict[str, Union[str, float]]:
+        """
+        通过 WebSocket 交易通道下单。
+
+        每笔订单带上客户端订单ID。超过 ws_trade_timeout 未收到回报时订单可能已经提交，先按该ID查询：
+        查到则直接返回；确认不存在时再通过 REST 以同一ID下单（交易所会拒绝重复的客户端订单ID）；
+        查询失败时无法确认订单状态，抛出 DataFetchError 且不重试，避免重复下单。
+        """
+        params = {'clientOrderId': uuid.uuid4().hex}
+        try:
+            return await self._retry_on_rate_limit(lambda: asyncio.wait_for(self.exchange.create_order_ws(pair, order_type, order_side, amount, price, params), self.ws_trade_timeout))
+        except asyncio.TimeoutError:
+            self.logger.warning(f"WebSocket order {params['clientOrderId']} on {pair} timed out after {self.ws_trade_timeout}s, checking whether it was placed.")
+
+        try:
+            return await self.exchange.fetch_order(params['clientOrderId'], pair, params)
+        except OrderNotFound:
+            self.logger.info(f"Order {params['clientOrderId']} was not placed over WebSocket, placing it over REST.")
+        except BaseError as e:
+            raise DataFetchError(f"WebSocket order {params['clientOrderId']} timed out and its status could not be confirmed: {str(e)}")
+        return await self._retry_on_rate_limit(lambda: self.exchange.create_order(pair, order_type, order_side, amount, price, params))
+
+    def supports_batch_orders(self) -> bool:
+        """交易所是否支持批量下单接口"""
+        return bool(self.exchange.has.get('createOrders'))
+
+    async def place_orders(
+        self,
+        orders: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        通过交易所批量下单接口一次提交多笔订单。
+
+        参数:
+            orders: 订单列表，每项包含 symbol、type、side、amount、price。
+        返回:
+            与 orders 一一对应的订单结果，被交易所拒绝的订单没有 id。
+        """
+        try:
+            requests = [{**order, 'amount': self.exchange.amount_to_precision(order['symbol'], order['amount'])} for order in orders]
+            orders = await self._retry_on_rate_limit(lambda: self.exchange.create_orders(requests))
+            for pair in {request['symbol'] for request in requests}:
+                self.invalidate_position_cache(pair)
+            return orders
+
+        except NetworkError as e:
+            raise DataFetchError(f"Network issue occurred while placing batch orders: {str(e)}")
+
+        except BaseError as e:
+            raise DataFetchError(f"Error placing batch orders: {str(e)}")
+
+        except Exception as e:
+            raise DataFetchError(f"Unexpected error placing batch orders: {str(e)}")
+
     async def fetch_order(
         self, 
         order_id: str,
@@ -232,6 +460,20 @@ class PerpetualExchangeService(ExchangeInterface):
         except Exception as e:
             raise DataFetchError(f"Failed to fetch order status: {str(e)}")
 
+    async def fetch_open_orders(self, pair: str) -> List[Dict[str, Any]]:
+        """一次请求获取交易对的全部未成交订单"""
+        try:
+            return await self.exchange.fetch_open_orders(pair)
+
+        except ccxt.NotSupported as e:
+            raise UnsupportedExchangeError(f"Fetching open orders is not supported by {self.exchange_name}: {str(e)}")
+
+        except NetworkError as e:
+            raise DataFetchError(f"Network issue occurred while fetching open orders: {str(e)}")
+
+        except BaseError as e:
+            raise DataFetchError(f"Exchange-specific error occurred: {str(e)}")
+
     async def cancel_order(
         self, 
         order_id: str, 
@@ -239,8 +481,12 @@ class PerpetualExchangeService(ExchangeInterface):
     ) -> dict:
         try:
             self.logger.info(f"Attempting to cancel order {order_id} for pair {pair}")
-            cancellation_result = await self.exchange.cancel_order(order_id, pair)
-            
+            if self._use_ws('cancelOrderWs'):
+                cancellation_result = await self._retry_on_rate_limit(lambda: asyncio.wait_for(self.exchange.cancel_order_ws(order_id, pair), self.ws_trade_timeout))
+            else:
+                cancellation_result = await self._retry_on_rate_limit(lambda: self.exchange.cancel_order(order_id, pair))
+            self.invalidate_position_cache(pair)
+
             if cancellation_result['status'] in ['canceled', 'closed']:
                 self.logger.info(f"Order {order_id} successfully canceled.")
                 return cancellation_result
@@ -317,20 +563,47 @@ class PerpetualExchangeService(ExchangeInterface):
             raise DataFetchError(f"Failed to fetch positions: {str(e)}")
 
     async def get_position(self, pair: str):
-        """获取当前持仓信息"""
+        """获取当前持仓信息，优先读取后台维护的持仓快照，快照中没有时请求交易所并写入快照"""
+        positions = self._positions
+        if pair in positions:
+            return positions[pair]
         try:
             position = await self.exchange.fetch_position(pair)
-            return position
         except Exception as e:
             raise DataFetchError(f"Failed to fetch positions: {str(e)}")
+        self._positions = self._positions | {pair: position}
+        return position
+
+    def invalidate_position_cache(self, pair: Optional[str] = None) -> None:
+        """
+        下单或撤单后调用，保证下一次查询拿到最新持仓。
+
+        持仓快照由推送维护时，持仓变化会随推送到达，不做任何处理；
+        轮询模式下从快照中移除该交易对并触发一次后台刷新。
+
+        参数:
+            pair: 交易对，为 None 时清除全部快照。
+        """
+        if self._positions_streaming:
+            return
+        if pair is None:
+            self._positions = {}
+        elif pair in self._positions:
+            self._positions = {key: position for key, position in self._positions.items() if key != pair}
+        self._positions_refresh_requested.set()
 
     async def get_funding_rate(self, pair: str) -> float:
-        """获取当前资金费率"""
+        """获取当前资金费率，FUNDING_RATE_CACHE_TTL 内的重复查询直接返回缓存结果"""
+        cached = self._funding_rate_cache.get(pair)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
         try:
             funding_rate = await self.exchange.fetch_funding_rate(pair)
-            return float(funding_rate['fundingRate'])
+            rate = float(funding_rate['fundingRate'])
         except Exception as e:
             raise DataFetchError(f"Failed to fetch funding rate: {str(e)}")
+        self._funding_rate_cache[pair] = (rate, time.monotonic() + self.FUNDING_RATE_CACHE_TTL)
+        return rate
 
     async def get_leverage_brackets(self, pair: str) -> Dict[str, Any]:
         """获取杠杆档位信息"""
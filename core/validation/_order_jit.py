@@ -0,0 +1,51 @@
+"""
+OrderValidator 的数值内核。
+
+与 _perp_jit 相同，买入/卖出数量调整中的纯浮点运算抽成不依赖 self 的自由函数，
+安装 numba 时会被编译为机器码，返回值中的错误码由 OrderValidator 转换为对应异常。
+"""
+
+from utils.jit import njit, KERNEL_OPTIONS
+
+# 错误码
+OK = 0
+ERR_FAR_BELOW = 1  # 余额远低于所需金额/数量
+ERR_INSUFFICIENT = 2  # 调整数量后余额仍不足
+
+
+@njit(**KERNEL_OPTIONS)
+def _buy_core(tolerance: float, inv_threshold_ratio: float, balance: float, order_quantity: float, price: float):
+    """
+    按可用余额调整买入数量。
+
+    返回:
+        (调整后的数量, 错误码)
+    """
+    # balance < total_cost * threshold_ratio 两边同除以阈值比例，改为乘以预先计算的倒数
+    if balance * inv_threshold_ratio < order_quantity * price:
+        return 0.0, ERR_FAR_BELOW
+
+    # 数量取请求数量与余额（减去容忍度）可买数量中的较小值，余额足够时即为原始数量
+    # 两数比较用条件表达式代替 min/max，未编译时省去内置函数调用（NaN 时的取值与 min/max 相同）
+    affordable_quantity = (balance - tolerance) / price
+    if affordable_quantity < 0.0:
+        affordable_quantity = 0.0
+    adjusted_quantity = affordable_quantity if affordable_quantity < order_quantity else order_quantity
+    # 下调后的成本即 balance - tolerance，直接比较余额
+    if adjusted_quantity < order_quantity and balance < 2.0 * tolerance:
+        return adjusted_quantity, ERR_INSUFFICIENT
+    return adjusted_quantity, OK
+
+
+@njit(**KERNEL_OPTIONS)
+def _sell_core(tolerance: float, inv_threshold_ratio: float, crypto_balance: float, order_quantity: float):
+    """
+    按可用加密货币余额调整卖出数量。
+
+    返回:
+        (调整后的数量, 错误码)
+    """
+    if crypto_balance * inv_threshold_ratio < order_quantity:
+        return 0.0, ERR_FAR_BELOW
+    available_quantity = crypto_balance - tolerance
+    return (available_quantity if available_quantity < order_quantity else order_quantity), OK
@@ -0,0 +1,45 @@
+"""
+永续合约订单验证的数值内核。
+
+网格初始化和每次挂单都会调用开仓数量调整，这里把纯浮点运算抽成不依赖 self 的自由函数，
+安装 numba 时会被编译为机器码，返回值中的错误码由 PerpetualOrderValidator 转换为对应异常。
+"""
+
+from utils.jit import njit, KERNEL_OPTIONS
+
+# 错误码
+OK = 0
+ERR_FAR_BELOW = 1  # 保证金余额远低于所需保证金
+ERR_INSUFFICIENT = 2  # 调整数量后保证金仍不足
+ERR_MARGIN_RATIO = 3  # 开仓后保证金率低于维持保证金率
+
+
+@njit(**KERNEL_OPTIONS)
+def _open_core(tolerance: float, threshold_ratio: float, maintenance_margin_rate: float, margin_balance: float, order_quantity: float, price: float, inv_leverage: float):
+    """
+    按可用保证金调整开仓数量（多空相同），并检查开仓后的保证金率。
+
+    前三个参数是校验器初始化后不再变化的配置，放在最前面以便用 functools.partial 预先绑定；
+    杠杆以倒数 inv_leverage 传入，内核中只做乘法；数量不大于 0 时不计算保证金率，交由调用方的合约数量校验处理。
+
+    返回:
+        (调整后的数量, 错误码)
+    """
+    required_margin = order_quantity * price * inv_leverage
+    if margin_balance < required_margin * threshold_ratio:
+        return 0.0, ERR_FAR_BELOW
+
+    # 数量取请求数量与保证金（减去容忍度）可开数量中的较小值，保证金足够时即为原始数量
+    # 两数比较用条件表达式代替 min/max，未编译时省去内置函数调用（NaN 时的取值与 min/max 相同）
+    affordable_quantity = (margin_balance - tolerance) / (price * inv_leverage)
+    if affordable_quantity < 0.0:
+        affordable_quantity = 0.0
+    adjusted_quantity = affordable_quantity if affordable_quantity < order_quantity else order_quantity
+    # 下调后占用的保证金即 margin_balance - tolerance，直接比较余额，省去除后再乘带来的舍入误差
+    if adjusted_quantity < order_quantity and margin_balance < 2.0 * tolerance:
+        return adjusted_quantity, ERR_INSUFFICIENT
+
+    if adjusted_quantity > 0 and margin_balance / (adjusted_quantity * price * inv_leverage) < maintenance_margin_rate:
+        return adjusted_quantity, ERR_MARGIN_RATIO
+
+    return adjusted_quantity, OK
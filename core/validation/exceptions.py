@@ -1,10 +1,44 @@
-class InsufficientBalanceError(Exception):
+from typing import Dict
+
+
+class _LazyMessageError(Exception):
+    """
+    Base class for validation errors raised on hot paths.
+
+    Only a reason code and the related values are stored (as attributes); the message is
+    formatted from a template when str() is called. Reasons without a template are treated
+    as a plain message, so these errors can still be raised with an ordinary string.
+
+    A new instance is raised every time. Instances are not pre-allocated and reused, because
+    validators run from concurrent coroutines and every raise rewrites __traceback__ and
+    __context__ on the instance it raises.
+    """
+    _MESSAGES: Dict[str, str] = {}
+
+    def __init__(self, reason: str, **fields):
+        super().__init__(reason)
+        self.reason = reason
+        self.fields = fields
+        self.__dict__.update(fields)
+
+    def __str__(self) -> str:
+        template = self._MESSAGES.get(self.reason)
+        if template is None:
+            return self.reason
+        return template.format(**self.fields)
+
+class InsufficientBalanceError(_LazyMessageError):
     """Raised when balance is insufficient to place a buy or sell order."""
-    pass
+    _MESSAGES = {
+        "far_below": "Balance {balance:.2f} is far below the required cost {total_cost:.2f} (threshold ratio: {threshold_ratio}).",
+        "insufficient": "Insufficient balance: {balance:.2f} to place any buy order at price {price:.2f}.",
+    }
 
-class InsufficientCryptoBalanceError(Exception):
+class InsufficientCryptoBalanceError(_LazyMessageError):
     """Raised when crypto balance is insufficient to complete a sell order."""
-    pass
+    _MESSAGES = {
+        "far_below": "Crypto balance {crypto_balance:.6f} is far below the required quantity {order_quantity:.6f} (threshold ratio: {threshold_ratio}).",
+    }
 
 class InvalidOrderQuantityError(Exception):
     """Raised when order quantity (amount) is invalid."""
@@ -12,4 +46,4 @@ class InvalidOrderQuantityError(Exception):
 
 class InsufficientMarginError(Exception):
     """Raised when margin is insufficient to place a buy or sell order."""
-    pass
\ No newline at end of file
+    pass
@@ -1,8 +1,11 @@
 from .exceptions import InsufficientBalanceError, InsufficientCryptoBalanceError, InvalidOrderQuantityError
+from ._order_jit import _buy_core, _sell_core, ERR_FAR_BELOW, ERR_INSUFFICIENT
 """
 OrderValidator 类是网格交易策略中用于验证和调整订单数量的关键组件，确保订单在执行前不会超出可用余额或资产的限制。
 """
 class OrderValidator:
+    __slots__ = ('tolerance', 'threshold_ratio', '_inv_tr')
+
     def __init__(self, tolerance: float = 1e-6, threshold_ratio: float = 0.5):
         """
         使用指定的容忍度和阈值初始化 OrderValidator。
@@ -13,6 +16,8 @@ class OrderValidator:
         """
         self.tolerance = tolerance
         self.threshold_ratio = threshold_ratio
+        # 阈值比例的倒数，提前触发不足错误的判断改为 余额 * _inv_tr < 所需金额/数量；比例为 0 时永不触发
+        self._inv_tr = 1.0 / threshold_ratio if threshold_ratio else float('inf')
 
     def adjust_and_validate_buy_quantity(self, balance: float, order_quantity: float, price: float) -> float:
         """
@@ -30,18 +35,14 @@ class OrderValidator:
             InsufficientBalanceError: 如果余额不足以放置任何有效订单。
             InvalidOrderQuantityError: 如果调整后的数量无效。
         """
-        total_cost = order_quantity * price# 计算订单总成本
-        # 如果余额远低于总成本，提前抛出错误
-        if balance < total_cost * self.threshold_ratio:
-            raise InsufficientBalanceError(f"Balance {balance:.2f} is far below the required cost {total_cost:.2f} (threshold ratio: {self.threshold_ratio}).")
-        # 如果总成本超过余额，调整数量
-        if total_cost > balance:
-            adjusted_quantity = max((balance - self.tolerance) / price, 0)
-            # 如果调整后的数量为 0 或订单成本小于容忍度，抛出错误
-            if adjusted_quantity <= 0 or (adjusted_quantity * price) < self.tolerance:
-                raise InsufficientBalanceError(f"Insufficient balance: {balance:.2f} to place any buy order at price {price:.2f}.")
-        else:
-            adjusted_quantity = order_quantity# 如果余额足够，保持原始数量
+        # 数量调整的数值计算在 _buy_core 中完成，这里只负责把错误码转换为异常
+        adjusted_quantity, error_code = _buy_core(self.tolerance, self._inv_tr, float(balance), float(order_quantity), float(price))
+        # 如果余额远低于总成本，提前抛出错误（错误信息在 str() 时才格式化）
+        if error_code == ERR_FAR_BELOW:
+            raise InsufficientBalanceError("far_below", balance=balance, total_cost=order_quantity * price, threshold_ratio=self.threshold_ratio)
+        # 如果数量被下调后订单成本小于容忍度（包括调整为 0），抛出错误
+        if error_code == ERR_INSUFFICIENT:
+            raise InsufficientBalanceError("insufficient", balance=balance, price=price)
 
         self._validate_quantity(adjusted_quantity, is_buy=True)# 验证调整后的数量
         return adjusted_quantity# 返回调整后的数量
@@ -61,14 +62,11 @@ class OrderValidator:
             InsufficientCryptoBalanceError: 如果加密货币余额不足以放置任何有效订单。
             InvalidOrderQuantityError: 如果调整后的数量无效。
         """
+        # 调整数量为请求数量和可用余额（减去容忍度）中的较小值，计算在 _sell_core 中完成
+        adjusted_quantity, error_code = _sell_core(self.tolerance, self._inv_tr, float(crypto_balance), float(order_quantity))
         # 如果加密货币余额远低于请求的数量，提前抛出错误
-        if crypto_balance < order_quantity * self.threshold_ratio:
-            raise InsufficientCryptoBalanceError(
-                f"Crypto balance {crypto_balance:.6f} is far below the required quantity {order_quantity:.6f} "
-                f"(threshold ratio: {self.threshold_ratio})."
-            )
-        # 调整数量为请求数量和可用余额（减去容忍度）中的较小值
-        adjusted_quantity = min(order_quantity, crypto_balance - self.tolerance)
+        if error_code == ERR_FAR_BELOW:
+            raise InsufficientCryptoBalanceError("far_below", crypto_balance=crypto_balance, order_quantity=order_quantity, threshold_ratio=self.threshold_ratio)
         self._validate_quantity(adjusted_quantity, is_buy=False)# 验证调整后的数量
         return adjusted_quantity# 返回调整后的数量
 
@@ -1,17 +1,30 @@
 """永续合约交易相关的异常类型定义"""
 
-class InsufficientMarginError(Exception):
+from .exceptions import _LazyMessageError
+
+
+class InsufficientMarginError(_LazyMessageError):
     """保证金不足异常"""
-    pass
+    _MESSAGES = {
+        "far_below": "Margin balance {margin_balance:.2f} is far below the required margin {required_margin:.2f} (threshold ratio: {threshold_ratio}).",
+        "insufficient": "Insufficient margin: {margin_balance:.2f} to open {side} position at price {price:.2f}.",
+    }
 
-class InsufficientPositionError(Exception):
+class InsufficientPositionError(_LazyMessageError):
     """持仓不足异常，用于平仓时持仓数量不足的情况"""
-    pass
+    _MESSAGES = {
+        "far_below": "{label} position {position:.6f} is far below the required quantity {order_quantity:.6f} (threshold ratio: {threshold_ratio}).",
+    }
 
-class InvalidContractQuantityError(Exception):
+class InvalidContractQuantityError(_LazyMessageError):
     """无效的合约数量异常，用于合约张数不符合要求的情况"""
-    pass
+    _MESSAGES = {
+        "non_positive": "Invalid contract quantity: {quantity:.6f}, must be greater than zero",
+        "below_minimum": "Invalid contract quantity: {quantity:.6f}, minimum contract size: {min_contract_size}",
+    }
 
-class MarginRatioError(Exception):
+class MarginRatioError(_LazyMessageError):
     """保证金率异常，用于开仓后保证金率低于维持保证金率的情况"""
-    pass
\ No newline at end of file
+    _MESSAGES = {
+        "below_maintenance": "Opening position would result in margin ratio {margin_ratio:.4f} below maintenance margin rate {maintenance_margin_rate}",
+    }
@@ -1,9 +1,13 @@
+from functools import partial
 from .perpetual_exceptions import InsufficientMarginError, InsufficientPositionError, InvalidContractQuantityError, MarginRatioError
+from ._perp_jit import _open_core, ERR_FAR_BELOW, ERR_INSUFFICIENT, ERR_MARGIN_RATIO
 
 """
 PerpetualOrderValidator 类是永续合约交易中用于验证和调整订单数量的关键组件，确保订单在执行前满足保证金要求、持仓限制和合约规格。
 """
 class PerpetualOrderValidator:
+    __slots__ = ('tolerance', 'threshold_ratio', 'maintenance_margin_rate', 'min_contract_size', '_leverage', '_inv_leverage', '_open_kernel')
+
     def __init__(self, tolerance: float = 1e-6, threshold_ratio: float = 0.5,
                  maintenance_margin_rate: float = 0.005, min_contract_size: float = 0.001):
         """
@@ -19,6 +23,11 @@ class PerpetualOrderValidator:
         self.threshold_ratio = threshold_ratio
         self.maintenance_margin_rate = maintenance_margin_rate
         self.min_contract_size = min_contract_size
+        # 最近一次使用的杠杆及其倒数，杠杆在运行期间通常不变，避免每次调用都做除法
+        self._leverage = 1.0
+        self._inv_leverage = 1.0
+        # 预先绑定不变的配置参数，每次开仓校验只需传入随行情变化的数值
+        self._open_kernel = partial(_open_core, float(tolerance), float(threshold_ratio), float(maintenance_margin_rate))
 
     def adjust_and_validate_open_long(self, margin_balance: float, order_quantity: float,
                                      price: float, leverage: float) -> float:
@@ -39,28 +48,7 @@ class PerpetualOrderValidator:
             InvalidContractQuantityError: 如果调整后的数量无效。
             MarginRatioError: 如果开仓后保证金率低于维持保证金率。
         """
-        required_margin = (order_quantity * price) / leverage
-        # 如果保证金余额远低于所需保证金，提前抛出错误
-        if margin_balance < required_margin * self.threshold_ratio:
-            raise InsufficientMarginError(
-                f"Margin balance {margin_balance:.2f} is far below the required margin {required_margin:.2f} "
-                f"(threshold ratio: {self.threshold_ratio})."
-            )
-
-        # 如果保证金不足，调整数量
-        if required_margin > margin_balance:
-            adjusted_quantity = max((margin_balance - self.tolerance) * leverage / price, 0)
-            # 如果调整后的数量为 0 或保证金小于容忍度，抛出错误
-            if adjusted_quantity <= 0 or (adjusted_quantity * price / leverage) < self.tolerance:
-                raise InsufficientMarginError(
-                    f"Insufficient margin: {margin_balance:.2f} to open long position at price {price:.2f}."
-                )
-        else:
-            adjusted_quantity = order_quantity
-
-        self._validate_contract_quantity(adjusted_quantity)
-        self._check_margin_ratio(margin_balance, adjusted_quantity, price, leverage)
-        return adjusted_quantity
+        return self._open("long", margin_balance, order_quantity, price, leverage)
 
     def adjust_and_validate_open_short(self, margin_balance: float, order_quantity: float,
                                       price: float, leverage: float) -> float:
@@ -81,29 +69,39 @@ class PerpetualOrderValidator:
             InvalidContractQuantityError: 如果调整后的数量无效。
             MarginRatioError: 如果开仓后保证金率低于维持保证金率。
         """
-        required_margin = (order_quantity * price) / leverage
+        return self._open("short", margin_balance, order_quantity, price, leverage)
+
+    def _open(self, side_str: str, margin_balance: float, order_quantity: float, price: float, leverage: float) -> float:
+        """
+        开多仓与开空仓共用的数量调整和验证逻辑，两者只有错误信息中的持仓方向不同。
+
+        参数:
+            side_str (str): 持仓方向（long/short），用于错误信息。
+        """
+        inv_leverage = self._inverse_leverage(leverage)
+        # 数量调整和保证金率的数值计算在 _open_core 中完成，这里只负责把错误码转换为异常
+        adjusted_quantity, error_code = self._open_kernel(float(margin_balance), float(order_quantity), float(price), inv_leverage)
         # 如果保证金余额远低于所需保证金，提前抛出错误
-        if margin_balance < required_margin * self.threshold_ratio:
-            raise InsufficientMarginError(
-                f"Margin balance {margin_balance:.2f} is far below the required margin {required_margin:.2f} "
-                f"(threshold ratio: {self.threshold_ratio})."
-            )
-
-        # 如果保证金不足，调整数量
-        if required_margin > margin_balance:
-            adjusted_quantity = max((margin_balance - self.tolerance) * leverage / price, 0)
-            # 如果调整后的数量为 0 或保证金小于容忍度，抛出错误
-            if adjusted_quantity <= 0 or (adjusted_quantity * price / leverage) < self.tolerance:
-                raise InsufficientMarginError(
-                    f"Insufficient margin: {margin_balance:.2f} to open short position at price {price:.2f}."
-                )
-        else:
-            adjusted_quantity = order_quantity
+        if error_code == ERR_FAR_BELOW:
+            required_margin = order_quantity * price * inv_leverage
+            raise InsufficientMarginError("far_below", margin_balance=margin_balance, required_margin=required_margin, threshold_ratio=self.threshold_ratio)
+        # 如果调整后的数量为 0 或保证金小于容忍度，抛出错误
+        if error_code == ERR_INSUFFICIENT:
+            raise InsufficientMarginError("insufficient", margin_balance=margin_balance, side=side_str, price=price)
 
         self._validate_contract_quantity(adjusted_quantity)
-        self._check_margin_ratio(margin_balance, adjusted_quantity, price, leverage)
+        # 合约数量校验先于保证金率检查，与逐步校验时的报错顺序一致
+        if error_code == ERR_MARGIN_RATIO:
+            self._check_margin_ratio(margin_balance, adjusted_quantity * price, inv_leverage)
         return adjusted_quantity
 
+    def _inverse_leverage(self, leverage: float) -> float:
+        """返回杠杆倍数的倒数，杠杆在运行期间通常不变，只在杠杆变化时重新计算"""
+        if leverage != self._leverage:
+            self._leverage = leverage
+            self._inv_leverage = 1.0 / leverage
+        return self._inv_leverage
+
     def adjust_and_validate_close_long(self, long_position: float, order_quantity: float) -> float:
         """
         调整和验证平多仓订单数量，确保有足够的持仓。
@@ -119,17 +117,7 @@ class PerpetualOrderValidator:
             InsufficientPositionError: 如果持仓不足以平仓。
             InvalidContractQuantityError: 如果调整后的数量无效。
         """
-        # 如果持仓量远低于请求的平仓数量，提前抛出错误
-        if long_position < order_quantity * self.threshold_ratio:
-            raise InsufficientPositionError(
-                f"Long position {long_position:.6f} is far below the required quantity {order_quantity:.6f} "
-                f"(threshold ratio: {self.threshold_ratio})."
-            )
-
-        # 调整数量为请求数量和可用持仓量中的较小值
-        adjusted_quantity = min(order_quantity, long_position - self.tolerance)
-        self._validate_contract_quantity(adjusted_quantity)
-        return adjusted_quantity
+        return self._close("Long", long_position, order_quantity)
 
     def adjust_and_validate_close_short(self, short_position: float, order_quantity: float) -> float:
         """
@@ -146,8 +134,25 @@ class PerpetualOrderValidator:
             InsufficientPositionError: 如果持仓不足以平仓。
             InvalidContractQuantityError: 如果调整后的数量无效。
         """
-        # 平空仓的逻辑与平多仓类似
-        return self.adjust_and_validate_close_long(short_position, order_quantity)
+        return self._close("Short", short_position, order_quantity)
+
+    def _close(self, label: str, position: float, order_quantity: float) -> float:
+        """
+        平多仓与平空仓共用的数量调整和验证逻辑。
+
+        参数:
+            label (str): 持仓方向（Long/Short），用于错误信息。
+        """
+        tr = self.threshold_ratio
+        # 如果持仓量远低于请求的平仓数量，提前抛出错误
+        if position < order_quantity * tr:
+            raise InsufficientPositionError("far_below", label=label, position=position, order_quantity=order_quantity, threshold_ratio=tr)
+
+        # 调整数量为请求数量和可用持仓量中的较小值
+        available_quantity = position - self.tolerance
+        adjusted_quantity = available_quantity if available_quantity < order_quantity else order_quantity
+        self._validate_contract_quantity(adjusted_quantity)
+        return adjusted_quantity
 
     def _validate_contract_quantity(self, quantity: float) -> None:
         """
@@ -159,35 +164,26 @@ class PerpetualOrderValidator:
         抛出:
             InvalidContractQuantityError: 如果数量小于等于0或小于最小合约张数。
         """
-        if quantity <= 0:
-            raise InvalidContractQuantityError(
-                f"Invalid contract quantity: {quantity:.6f}, must be greater than zero"
-            )
+        # min_contract_size 大于 0，一次比较即可同时覆盖非正数量；只在报错时再区分原因
         if quantity < self.min_contract_size:
-            raise InvalidContractQuantityError(
-                f"Invalid contract quantity: {quantity:.6f}, minimum contract size: {self.min_contract_size}"
-            )
+            if quantity <= 0:
+                raise InvalidContractQuantityError("non_positive", quantity=quantity)
+            raise InvalidContractQuantityError("below_minimum", quantity=quantity, min_contract_size=self.min_contract_size)
 
-    def _check_margin_ratio(self, margin_balance: float, order_quantity: float,
-                           price: float, leverage: float) -> None:
+    def _check_margin_ratio(self, margin_balance: float, notional: float, inv_leverage: float) -> None:
         """
         检查开仓后的保证金率是否满足要求。
 
         参数:
             margin_balance (float): 可用保证金余额。
-            order_quantity (float): 开仓数量。
-            price (float): 合约当前价格。
-            leverage (float): 杠杆倍数。
+            notional (float): 开仓名义价值（数量 * 价格）。
+            inv_leverage (float): 杠杆倍数的倒数。
 
         抛出:
             MarginRatioError: 如果开仓后保证金率低于维持保证金率。
         """
-        position_value = order_quantity * price
         # 考虑杠杆因素计算实际保证金率
-        margin_ratio = margin_balance / (position_value / leverage)
+        margin_ratio = margin_balance / (notional * inv_leverage)
 
         if margin_ratio < self.maintenance_margin_rate:
-            raise MarginRatioError(
-                f"Opening position would result in margin ratio {margin_ratio:.4f} below "
-                f"maintenance margin rate {self.maintenance_margin_rate}"
-            )
\ No newline at end of file
+            raise MarginRatioError("below_maintenance", margin_ratio=margin_ratio, maintenance_margin_rate=self.maintenance_margin_rate)
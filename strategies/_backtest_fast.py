@@ -0,0 +1,39 @@
+"""
+回测主循环的数值内核。
+
+网格触发前的K线没有任何成交，只需要找到触发位置并按不变的余额计算账户价值，
+这部分与异步下单无关，抽成不依赖 self 的自由函数；安装 numba 时编译为单次遍历的机器码，
+未安装时使用等价的 NumPy 向量化实现。
+"""
+
+import numpy as np
+from utils.jit import njit, NUMBA_AVAILABLE, KERNEL_OPTIONS
+
+
+if NUMBA_AVAILABLE:
+    @njit(**KERNEL_OPTIONS)
+    def _scan_bars(close: np.ndarray, trigger_price: float, fiat_balance: float, crypto_balance: float, acct_out: np.ndarray) -> int:
+        """
+        找到网格触发的K线下标，并把触发前各K线的账户价值写入 acct_out。
+
+        网格在第一根收盘价低于触发价的K线上初始化（第一根K线没有上一价格，不会触发）。
+
+        返回:
+            int: 触发K线的下标，未触发时为K线数量。
+        """
+        n = close.shape[0]
+        trigger_idx = n
+        for i in range(1, n):
+            if close[i] < trigger_price:
+                trigger_idx = i
+                break
+        for i in range(trigger_idx):
+            acct_out[i] = fiat_balance + crypto_balance * close[i]
+        return trigger_idx
+else:
+    def _scan_bars(close: np.ndarray, trigger_price: float, fiat_balance: float, crypto_balance: float, acct_out: np.ndarray) -> int:
+        """与 numba 版本相同，逐元素循环改为 NumPy 向量运算"""
+        trigger_mask = close[1:] < trigger_price
+        trigger_idx = int(np.argmax(trigger_mask)) + 1 if trigger_mask.any() else close.shape[0]
+        acct_out[:trigger_idx] = fiat_balance + crypto_balance * close[:trigger_idx]
+        return trigger_idx
@@ -0,0 +1,112 @@
+"""
+绩效分析的数值内核。
+
+最大回撤、最大涨幅、盈利/亏损点数以及夏普/索提诺比率所需的超额收益统计量都只依赖账户价值数组，
+抽成不依赖 self 的自由函数；安装 numba 时编译为对账户价值的单次遍历，
+未安装时使用等价的 NumPy 向量化实现。
+
+账户价值中的 NaN（止盈止损提前结束回测后的K线）在各项统计中都被跳过，
+因此 numba 版本不开启 fastmath（fastmath 假定不存在 NaN，会把 NaN 判断优化掉）。
+"""
+
+from typing import Tuple
+import numpy as np
+from utils.jit import njit, NUMBA_AVAILABLE
+
+# (最大回撤%, 最大涨幅%, 盈利点数, 有效点数, 是否退化, 超额收益均值, 超额收益标准差, 下行偏差)
+EquityCurveStats = Tuple[float, float, int, int, bool, float, float, float]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False, error_model='numpy')
+    def _equity_curve_stats(v: np.ndarray, initial_balance: float, rf_daily: float) -> EquityCurveStats:
+        """
+        对账户价值做一次遍历，同时更新累计最高/最低值、回撤/涨幅、盈利点数和对数超额收益。
+
+        有效点数不足 3 个或账户价值恒定时视为退化序列，调用方不再使用收益率统计量。
+        超额收益的均值和标准差（ddof=1）用 Welford 算法在同一次遍历中累计，无需缓存收益率，
+        也避免了平方和相减在收益率很小时的精度损失；下行偏差只需累计负超额收益的平方和。
+
+        返回:
+            EquityCurveStats: 见模块中 EquityCurveStats 的说明，收益率不足时均值/标准差为 NaN。
+        """
+        n = v.shape[0]
+        peak = np.nan
+        trough = np.nan
+        max_drawdown = np.nan
+        max_runup = np.nan
+        num_profit = 0
+        num_valid = 0
+
+        num_returns = 0
+        mean_excess = np.nan
+        sum_sq_dev = 0.0
+        downside_sum_sq = 0.0
+        num_downside = 0
+        prev_log = np.nan
+
+        for i in range(n):
+            x = v[i]
+            if x == x:
+                num_valid += 1
+                if x > initial_balance:
+                    num_profit += 1
+                # 累计最高/最低值与 np.fmax/np.fmin.accumulate 一致，跳过 NaN
+                if peak != peak or x > peak:
+                    peak = x
+                if trough != trough or x < trough:
+                    trough = x
+                drawdown = (peak - x) / peak * 100
+                if max_drawdown != max_drawdown or drawdown > max_drawdown:
+                    max_drawdown = drawdown
+                runup = (x - trough) / trough * 100
+                if max_runup != max_runup or runup > max_runup:
+                    max_runup = runup
+
+            # 相邻两点的对数收益率，任一端为 NaN 时跳过（与 np.diff(np.log(v)) 后去掉 NaN 一致）
+            cur_log = np.log(x)
+            if i > 0:
+                excess = cur_log - prev_log - rf_daily
+                if excess == excess:
+                    num_returns += 1
+                    if num_returns == 1:
+                        mean_excess = excess
+                    else:
+                        delta = excess - mean_excess
+                        mean_excess += delta / num_returns
+                        sum_sq_dev += delta * (excess - mean_excess)
+                    if excess < 0:
+                        downside_sum_sq += excess * excess
+                        num_downside += 1
+            prev_log = cur_log
+
+        degenerate = num_valid < 3 or peak == trough
+
+        std_dev = np.sqrt(sum_sq_dev / (num_returns - 1)) if num_returns > 1 else np.nan
+        downside_deviation = np.sqrt(downside_sum_sq / num_downside) if num_downside > 0 else 0.0
+
+        return max_drawdown, max_runup, num_profit, num_valid, degenerate, mean_excess, std_dev, downside_deviation
+else:
+    def _equity_curve_stats(v: np.ndarray, initial_balance: float, rf_daily: float) -> EquityCurveStats:
+        """与 numba 版本相同，逐元素循环改为 NumPy 向量运算；退化序列不再计算收益率"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 最大回撤/最大涨幅：fmax/fmin 的累计值与 expanding().max()/min() 一样忽略 NaN
+            peak = np.fmax.accumulate(v)
+            trough = np.fmin.accumulate(v)
+            max_drawdown = np.fmax.reduce((peak - v) / peak * 100)
+            max_runup = np.fmax.reduce((v - trough) / trough * 100)
+
+            num_profit = int(np.count_nonzero(v > initial_balance))
+            num_valid = v.size - int(np.count_nonzero(np.isnan(v)))
+            degenerate = bool(num_valid < 3 or peak[-1] == trough[-1])
+            if degenerate:
+                return max_drawdown, max_runup, num_profit, num_valid, degenerate, np.nan, np.nan, 0.0
+
+            # 对数超额收益，去掉 NaN
+            excess_returns = np.diff(np.log(v)) - rf_daily
+            excess_returns = excess_returns[~np.isnan(excess_returns)]
+        mean_excess = excess_returns.mean() if excess_returns.size else np.nan
+        std_dev = excess_returns.std(ddof=1) if excess_returns.size > 1 else np.nan
+        downside_returns = excess_returns[excess_returns < 0]
+        downside_deviation = np.sqrt(np.mean(downside_returns * downside_returns)) if downside_returns.size else 0.0
+        return max_drawdown, max_runup, num_profit, num_valid, degenerate, mean_excess, std_dev, downside_deviation
@@ -1,8 +1,13 @@
+import array
+import asyncio
 import logging
+import time
+from functools import cached_property
 from typing import Optional, Tuple
 import pandas as pd
 import numpy as np
 
+from strategies._backtest_fast import _scan_bars
 from strategies.perpetual_plotter import PerpetualPlotter
 from strategies.perpetual_trading_performance_analyzer import PerpetualTradingPerformanceAnalyzer
 from strategies.trading_strategy_interface import TradingStrategyInterface
@@ -15,6 +20,9 @@ from core.order_handling.perpetual_order_manager import PerpetualOrderManager
 from core.order_handling.perpetual_balance_tracker import PerpetualBalanceTracker
 
 class PerpetualGridTradingStrategy(TradingStrategyInterface):
+    # 实盘/模拟交易账户价值记录数组的初始容量
+    METRICS_INITIAL_CAPACITY = 1024
+
     def __init__(
         self,
         config_manager: ConfigManager,
@@ -39,24 +47,67 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
         self.trading_pair = trading_pair
         self.plotter = plotter
         self.data = self._initialize_historical_data()
-        self.live_trading_metrics = []
+        # 实盘/模拟交易的账户价值记录，按列存放在预分配数组中（纳秒时间戳、账户价值、价格），写满时容量翻倍
+        self._m_ts = np.empty(self.METRICS_INITIAL_CAPACITY, dtype=np.int64)
+        self._m_val = np.empty(self.METRICS_INITIAL_CAPACITY, dtype=np.float64)
+        self._m_px = np.empty(self.METRICS_INITIAL_CAPACITY, dtype=np.float64)
+        self._m_n = 0
         self._running = True
+        # 网格订单是否已初始化，每次开始回测或实盘时重置
+        self._grid_ready = False
         # 订阅合约特有的事件
         self.event_bus.subscribe(Events.FUNDING_FEE_SETTLED, self._on_funding_fee_settled)
         self.event_bus.subscribe(Events.MARGIN_CALL, self._on_margin_call)
         self.event_bus.subscribe(Events.POSITION_UPDATED, self._on_position_updated)
-        self.funding_rates = []
+        # 资金费用记录按列存储，并维护累计值，生成报告时无需遍历整段记录
+        self._funding_times = array.array('q')  # 纳秒时间戳（time.time_ns），需要时再用 pd.to_datetime(..., unit='ns') 转换
+        self._funding_rates_arr = array.array('d')
+        self._funding_fees_arr = array.array('d')
+        self._funding_fee_total = 0.0
+        self._funding_rate_sum = 0.0
+        # 合约事件的后续处理可能需要等待交易所请求，事件回调只负责入队，由后台任务按到达顺序依次处理；
+        # 队列和后台任务在第一个事件到达时创建（此时一定处于事件循环中）
+        self._event_queue: Optional[asyncio.Queue] = None
+        self._event_consumer_task: Optional[asyncio.Task] = None
+        self._event_handlers = {
+            Events.FUNDING_FEE_SETTLED: self._adjust_strategy_by_funding_rate,
+            Events.MARGIN_CALL: self._handle_margin_call,
+            Events.POSITION_UPDATED: self._update_risk_parameters,
+        }
     
+    def _enqueue_event(self, event_type: str, data) -> None:
+        """将事件的后续处理放入队列，立即返回，不阻塞事件发布方"""
+        if self._event_queue is None:
+            self._event_queue = asyncio.Queue()
+            self._event_consumer_task = asyncio.create_task(self._event_consumer(self._event_queue))
+        self._event_queue.put_nowait((event_type, data))
+
+    async def _event_consumer(self, queue: asyncio.Queue) -> None:
+        """依次处理队列中的合约事件，单个事件处理失败只记录日志"""
+        while True:
+            event_type, data = await queue.get()
+            try:
+                await self._event_handlers[event_type](data)
+            except Exception as e:
+                self.logger.error("Error while handling %s event: %s", event_type, e, exc_info=True)
+            finally:
+                queue.task_done()
+
     async def _on_funding_fee_settled(self, fee_data: dict) -> None:
         """处理资金费用结算事件
 
         参数:
             fee_data: dict - 包含资金费率和结算金额的字典
         """
-        self.funding_rates.append((pd.Timestamp.now(), fee_data['rate'], fee_data['amount']))
-        self.logger.info(f"Funding fee settled: {fee_data}")
-        # 根据资金费率调整策略
-        await self._adjust_strategy_by_funding_rate(fee_data['rate'])
+        rate, amount = fee_data['rate'], fee_data['amount']
+        self._funding_times.append(time.time_ns())
+        self._funding_rates_arr.append(rate)
+        self._funding_fees_arr.append(amount)
+        self._funding_fee_total += amount
+        self._funding_rate_sum += rate
+        self.logger.info("Funding fee settled: %s", fee_data)
+        # 根据资金费率调整策略（后台处理）
+        self._enqueue_event(Events.FUNDING_FEE_SETTLED, rate)
     
     async def _on_margin_call(self, margin_data: dict) -> None:
         """处理保证金追加通知事件
@@ -64,9 +115,9 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
         参数:
             margin_data: dict - 包含保证金率和所需追加金额的字典
         """
-        self.logger.warning(f"Margin call received: {margin_data}")
-        # 尝试自动追加保证金
-        await self._handle_margin_call(margin_data)
+        self.logger.warning("Margin call received: %s", margin_data)
+        # 尝试自动追加保证金（后台处理）
+        self._enqueue_event(Events.MARGIN_CALL, margin_data)
     
     async def _on_position_updated(self, position_data: dict) -> None:
         """处理仓位更新事件
@@ -74,10 +125,27 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
         参数:
             position_data: dict - 包含仓位信息的字典
         """
-        self.logger.info(f"Position updated: {position_data}")
-        # 更新风险管理参数
-        await self._update_risk_parameters(position_data)
+        self.logger.info("Position updated: %s", position_data)
+        # 更新风险管理参数（后台处理）
+        self._enqueue_event(Events.POSITION_UPDATED, position_data)
     
+    # 以下风控阈值在运行期间不变，第一次使用时从配置读取并缓存，之后每次事件处理不再调用 ConfigManager
+    @cached_property
+    def _funding_rate_threshold(self) -> float:
+        return self.config_manager.get_funding_rate_threshold()
+
+    @cached_property
+    def _margin_warning_threshold(self) -> float:
+        return self.config_manager.get_margin_warning_threshold()
+
+    @cached_property
+    def _large_position_threshold(self) -> float:
+        return self.config_manager.get_large_position_threshold()
+
+    @cached_property
+    def _max_safe_leverage(self) -> float:
+        return self.config_manager.get_max_safe_leverage()
+
     async def _adjust_strategy_by_funding_rate(self, funding_rate: float) -> None:
         """根据资金费率调整策略
 
@@ -85,8 +153,7 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
             funding_rate: float - 当前资金费率
         """
         # 如果资金费率过高，考虑减少对应方向的仓位
-        threshold = self.config_manager.get_funding_rate_threshold()
-        if abs(funding_rate) > threshold:
+        if abs(funding_rate) > self._funding_rate_threshold:
             if funding_rate > 0:
                 # 减少多仓
                 await self._reduce_long_exposure()
@@ -110,7 +177,7 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
             if await self.balance_tracker.has_sufficient_balance(margin_to_add):
                 # 追加保证金
                 await self.balance_tracker.add_margin(margin_to_add)
-                self.logger.info(f"Added margin: {margin_to_add}")
+                self.logger.info("Added margin: %s", margin_to_add)
             else:
                 # 如果没有足够余额，可能需要减仓
                 self.logger.warning("Insufficient balance for margin call, reducing position")
@@ -122,52 +189,42 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
         参数:
             position_data: dict - 仓位信息
         """
-        # 更新止盈止损价格
-        await self._update_tp_sl_prices(position_data)
-        # 检查是否需要调整杠杆
-        await self._check_and_adjust_leverage(position_data)
+        # 更新止盈止损价格与检查杠杆互不依赖，并发执行；其中一项失败不影响另一项
+        results = await asyncio.gather(
+            self._update_tp_sl_prices(position_data),
+            self._check_and_adjust_leverage(position_data),
+            return_exceptions=True
+        )
+        for action, result in zip(("update TP/SL prices", "adjust leverage"), results):
+            if isinstance(result, Exception):
+                self.logger.error("Failed to %s for position %s: %s", action, position_data.get('id'), result, exc_info=result)
     
     async def _reduce_long_exposure(self) -> None:
         """减少多头敞口"""
-        # 获取当前多头仓位
+        # 获取当前多头仓位，每个仓位减少20%，通过一次批量请求提交
         long_positions = await self.balance_tracker.get_long_positions()
-        for position in long_positions:
-            # 计算需要减少的仓位大小
-            reduction_size = position['size'] * 0.2  # 减少20%的仓位
-            # 执行减仓操作
-            await self.order_manager.reduce_position(
-                position_id=position['id'],
-                size=reduction_size,
-                is_long=True
-            )
+        await self.order_manager.reduce_positions_batch([
+            {'position_id': position['id'], 'size': position['size'] * 0.2, 'is_long': True}
+            for position in long_positions
+        ])
     
     async def _reduce_short_exposure(self) -> None:
         """减少空头敞口"""
-        # 获取当前空头仓位
+        # 获取当前空头仓位，每个仓位减少20%，通过一次批量请求提交
         short_positions = await self.balance_tracker.get_short_positions()
-        for position in short_positions:
-            # 计算需要减少的仓位大小
-            reduction_size = position['size'] * 0.2  # 减少20%的仓位
-            # 执行减仓操作
-            await self.order_manager.reduce_position(
-                position_id=position['id'],
-                size=reduction_size,
-                is_long=False
-            )
+        await self.order_manager.reduce_positions_batch([
+            {'position_id': position['id'], 'size': position['size'] * 0.2, 'is_long': False}
+            for position in short_positions
+        ])
     
     async def _reduce_position_size(self) -> None:
         """减少整体仓位规模"""
-        # 获取所有仓位
+        # 获取所有仓位，每个仓位减少30%，通过一次批量请求提交
         positions = await self.balance_tracker.get_all_positions()
-        for position in positions:
-            # 计算需要减少的仓位大小
-            reduction_size = position['size'] * 0.3  # 减少30%的仓位
-            # 执行减仓操作
-            await self.order_manager.reduce_position(
-                position_id=position['id'],
-                size=reduction_size,
-                is_long=position['is_long']
-            )
+        await self.order_manager.reduce_positions_batch([
+            {'position_id': position['id'], 'size': position['size'] * 0.3, 'is_long': position['is_long']}
+            for position in positions
+        ])
     
     async def _update_tp_sl_prices(self, position_data: dict) -> None:
         """更新止盈止损价格
@@ -178,9 +235,13 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
         # 获取当前维持保证金率
         margin_ratio = position_data.get('margin_ratio', 0)
         # 如果保证金率接近预警线，调整止损价格
-        if margin_ratio < self.config_manager.get_margin_warning_threshold():
+        if margin_ratio < self._margin_warning_threshold:
             # 获取更保守的止损价格
-            new_sl_price = self._calculate_conservative_sl_price(position_data)
+            new_sl_price = self._calculate_conservative_sl_price(
+                position_data.get('entry_price', 0),
+                position_data.get('mark_price', 0),
+                position_data.get('is_long', True)
+            )
             # 更新止损订单
             await self.order_manager.update_stop_loss_order(
                 position_id=position_data['id'],
@@ -196,41 +257,33 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
         current_leverage = position_data.get('leverage', 1)
         position_size = position_data.get('size', 0)
         # 如果仓位较大且杠杆较高，考虑降低杠杆
-        if position_size > self.config_manager.get_large_position_threshold() and \
-           current_leverage > self.config_manager.get_max_safe_leverage():
+        if position_size > self._large_position_threshold and current_leverage > self._max_safe_leverage:
             new_leverage = current_leverage * 0.8  # 降低20%的杠杆
             await self.order_manager.adjust_leverage(
                 position_id=position_data['id'],
                 new_leverage=new_leverage
             )
     
-    def _calculate_conservative_sl_price(self, position_data: dict) -> float:
+    @staticmethod
+    def _calculate_conservative_sl_price(entry_price: float, current_price: float, is_long: bool) -> float:
         """计算更保守的止损价格
 
         参数:
-            position_data: dict - 仓位信息
+            entry_price: float - 开仓均价
+            current_price: float - 当前标记价格
+            is_long: bool - 是否为多仓
 
         返回:
             float: 新的止损价格
         """
-        entry_price = position_data.get('entry_price', 0)
-        current_price = position_data.get('mark_price', 0)
-        is_long = position_data.get('is_long', True)
-        
+        # 多仓为 1、空仓为 -1，盈亏和止损方向都由该符号决定
+        sign = 1.0 if is_long else -1.0
         # 计算当前盈亏
-        pnl_percent = ((current_price - entry_price) / entry_price) * (1 if is_long else -1)
-        
-        # 根据盈亏情况设置不同的止损比例
-        if pnl_percent > 0.05:  # 盈利超过5%
-            sl_percent = 0.03  # 设置3%的止损
-        else:
-            sl_percent = 0.05  # 设置5%的止损
-        
-        # 计算新的止损价格
-        if is_long:
-            return current_price * (1 - sl_percent)
-        else:
-            return current_price * (1 + sl_percent)
+        pnl_percent = (current_price - entry_price) * sign / entry_price
+        # 盈利超过5%时设置3%的止损，否则设置5%的止损
+        sl_percent = 0.03 if pnl_percent > 0.05 else 0.05
+        # 多仓止损价低于当前价，空仓止损价高于当前价
+        return current_price * (1.0 - sign * sl_percent)
     
     def _initialize_historical_data(self) -> Optional[pd.DataFrame]:
         """初始化历史市场数据（开高低收成交量）
@@ -245,7 +298,7 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
             end_date = self.config_manager.get_end_date()
             return self.exchange_service.fetch_ohlcv(self.trading_pair, timeframe, start_date, end_date)
         except Exception as e:
-            self.logger.error(f"Failed to initialize data for backtest trading mode: {e}")
+            self.logger.error("Failed to initialize data for backtest trading mode: %s", e)
             return None
 
     def initialize_strategy(self):
@@ -255,6 +308,10 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
     async def stop(self):
         """停止交易执行，关闭连接"""
         self._running = False
+        if self._event_consumer_task is not None:
+            self._event_consumer_task.cancel()
+            self._event_consumer_task = None
+            self._event_queue = None
         await self.exchange_service.close_connection()
         self.logger.info("Trading execution stopped.")
 
@@ -279,30 +336,25 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
 
     async def _run_live_or_paper_trading(self, reversion_price: float):
         """执行实盘或模拟交易"""
-        self.logger.info(f"Starting {'live' if self.trading_mode == TradingMode.LIVE else 'paper'}  trading")
+        self.logger.info("Starting %s  trading", 'live' if self.trading_mode == TradingMode.LIVE else 'paper')
         last_price: Optional[float] = None
-        grid_orders_initialized = False
+        self._grid_ready = False
 
         async def on_ticker_update(current_price):
-            nonlocal last_price, grid_orders_initialized
+            nonlocal last_price
             try:
                 if not self._running:
                     self.logger.info("Trading stopped; halting price updates.")
                     return
                 
-                account_value = self.balance_tracker.get_total_balance_value(current_price)
-                self.live_trading_metrics.append((pd.Timestamp.now(), account_value, current_price))
+                self._append_metric(self.balance_tracker.get_total_balance_value(current_price), current_price)
                 
-                grid_orders_initialized = await self._initialize_grid_orders_once(
-                    current_price, 
-                    reversion_price,
-                    grid_orders_initialized, 
-                    last_price
-                )
-
-                if not grid_orders_initialized:
-                    last_price = current_price
-                    return
+                # 网格初始化完成后直接跳过初始化检查，不再每个 tick 调用一次协程
+                if not self._grid_ready:
+                    self._grid_ready = await self._initialize_grid_orders_once(current_price, reversion_price, last_price)
+                    if not self._grid_ready:
+                        last_price = current_price
+                        return
 
                 if await self._handle_take_profit_stop_loss(current_price):
                     return
@@ -310,7 +362,7 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
                 last_price = current_price
 
             except Exception as e:
-                self.logger.error(f"Error during ticker update: {e}", exc_info=True)
+                self.logger.error("Error during ticker update: %s", e, exc_info=True)
         
         try:
             await self.exchange_service.listen_to_ticker_updates(
@@ -320,11 +372,24 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
             )
         
         except Exception as e:
-            self.logger.error(f"Error in live/paper trading loop: {e}", exc_info=True)
+            self.logger.error("Error in live/paper trading loop: %s", e, exc_info=True)
         
         finally:
             self.logger.info("Exiting live/paper trading loop.")
 
+    def _append_metric(self, account_value: float, price: float) -> None:
+        """记录一次实盘/模拟交易的账户价值和价格，数组写满时按两倍容量扩容"""
+        n = self._m_n
+        if n == self._m_ts.shape[0]:
+            capacity = 2 * n
+            self._m_ts = np.resize(self._m_ts, capacity)
+            self._m_val = np.resize(self._m_val, capacity)
+            self._m_px = np.resize(self._m_px, capacity)
+        self._m_ts[n] = time.time_ns()
+        self._m_val[n] = account_value
+        self._m_px[n] = price
+        self._m_n = n + 1
+
     async def _run_backtest(self, trigger_price: float) -> None:
         """执行回测模拟"""
         if self.data is None:
@@ -332,55 +397,77 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
             return
 
         self.logger.info("Starting backtest simulation")
-        self.data['account_value'] = np.nan
         close_prices = self.data['close'].values
         high_prices = self.data['high'].values
         low_prices = self.data['low'].values
         timestamps = self.data.index
-        self.data.loc[timestamps[0], 'account_value'] = self.balance_tracker.get_total_balance_value(price=close_prices[0])
-        grid_orders_initialized = False
+        # 账户价值先写入预分配的数组，循环结束后一次性赋给 account_value 列，避免每根K线一次 DataFrame.loc 写入；
+        # 因止盈止损提前结束时，未处理的K线保持为 NaN
+        n = close_prices.shape[0]
+        acct_buf = np.empty(n, dtype=np.float64)
+        acct_buf.fill(np.nan)
+        self._grid_ready = False
         last_price = None
 
-        for i, (current_price, high_price, low_price, timestamp) in enumerate(zip(close_prices, high_prices, low_prices, timestamps)):
-            grid_orders_initialized = await self._initialize_grid_orders_once(
-                current_price, 
-                trigger_price,
-                grid_orders_initialized,
-                last_price
-            )
+        # 触发前没有任何成交，余额不变，账户价值只随收盘价变化，由 _scan_bars 一次算出，Python 循环从触发K线开始
+        trigger_idx = _scan_bars(
+            close_prices.astype(np.float64, copy=False), float(trigger_price),
+            self.balance_tracker.get_adjusted_fiat_balance(), self.balance_tracker.get_adjusted_crypto_balance(), acct_buf
+        )
+        if trigger_idx > 0:
+            last_price = close_prices[trigger_idx - 1]
+
+        # 只有最高价与最低价之间包含至少一个网格价格的K线才可能有挂单成交，其余K线跳过 simulate_order_fills；
+        # 统计不高于最高价与低于最低价的网格数，两者不同即说明区间 [low, high] 内有网格
+        grid_prices = self.grid_manager.sorted_price_grids_np
+        has_crossing = np.zeros(n, dtype=np.bool_)
+        has_crossing[trigger_idx:] = (
+            np.searchsorted(grid_prices, high_prices[trigger_idx:], side='right')
+            != np.searchsorted(grid_prices, low_prices[trigger_idx:], side='left')
+        )
+
+        # 循环内每根K线都会调用的方法提前绑定为局部变量
+        get_total_balance_value = self.balance_tracker.get_total_balance_value
+        handle_take_profit_stop_loss = self._handle_take_profit_stop_loss
 
-            if not grid_orders_initialized:
-                self.data.loc[timestamps[i], 'account_value'] = self.balance_tracker.get_total_balance_value(price=current_price)
+        try:
+            # 按下标读取各价格数组，不再为每根K线打包元组；时间戳只在模拟成交时才取出（装箱为 Timestamp）
+            for i in range(trigger_idx, n):
+                current_price = close_prices[i]
+                if not self._grid_ready:
+                    self._grid_ready = await self._initialize_grid_orders_once(current_price, trigger_price, last_price)
+                    if not self._grid_ready:
+                        acct_buf[i] = get_total_balance_value(price=current_price)
+                        last_price = current_price
+                        continue
+
+                if has_crossing[i]:
+                    await self.order_manager.simulate_order_fills(high_prices[i], low_prices[i], timestamps[i])
+
+                if await handle_take_profit_stop_loss(current_price):
+                    break
+
+                acct_buf[i] = get_total_balance_value(current_price)
                 last_price = current_price
-                continue
-
-            await self.order_manager.simulate_order_fills(high_price, low_price, timestamp)
-
-            if await self._handle_take_profit_stop_loss(current_price):
-                break
-
-            self.data.loc[timestamp, 'account_value'] = self.balance_tracker.get_total_balance_value(current_price)
-            last_price = current_price
+        finally:
+            # 以 float64 Series（copy=False）写入，acct_buf 直接作为该列的数据，不再复制一次
+            self.data['account_value'] = pd.Series(acct_buf, index=self.data.index, dtype=np.float64, copy=False)
 
     async def _initialize_grid_orders_once(
         self, 
         current_price: float, 
         reversion_price: float,
-        grid_orders_initialized: bool,
         last_price: Optional[float] = None
     ) -> bool:
-        """初始化网格订单"""
-        if grid_orders_initialized:
-            return True
-        
+        """初始化网格订单，调用方只在 self._grid_ready 为 False 时调用"""
         if last_price is None:
             self.logger.debug("No previous price recorded yet. Waiting for the next price update.")
             return False
 
         if current_price < reversion_price:
-            self.logger.info(f"Current price {current_price} reached trigger price {reversion_price}. Will perform initial purhcase")
+            self.logger.info("Current price %s reached trigger price %s. Will perform initial purhcase", current_price, reversion_price)
             await self.order_manager.perform_initial_purchase(current_price)
-            self.logger.info(f"Initial purchase done, will initialize grid orders")
+            self.logger.info("Initial purchase done, will initialize grid orders")
             await self.order_manager.initialize_grid_orders(current_price)
             return True
         # if last_price <= trigger_price <= current_price or last_price == trigger_price:
@@ -420,12 +507,15 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
                 self.balance_tracker.total_fees
             )
         else:
-            if not self.live_trading_metrics:
+            n = self._m_n
+            if n == 0:
                 self.logger.warning("No account value data available for live/paper trading mode.")
                 return {}, []
             
-            live_data = pd.DataFrame(self.live_trading_metrics, columns=["timestamp", "account_value", "price"])
-            live_data.set_index("timestamp", inplace=True)
+            live_data = pd.DataFrame(
+                {"account_value": self._m_val[:n], "price": self._m_px[:n]},
+                index=pd.DatetimeIndex(pd.to_datetime(self._m_ts[:n], unit='ns'), name="timestamp")
+            )
             initial_price = live_data.iloc[0]["price"]
             final_price = live_data.iloc[-1]["price"]
 
@@ -441,8 +531,9 @@ class PerpetualGridTradingStrategy(TradingStrategyInterface):
         # 添加合约特有的性能指标
         if self.trading_mode == TradingMode.BACKTEST:
             # 计算资金费用统计
-            total_funding_fees = sum(fee for _, _, fee in self.funding_rates)
-            avg_funding_rate = np.mean([rate for _, rate, _ in self.funding_rates]) if self.funding_rates else 0
+            total_funding_fees = self._funding_fee_total
+            funding_count = len(self._funding_rates_arr)
+            avg_funding_rate = self._funding_rate_sum / funding_count if funding_count else 0
             
             # 获取杠杆使用情况
             max_leverage = self.balance_tracker.get_max_leverage_used()
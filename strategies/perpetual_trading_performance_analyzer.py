@@ -1,16 +1,42 @@
 import logging
-from typing import Any, Dict, List, Tuple, Union, Optional
-import pandas as pd
+import math
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union, Optional
 import numpy as np
-from tabulate import tabulate
 from config.config_manager import ConfigManager
 from core.grid_management.grid_level import GridLevel
-from core.order_handling.perpetual_order import PerpetualOrder
+from core.order_handling.perpetual_order import PerpetualOrder, PerpetualOrderSide
 from core.order_handling.perpetual_order_book import PerpetualOrderBook
+from strategies._performance_fast import _equity_curve_stats
+
+if TYPE_CHECKING:
+    # pandas 只用于类型注解，运行时由调用方传入 DataFrame
+    import pandas as pd
 
 ANNUAL_RISK_FREE_RATE = 0.03  # annual risk free rate 3%
 # 年化无风险利率 3%
 
+# 表现总结中各数值指标的展示格式（按输出顺序），None 表示原样输出；
+# {base}/{quote} 为基础货币和计价货币
+_SUMMARY_FORMATS = (
+    ("ROI", "{:.2f}%"),
+    ("Max Drawdown", "{:.2f}%"),
+    ("Max Runup", "{:.2f}%"),
+    ("Time in Profit %", "{:.2f}%"),
+    ("Time in Loss %", "{:.2f}%"),
+    ("Buy and Hold Return %", "{:.2f}%"),
+    ("Grid Trading Gains", "{}"),
+    ("Total Fees", "{:.2f}"),
+    ("Final Balance (Fiat)", "{:.2f}"),
+    ("Final Crypto Balance", "{:.4f} {base}"),
+    ("Final Crypto Value (Fiat)", "{:.2f} {quote}"),
+    ("Remaining Fiat Balance", "{:.2f} {quote}"),
+    ("Number of Buy Trades", None),
+    ("Number of Sell Trades", None),
+    ("Sharpe Ratio", "{:.2f}"),
+    ("Sortino Ratio", "{:.2f}"),
+)
+
 class PerpetualTradingPerformanceAnalyzer:
     def __init__(
         self, 
@@ -72,144 +98,146 @@ class PerpetualTradingPerformanceAnalyzer:
         roi = (final_balance - initial_balance) / initial_balance * 100
         return round(roi, 2)
     
-    def _calculate_trading_gains(self) -> str:
+    def _calculate_trading_gains(self, total_buy_cost: float, total_sell_revenue: float) -> str:
         """
         Calculates the total trading gains from completed buy and sell orders.
 
-        The computation uses only closed orders to determine the net profit or loss 
-        from executed trades.
+        The totals come from `_aggregate_orders`, which only counts closed orders
+        to determine the net profit or loss from executed trades.
+
+        Args:
+            total_buy_cost (float): Total cost of filled buy orders, fees included.
+            total_sell_revenue (float): Total revenue of filled sell orders, fees deducted.
 
         Returns:
             str: The total grid trading gains as a formatted string, or "N/A" if there are no sell orders.
         
         计算已完成买入和卖出订单的总交易收益。
 
-        计算仅使用已关闭的订单来确定已执行交易的净利润或损失。
+        总成本和总收入由 `_aggregate_orders` 统计，只包含已关闭的订单。
+
+        参数:
+            total_buy_cost (float): 已成交买单的总成本（包括交易费用）
+            total_sell_revenue (float): 已成交卖单的总收入（扣除交易费用）
 
         返回：
             str: 网格交易总收益的格式化字符串，如果没有卖出订单则返回"N/A"。
         """
-        total_buy_cost = 0.0  # 总买入成本
-        total_sell_revenue = 0.0  # 总卖出收入
-        # 获取所有已成交的买入订单
-        closed_buy_orders = [order for order in self.order_book.get_all_buy_orders() if order.is_filled()]
-        # 获取所有已成交的卖出订单
-        closed_sell_orders = [order for order in self.order_book.get_all_sell_orders() if order.is_filled()]
-
-        # 计算买入订单的总成本（包括交易费用）
-        for buy_order in closed_buy_orders:
-            trade_value = buy_order.amount * buy_order.price
-            buy_fee = buy_order.fee.get('cost', 0.0) if buy_order.fee else 0.0
-            total_buy_cost += trade_value + buy_fee
-
-        # 计算卖出订单的总收入（扣除交易费用）
-        for sell_order in closed_sell_orders:
-            trade_value = sell_order.amount * sell_order.price
-            sell_fee = sell_order.fee.get('cost', 0.0) if sell_order.fee else 0.0
-            total_sell_revenue += trade_value - sell_fee
-        
         # 如果没有卖出订单返回"N/A"，否则返回总收益
         return "N/A" if total_sell_revenue == 0 else f"{total_sell_revenue - total_buy_cost:.2f}"
 
-    def _calculate_drawdown(self, data: pd.DataFrame) -> float:
-        """计算最大回撤百分比
-
-        参数:
-            data: 包含账户价值数据的DataFrame
-
-        返回:
-            最大回撤百分比
+    def _aggregate_orders(self) -> Tuple[int, int, float, float, List[List[Union[str, float]]]]:
         """
-        peak = data['account_value'].expanding(min_periods=1).max()
-        drawdown = (peak - data['account_value']) / peak * 100
-        max_drawdown = drawdown.max()
-        return max_drawdown
+        Walk the filled buy and sell orders once, collecting trade counts, totals and formatted rows.
 
-    def _calculate_runup(self, data: pd.DataFrame) -> float:
-        """计算最大涨幅百分比
+        Returns:
+            Tuple[int, int, float, float, List[List[Union[str, float]]]]: Number of buy trades, number of sell trades,
+            total buy cost (fees included), total sell revenue (fees deducted) and the formatted orders sorted by timestamp.
 
-        参数:
-            data: 包含账户价值数据的DataFrame
+        对已成交的买入和卖出订单只遍历一次，统计交易次数并生成格式化订单列表；
+        总成本/总收入由订单簿缓存的已成交数组通过点积一次算出。
+        排序使用原始成交时间戳（无时间戳的排在最后），排序完成后再逐个格式化订单。
 
         返回:
-            最大涨幅百分比
+            Tuple[int, int, float, float, List[List[Union[str, float]]]]: 买入交易数量、卖出交易数量、
+            买入总成本（包括交易费用）、卖出总收入（扣除交易费用）以及按时间戳排序的格式化订单列表
         """
-        trough = data['account_value'].expanding(min_periods=1).min()
-        runup = (data['account_value'] - trough) / trough * 100
-        max_runup = runup.max()
-        return max_runup
-
-    def _calculate_time_in_profit_loss(
-        self, 
-        initial_balance: float, 
-        data: pd.DataFrame
-    ) -> Tuple[float, float]:
-        """计算盈利和亏损时间的百分比
+        filled = []  # (排序键, 订单, 网格层级)，排序键为原始成交时间戳，None 记为 inf 排在最后
 
-        参数:
-            initial_balance: 初始余额
-            data: 包含账户价值数据的DataFrame
+        # 已成交的买入订单
+        num_buy_trades = 0
+        for buy_order, grid_level in self.order_book.get_buy_orders_with_grid():
+            if buy_order.is_filled():
+                num_buy_trades += 1
+                timestamp = buy_order.last_trade_timestamp
+                filled.append((math.inf if timestamp is None else timestamp, buy_order, grid_level))
 
-        返回:
-            Tuple[float, float]: 盈利时间百分比和亏损时间百分比
-        """
-        time_in_profit = (data['account_value'] > initial_balance).mean() * 100
-        time_in_loss = (data['account_value'] <= initial_balance).mean() * 100
-        return time_in_profit, time_in_loss
-    
-    def _calculate_sharpe_ratio(self, data: pd.DataFrame) -> float:
+        # 已成交的卖出订单
+        num_sell_trades = 0
+        for sell_order, grid_level in self.order_book.get_sell_orders_with_grid():
+            if sell_order.is_filled():
+                num_sell_trades += 1
+                timestamp = sell_order.last_trade_timestamp
+                filled.append((math.inf if timestamp is None else timestamp, sell_order, grid_level))
+
+        # 按数值时间戳排序（稳定排序，时间戳相同时保持原有顺序），再格式化
+        filled.sort(key=itemgetter(0))
+        format_order = self._format_order
+        orders = [format_order(order, grid_level) for _, order, grid_level in filled]
+
+        # 买入总成本（包括交易费用）和卖出总收入（扣除交易费用）
+        # 买单/卖单分别对应 get_all_buy_orders/get_all_sell_orders 的订单列表
+        buy_amounts, buy_prices, buy_fees = self.order_book.filled_arrays(PerpetualOrderSide.BUY_OPEN)
+        sell_amounts, sell_prices, sell_fees = self.order_book.filled_arrays(PerpetualOrderSide.BUY_CLOSE)
+        total_buy_cost = float(np.dot(buy_amounts, buy_prices) + buy_fees.sum())
+        total_sell_revenue = float(np.dot(sell_amounts, sell_prices) - sell_fees.sum())
+        return num_buy_trades, num_sell_trades, total_buy_cost, total_sell_revenue, orders
+
+    def _compute_all_stats(self, account_values: np.ndarray, initial_balance: float) -> Dict[str, float]:
         """
-        Calculate the Sharpe ratio based on the account value.
-
-        Args:
-            data (pd.DataFrame): Historical account value data.
+        基于账户价值数组计算全部账户价值曲线指标：
+        最大回撤、最大涨幅、盈利/亏损时间占比、夏普比率和索提诺比率。
 
-        Returns:
-            float: The Sharpe ratio.
-        
-        基于账户价值计算夏普比率。
+        累计最高/最低值和各项统计都跳过 NaN（止盈止损提前结束回测时，之后的账户价值为 NaN）。
+        夏普和索提诺比率基于对数收益率，索提诺比率的下行风险使用下行半方差；
+        有效点数不足 3 个或账户价值恒定时两者直接记为 0。
 
         参数:
-            data (pd.DataFrame): 历史账户价值数据
+            account_values: 账户价值数组（float64，由 generate_performance_summary 从 DataFrame 中取出一次）
+            initial_balance: 初始余额
 
         返回:
-            float: 夏普比率
+            Dict[str, float]: 各项指标，键为 max_drawdown、max_runup、time_in_profit、time_in_loss、sharpe_ratio、sortino_ratio
         """
-        returns = data['account_value'].pct_change(fill_method=None)
-        excess_returns = returns - ANNUAL_RISK_FREE_RATE / 252 # Adjusted daily
-        std_dev = excess_returns.std()
-        if std_dev == 0:
-            return 0.0
-        sharpe_ratio = excess_returns.mean() / std_dev * np.sqrt(252)
-        return round(sharpe_ratio, 2)
-    
-    def _calculate_sortino_ratio(self, data: pd.DataFrame) -> float:
-        """
-        Calculate the Sortino ratio based on the account value.
-
-        Args:
-            data (pd.DataFrame): Historical account value data.
+        v = account_values
+
+        # 一次遍历得到回撤/涨幅、盈利点数、有效点数和超额收益统计量（安装 numba 时为编译内核）
+        (
+            max_drawdown, max_runup, num_profit, num_valid, degenerate,
+            mean_excess, std_dev, downside_deviation,
+        ) = _equity_curve_stats(v, float(initial_balance), ANNUAL_RISK_FREE_RATE / 252)  # Adjusted daily
+
+        # 盈利和亏损时间的百分比：两者互补，亏损点数 = 有效点数 - 盈利点数（NaN 两边都不计入）
+        num_points = v.size
+        time_in_profit = num_profit * 100.0 / num_points
+        time_in_loss = (num_valid - num_profit) * 100.0 / num_points
+
+        # 有效点数不足 3 个或账户价值恒定时收益率序列退化，两个比率都直接记为 0
+        if degenerate:
+            sharpe_ratio = sortino_ratio = 0.0
+        else:
+            sharpe_ratio, sortino_ratio = self._calculate_risk_adjusted_ratios(mean_excess, std_dev, downside_deviation)
+
+        return {
+            "max_drawdown": max_drawdown,
+            "max_runup": max_runup,
+            "time_in_profit": time_in_profit,
+            "time_in_loss": time_in_loss,
+            "sharpe_ratio": sharpe_ratio,
+            "sortino_ratio": sortino_ratio,
+        }
 
-        Returns:
-            float: The Sortino ratio.
-        
-        基于账户价值计算索提诺比率。
+    def _calculate_risk_adjusted_ratios(self, mean_excess: float, std_dev: float, downside_deviation: float) -> Tuple[float, float]:
+        """
+        根据对数超额收益的统计量计算夏普比率和索提诺比率。
 
         参数:
-            data (pd.DataFrame): 历史账户价值数据
+            mean_excess: 超额收益均值
+            std_dev: 超额收益标准差（ddof=1）
+            downside_deviation: 下行偏差（负超额收益的半方差开方，没有负收益时为 0）
 
         返回:
-            float: 索提诺比率
+            Tuple[float, float]: 夏普比率和索提诺比率（保留两位小数）
         """
-        returns = data['account_value'].pct_change(fill_method=None)
-        excess_returns = returns - ANNUAL_RISK_FREE_RATE / 252  # Adjusted daily
-        downside_returns = excess_returns[excess_returns < 0]
-        
-        if len(downside_returns) == 0 or downside_returns.std() == 0:
-            return round(excess_returns.mean() * np.sqrt(252), 2)  # Positive ratio if no downside
-        
-        sortino_ratio = excess_returns.mean() / downside_returns.std() * np.sqrt(252)
-        return round(sortino_ratio, 2)
+        # 夏普比率
+        sharpe_ratio = 0.0 if std_dev == 0 else round(mean_excess / std_dev * np.sqrt(252), 2)
+
+        # 索提诺比率，没有下行收益时只按均值计算（结果为正）
+        if downside_deviation == 0:
+            sortino_ratio = round(mean_excess * np.sqrt(252), 2)
+        else:
+            sortino_ratio = round(mean_excess / downside_deviation * np.sqrt(252), 2)
+        return sharpe_ratio, sortino_ratio
 
     def get_formatted_orders(self) -> List[List[Union[str, float]]]:
         """
@@ -223,65 +251,29 @@ class PerpetualTradingPerformanceAnalyzer:
         返回：
             List[List[Union[str, float]]]: 格式化的订单列表，包含订单方向、类型、状态、价格、数量、时间戳等详细信息。
         """
-        orders = []  # 存储格式化的订单列表
-        # 获取带网格级别的买入订单
-        buy_orders_with_grid = self.order_book.get_buy_orders_with_grid()
-        # 获取带网格级别的卖出订单
-        sell_orders_with_grid = self.order_book.get_sell_orders_with_grid()
-
-        # 处理已成交的买入订单
-        for buy_order, grid_level in buy_orders_with_grid:
-            if buy_order.is_filled():
-                orders.append(self._format_order(buy_order, grid_level))
-
-        # 处理已成交的卖出订单
-        for sell_order, grid_level in sell_orders_with_grid:
-            if sell_order.is_filled():
-                orders.append(self._format_order(sell_order, grid_level))
-        
-        # 按时间戳排序，将None值排在最后
-        orders.sort(key=lambda x: (x[5] is None, x[5]))  # x[5] is the timestamp, sort None to the end
-        return orders
+        return self._aggregate_orders()[4]
     
     def _format_order(self, order: PerpetualOrder, grid_level: Optional[GridLevel]) -> List[Union[str, float]]:
-        grid_level_price = grid_level.price if grid_level else "N/A"
-        if grid_level and order.average is not None:
-            # Assuming order.price is the execution price and grid level price the expected price
-            slippage = ((order.average - grid_level_price) / grid_level_price) * 100
-            slippage_str = f"{slippage:.2f}%"
-        else:
-            slippage = "N/A"
-            slippage_str = "N/A"
-        return [
-            order.side.name,
-            order.order_type.name,
-            order.status.name,
-            order.price, 
-            order.filled, 
-            order.format_last_trade_timestamp(), 
-            grid_level_price, 
-            slippage_str
-        ]
-    
-    def _calculate_trade_counts(self) -> Tuple[int, int]:
-        """
-        Count the number of filled buy and sell orders.
-
-        Returns:
-            Tuple[int, int]: Number of buy trades and number of sell trades.
-        
-        统计已成交的买入和卖出订单数量。
-
-        返回:
-            Tuple[int, int]: 买入交易数量和卖出交易数量。
-        """
-        num_buy_trades = len([order for order in self.order_book.get_all_buy_orders() if order.is_filled()])
-        num_sell_trades = len([order for order in self.order_book.get_all_sell_orders() if order.is_filled()])
-        return num_buy_trades, num_sell_trades
+        side = order.side.name
+        order_type = order.order_type.name
+        status = order.status.name
+        price = order.price
+        filled = order.filled
+        timestamp = order.format_last_trade_timestamp()
+        if grid_level is None:
+            return [side, order_type, status, price, filled, timestamp, "N/A", "N/A"]
+
+        grid_level_price = grid_level.price
+        average = order.average
+        if average is None:
+            return [side, order_type, status, price, filled, timestamp, grid_level_price, "N/A"]
+
+        # Assuming order.price is the execution price and grid level price the expected price
+        slippage = (average - grid_level_price) / grid_level_price * 100
+        return [side, order_type, status, price, filled, timestamp, grid_level_price, f"{slippage:.2f}%"]
     
     def _calculate_buy_and_hold_return(
         self, 
-        data: pd.DataFrame, 
         initial_price: float,
         final_price: float
     ) -> float:
@@ -289,7 +281,6 @@ class PerpetualTradingPerformanceAnalyzer:
         Calculate the buy-and-hold return percentage.
 
         Args:
-            data (pd.DataFrame): Historical price data.
             initial_price (float): The initial cryptocurrency price.
             final_price (float): The final cryptocurrency price.
 
@@ -299,7 +290,6 @@ class PerpetualTradingPerformanceAnalyzer:
         计算买入并持有策略的收益率百分比。
 
         参数:
-            data (pd.DataFrame): 历史价格数据
             initial_price (float): 初始加密货币价格
             final_price (float): 最终加密货币价格
 
@@ -310,7 +300,7 @@ class PerpetualTradingPerformanceAnalyzer:
 
     def generate_performance_summary(
         self, 
-        data: pd.DataFrame, 
+        data: 'pd.DataFrame', 
         initial_price: float,
         final_fiat_balance: float, 
         final_crypto_balance: float, 
@@ -346,7 +336,9 @@ class PerpetualTradingPerformanceAnalyzer:
         pair = f"{self.base_currency}/{self.quote_currency}"  # 交易对
         start_date = data.index[0]  # 开始日期
         end_date = data.index[-1]  # 结束日期
-        initial_balance = data["account_value"].iloc[0]  # 初始余额
+        # 账户价值只从 DataFrame 中取出一次，之后各项指标都直接使用该数组
+        account_values = np.ascontiguousarray(data["account_value"].to_numpy(dtype=np.float64))
+        initial_balance = account_values[0]  # 初始余额
         duration = end_date - start_date  # 交易持续时间
         
         # 计算最终资产价值
@@ -355,48 +347,56 @@ class PerpetualTradingPerformanceAnalyzer:
         
         # 计算各项表现指标
         roi = self._calculate_roi(initial_balance, final_balance)  # 投资回报率
-        grid_trading_gains = self._calculate_trading_gains()  # 网格交易收益
-        max_drawdown = self._calculate_drawdown(data)  # 最大回撤
-        max_runup = self._calculate_runup(data)  # 最大涨幅
-        time_in_profit, time_in_loss = self._calculate_time_in_profit_loss(initial_balance, data)  # 盈利和亏损时间占比
-        sharpe_ratio = self._calculate_sharpe_ratio(data)  # 夏普比率
-        sortino_ratio = self._calculate_sortino_ratio(data)  # 索提诺比率
-        buy_and_hold_return = self._calculate_buy_and_hold_return(data, initial_price, final_crypto_price)  # 买入持有收益率
-        num_buy_trades, num_sell_trades = self._calculate_trade_counts()  # 买入和卖出交易次数
+        # 已成交订单只遍历一次：交易次数、买入总成本/卖出总收入和格式化订单列表
+        num_buy_trades, num_sell_trades, total_buy_cost, total_sell_revenue, formatted_orders = self._aggregate_orders()
+        grid_trading_gains = self._calculate_trading_gains(total_buy_cost, total_sell_revenue)  # 网格交易收益
+        # 基于账户价值曲线的指标一次算出：最大回撤、最大涨幅、盈利和亏损时间占比、夏普比率、索提诺比率
+        stats = self._compute_all_stats(account_values, initial_balance)
+        buy_and_hold_return = self._calculate_buy_and_hold_return(initial_price, final_crypto_price)  # 买入持有收益率
         
+        # 各项数值指标，按 _SUMMARY_FORMATS 中的格式统一转换为展示用字符串
+        metrics = {
+            "ROI": roi,
+            "Max Drawdown": stats["max_drawdown"],
+            "Max Runup": stats["max_runup"],
+            "Time in Profit %": stats["time_in_profit"],
+            "Time in Loss %": stats["time_in_loss"],
+            "Buy and Hold Return %": buy_and_hold_return,
+            "Grid Trading Gains": grid_trading_gains,
+            "Total Fees": total_fees,
+            "Final Balance (Fiat)": final_balance,
+            "Final Crypto Balance": final_crypto_balance,
+            "Final Crypto Value (Fiat)": final_crypto_value,
+            "Remaining Fiat Balance": final_fiat_balance,
+            "Number of Buy Trades": num_buy_trades,
+            "Number of Sell Trades": num_sell_trades,
+            "Sharpe Ratio": stats["sharpe_ratio"],
+            "Sortino Ratio": stats["sortino_ratio"],
+        }
+
         # 构建表现总结字典
         performance_summary = {
             "Pair": pair,
             "Start Date": start_date,
             "End Date": end_date,
             "Duration": duration,
-            "ROI": f"{roi:.2f}%",
-            "Max Drawdown": f"{max_drawdown:.2f}%",
-            "Max Runup": f"{max_runup:.2f}%",
-            "Time in Profit %": f"{time_in_profit:.2f}%",
-            "Time in Loss %": f"{time_in_loss:.2f}%",
-            "Buy and Hold Return %": f"{buy_and_hold_return:.2f}%",
-            "Grid Trading Gains": f"{grid_trading_gains}",
-            "Total Fees": f"{total_fees:.2f}",
-            "Final Balance (Fiat)": f"{final_balance:.2f}",
-            "Final Crypto Balance": f"{final_crypto_balance:.4f} {self.base_currency}",
-            "Final Crypto Value (Fiat)": f"{final_crypto_value:.2f} {self.quote_currency}",
-            "Remaining Fiat Balance": f"{final_fiat_balance:.2f} {self.quote_currency}",
-            "Number of Buy Trades": num_buy_trades,
-            "Number of Sell Trades": num_sell_trades,
-            "Sharpe Ratio": f"{sharpe_ratio:.2f}",
-            "Sortino Ratio": f"{sortino_ratio:.2f}"
         }
-
-        # 获取格式化的订单列表
-        formatted_orders = self.get_formatted_orders()
-
-        # 生成订单表格并记录日志
-        orders_table = tabulate(formatted_orders, headers=["Order Side", "Type", "Status", "Price", "Quantity", "Timestamp", "Grid Level", "Slippage"], tablefmt="pipe")
-        self.logger.info("\nFormatted Orders:\n" + orders_table)
-
-        # 生成总结表格并记录日志
-        summary_table = tabulate(performance_summary.items(), headers=["Metric", "Value"], tablefmt="grid")
-        self.logger.info("\nPerformance Summary:\n" + summary_table)
+        base_currency, quote_currency = self.base_currency, self.quote_currency
+        for metric, spec in _SUMMARY_FORMATS:
+            value = metrics[metric]
+            performance_summary[metric] = value if spec is None else spec.format(value, base=base_currency, quote=quote_currency)
+
+        # 生成表格并记录日志，INFO 级别未启用时跳过表格渲染
+        if self.logger.isEnabledFor(logging.INFO):
+            # tabulate 只在输出表格时用到，延迟到这里导入
+            from tabulate import tabulate
+
+            # 订单表格
+            orders_table = tabulate(formatted_orders, headers=["Order Side", "Type", "Status", "Price", "Quantity", "Timestamp", "Grid Level", "Slippage"], tablefmt="pipe")
+            self.logger.info("\nFormatted Orders:\n" + orders_table)
+
+            # 总结表格
+            summary_table = tabulate(performance_summary.items(), headers=["Metric", "Value"], tablefmt="grid")
+            self.logger.info("\nPerformance Summary:\n" + summary_table)
 
         return performance_summary, formatted_orders
\ No newline at end of file
@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from core.bot_management.event_bus import EventBus
+
+class TestEventBus:
+    @pytest.mark.asyncio
+    async def test_slow_async_subscriber_does_not_block_queue(self):
+        event_bus = EventBus()
+        release = asyncio.Event()
+        received = []
+
+        async def slow_callback(data):
+            await release.wait()
+
+        async def fast_callback(data):
+            received.append(data)
+
+        event_bus.subscribe("slow", slow_callback)
+        event_bus.subscribe("fast", fast_callback)
+        event_bus.publish_nowait("slow", 1)
+        event_bus.publish_nowait("fast", 2)
+        await asyncio.wait_for(event_bus._queue.join(), timeout=1)
+        await asyncio.sleep(0)
+
+        assert received == [2]
+        release.set()
+        await event_bus.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_history_records_event_types_from_all_publish_methods(self):
+        event_bus = EventBus()
+        event_bus.subscribe("event", lambda data: None)
+
+        await event_bus.publish("event", 1)
+        event_bus.publish_sync("event", 2)
+        event_bus.publish_nowait("event", 3)
+
+        assert [event_type for _, event_type in event_bus.history] == ["event"] * 3
+        assert all(len(entry) == 2 for entry in event_bus.history)
+        await event_bus.shutdown()
@@ -0,0 +1,106 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+import pytest
+from config.trading_mode import TradingMode
+from core.order_handling.perpetual_balance_tracker import PerpetualBalanceTracker
+from core.order_handling.perpetual_order import PerpetualOrderSide
+
+SYMBOL = "BTC/USDT:USDT"
+
+class TestPerpetualBalanceTracker:
+    @pytest.fixture
+    def balance_tracker(self):
+        return PerpetualBalanceTracker(event_bus=Mock(), fee_calculator=Mock(), trading_mode=TradingMode.LIVE, base_currency="BTC", quote_currency="USDT")
+
+    @staticmethod
+    async def _consume(watch, exchange_service):
+        task = asyncio.create_task(watch(exchange_service))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    @pytest.mark.asyncio
+    async def test_position_push_updates_only_pushed_side(self, balance_tracker):
+        exchange_service = Mock()
+        pushes = [
+            [{"symbol": SYMBOL, "side": "long", "contracts": 2.0, "entryPrice": 50000.0, "unrealizedPnl": 10.0}],
+            [{"symbol": SYMBOL, "side": "short", "contracts": 1.0, "entryPrice": 51000.0, "unrealizedPnl": -4.0}],
+        ]
+
+        async def watch_positions(pairs):
+            if pushes:
+                return pushes.pop(0)
+            await asyncio.sleep(3600)
+        exchange_service.watch_positions = watch_positions
+
+        await self._consume(balance_tracker._watch_position_updates, exchange_service)
+
+        assert (balance_tracker.long_position, balance_tracker.long_avg_price) == (2.0, 50000.0)
+        assert (balance_tracker.short_position, balance_tracker.short_avg_price) == (1.0, 51000.0)
+        assert balance_tracker.unrealized_pnl == pytest.approx(6.0)
+
+    @pytest.mark.asyncio
+    async def test_balance_push_without_quote_currency_keeps_balance(self, balance_tracker):
+        exchange_service = Mock()
+        balance_tracker.margin_balance = 100.0
+        pushes = [{"free": {"BTC": 0.5}}, {"free": {"USDT": 80.0}}, {"free": {"ETH": 1.0}}]
+
+        async def watch_balance():
+            if pushes:
+                return pushes.pop(0)
+            await asyncio.sleep(3600)
+        exchange_service.watch_balance = watch_balance
+
+        await self._consume(balance_tracker._watch_balance_updates, exchange_service)
+
+        assert balance_tracker.margin_balance == 80.0
+
+    def test_total_balance_value_includes_long_and_short_pnl(self, balance_tracker):
+        balance_tracker.margin_balance = 1000.0
+        balance_tracker.reserved_margin = 200.0
+        balance_tracker.long_position, balance_tracker.long_avg_price = 2.0, 100.0
+        balance_tracker.short_position, balance_tracker.short_avg_price = 3.0, 120.0
+
+        # 多头盈利 2 * (110 - 100)，空头盈利 3 * (120 - 110)
+        assert balance_tracker.get_total_balance_value(110.0) == pytest.approx(1050.0)
+        assert balance_tracker.get_adjusted_crypto_balance() == pytest.approx(-1.0)
+        for price in (90.0, 110.0, 130.0):
+            linear_value = balance_tracker.get_adjusted_fiat_balance() + balance_tracker.get_adjusted_crypto_balance() * price
+            assert linear_value == pytest.approx(balance_tracker.get_total_balance_value(price))
+
+    @pytest.mark.asyncio
+    async def test_fill_is_not_booked_locally_while_account_stream_runs(self, balance_tracker):
+        exchange_service = Mock()
+        async def wait_forever(*args):
+            await asyncio.sleep(3600)
+        exchange_service.watch_balance = wait_forever
+        exchange_service.watch_positions = wait_forever
+        balance_tracker.fee_calculator.calculate_fee.return_value = 0.5
+        balance_tracker.margin_balance = 1000.0
+        balance_tracker.long_position, balance_tracker.long_avg_price = 2.0, 50000.0
+        order = Mock(side=PerpetualOrderSide.BUY_OPEN, filled=2.0, price=50000.0)
+
+        balance_tracker.start_account_stream(exchange_service)
+        await balance_tracker._update_balance_on_order_completion(order)
+        await balance_tracker.stop_account_stream()
+
+        assert (balance_tracker.long_position, balance_tracker.margin_balance) == (2.0, 1000.0)
+        assert balance_tracker.total_fees == 0.5
+
+    @pytest.mark.asyncio
+    async def test_live_account_value_adds_back_locked_margin(self, balance_tracker):
+        exchange_service = Mock()
+        pushes = [{"free": {"USDT": 700.0}, "total": {"USDT": 1000.0}}]
+
+        async def watch_balance():
+            if pushes:
+                return pushes.pop(0)
+            await asyncio.sleep(3600)
+        exchange_service.watch_balance = watch_balance
+
+        await self._consume(balance_tracker._watch_balance_updates, exchange_service)
+        balance_tracker.long_position, balance_tracker.long_avg_price = 1.0, 100.0
+
+        assert balance_tracker.margin_balance == 700.0
+        assert balance_tracker.get_total_balance_value(110.0) == pytest.approx(1010.0)
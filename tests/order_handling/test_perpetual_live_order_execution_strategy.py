@@ -0,0 +1,148 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+import pytest
+from core.order_handling.execution_strategy.order_execution_strategy_interface import BatchOrderRequest
+from core.order_handling.execution_strategy.perpetual_live_order_execution_strategy import PerpetualLiveOrderExecutionStrategy
+from core.order_handling.exceptions import OrderExecutionFailedError
+from core.order_handling.perpetual_order import PerpetualOrder, PerpetualOrderSide, PerpetualOrderStatus, PerpetualOrderType
+
+class TestPerpetualLiveOrderExecutionStrategy:
+    @pytest.fixture
+    def setup_strategy(self):
+        exchange_service = Mock()
+        exchange_service.supports_batch_orders.return_value = True
+        exchange_service.place_orders = AsyncMock()
+        exchange_service.set_leverage = AsyncMock()
+        exchange_service.set_margin_type = AsyncMock()
+        strategy = PerpetualLiveOrderExecutionStrategy(exchange_service=exchange_service)
+        return strategy, exchange_service
+
+    @pytest.mark.asyncio
+    async def test_batch_limit_orders_with_id_only_response(self, setup_strategy):
+        strategy, exchange_service = setup_strategy
+        pair = "BTC/USDT:USDT"
+        requests = [
+            BatchOrderRequest(PerpetualOrderSide.BUY_OPEN, pair, 0.01, 49000.0),
+            BatchOrderRequest(PerpetualOrderSide.SELL_OPEN, pair, 0.02, 51000.0),
+        ]
+        # OKX 批量下单只返回 ordId/sCode/sMsg，ccxt 解析后的订单没有 side/type/status
+        exchange_service.place_orders.return_value = [
+            {"id": "1001", "info": {"ordId": "1001", "sCode": "0", "sMsg": ""}},
+            {"id": "1002", "info": {"ordId": "1002", "sCode": "0", "sMsg": ""}},
+        ]
+
+        results = await strategy.execute_batch_limit_orders(requests)
+
+        assert all(isinstance(result, PerpetualOrder) for result in results)
+        assert [result.identifier for result in results] == ["1001", "1002"]
+        assert [result.side for result in results] == [PerpetualOrderSide.BUY_OPEN, PerpetualOrderSide.SELL_OPEN]
+        assert [result.price for result in results] == [49000.0, 51000.0]
+        assert [result.remaining for result in results] == [0.01, 0.02]
+        assert all(result.symbol == pair for result in results)
+        assert all(result.status == PerpetualOrderStatus.OPEN for result in results)
+        assert all(result.order_type == PerpetualOrderType.LIMIT for result in results)
+
+    @pytest.mark.asyncio
+    async def test_batch_limit_orders_response_fields_override_request(self, setup_strategy):
+        strategy, exchange_service = setup_strategy
+        pair = "BTC/USDT:USDT"
+        requests = [BatchOrderRequest(PerpetualOrderSide.BUY_OPEN, pair, 0.01, 49000.0)]
+        exchange_service.place_orders.return_value = [
+            {"id": "1001", "status": "closed", "price": 48990.0, "filled": 0.01, "side": None, "info": {}},
+        ]
+
+        results = await strategy.execute_batch_limit_orders(requests)
+
+        assert results[0].status == PerpetualOrderStatus.CLOSED
+        assert results[0].price == 48990.0
+        assert results[0].filled == 0.01
+        assert results[0].side == PerpetualOrderSide.BUY_OPEN
+
+    @pytest.mark.asyncio
+    async def test_batch_limit_orders_rejected_entry(self, setup_strategy):
+        strategy, exchange_service = setup_strategy
+        pair = "BTC/USDT:USDT"
+        requests = [
+            BatchOrderRequest(PerpetualOrderSide.BUY_OPEN, pair, 0.01, 49000.0),
+            BatchOrderRequest(PerpetualOrderSide.BUY_OPEN, pair, 0.01, 48000.0),
+        ]
+        exchange_service.place_orders.return_value = [
+            {"id": "1001", "info": {"ordId": "1001", "sCode": "0", "sMsg": ""}},
+            {"id": None, "info": {"ordId": "", "sCode": "51008", "sMsg": "Insufficient margin"}},
+        ]
+
+        results = await strategy.execute_batch_limit_orders(requests)
+
+        assert isinstance(results[0], PerpetualOrder)
+        assert isinstance(results[1], OrderExecutionFailedError)
+        assert "Insufficient margin" in str(results[1])
+
+    @pytest.mark.asyncio
+    async def test_market_order_retry_uses_mark_price(self, setup_strategy):
+        strategy, exchange_service = setup_strategy
+        strategy.retry_delay = 0
+        pair = "BTC/USDT:USDT"
+        exchange_service.place_order = AsyncMock(side_effect=[Exception("timeout"), {"id": "1", "side": "buy", "type": "market", "info": {}}])
+        exchange_service.fetch_order = AsyncMock(return_value={"status": "closed", "average": 50100.0})
+        exchange_service.get_mark_price = AsyncMock(return_value=50100.0)
+
+        await strategy.execute_market_order(PerpetualOrderSide.BUY_OPEN, pair, 0.01, 50000.0)
+
+        exchange_service.get_mark_price.assert_awaited_once_with(pair)
+        retry_price = exchange_service.place_order.await_args_list[1].args[4]
+        assert retry_price == pytest.approx(50100.0 * (1 + strategy.max_slippage / strategy.max_retries))
+
+    @pytest.mark.asyncio
+    async def test_leverage_and_margin_set_once_per_pair(self, setup_strategy):
+        _, exchange_service = setup_strategy
+        pair = "BTC/USDT:USDT"
+        strategy = PerpetualLiveOrderExecutionStrategy(exchange_service=exchange_service, leverage=10, margin_mode="crossed")
+
+        await asyncio.gather(*(strategy._setup_leverage_and_margin(pair) for _ in range(3)))
+
+        exchange_service.set_leverage.assert_awaited_once_with(pair, 10)
+        exchange_service.set_margin_type.assert_awaited_once_with(pair, "cross", 10)
+
+    @pytest.mark.asyncio
+    async def test_orders_do_not_configure_leverage(self, setup_strategy):
+        strategy, exchange_service = setup_strategy
+        exchange_service.place_order = AsyncMock(return_value={"id": "1", "side": "buy", "type": "limit", "info": {}})
+
+        await strategy.execute_limit_order(PerpetualOrderSide.BUY_OPEN, "BTC/USDT:USDT", 0.01, 49000.0)
+
+        exchange_service.set_leverage.assert_not_awaited()
+        exchange_service.set_margin_type.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_leverage_setup_is_per_instance(self, setup_strategy):
+        _, exchange_service = setup_strategy
+        pair = "BTC/USDT:USDT"
+
+        for _ in range(2):
+            strategy = PerpetualLiveOrderExecutionStrategy(exchange_service=exchange_service)
+            await strategy._setup_leverage_and_margin(pair)
+
+        assert exchange_service.set_margin_type.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_mark_price_caller_does_not_cancel_other_waiters(self, setup_strategy):
+        strategy, exchange_service = setup_strategy
+        pair = "BTC/USDT:USDT"
+        release = asyncio.Event()
+
+        async def get_mark_price(symbol):
+            await release.wait()
+            return 50100.0
+        exchange_service.get_mark_price = get_mark_price
+
+        first = asyncio.create_task(strategy._fetch_mark_price(pair))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(strategy._fetch_mark_price(pair))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == 50100.0
+        assert first.cancelled()
+        assert strategy._mark_price_inflight == {}
@@ -0,0 +1,23 @@
+from core.order_handling.perpetual_order import MarginType, PerpetualOrder, PerpetualOrderSide, PerpetualOrderStatus, PerpetualOrderType, PositionSide
+from core.order_handling.perpetual_order_book import PerpetualOrderBook
+
+def make_order(identifier: str, status: PerpetualOrderStatus) -> PerpetualOrder:
+    return PerpetualOrder(
+        identifier=identifier, status=status, order_type=PerpetualOrderType.LIMIT, side=PerpetualOrderSide.BUY_OPEN,
+        price=50000.0, average=None, contracts=1.0, contract_size=1.0, filled=0.0, amount=1.0, remaining=1.0,
+        timestamp=0, datetime=None, last_trade_timestamp=None, symbol="BTC/USDT:USDT", time_in_force=None,
+        leverage=1.0, margin_type=MarginType.CROSS, position_side=PositionSide.LONG,
+    )
+
+class TestPerpetualOrderBook:
+    def test_open_and_completed_orders_keep_insertion_order(self):
+        order_book = PerpetualOrderBook()
+        orders = [make_order(str(index), PerpetualOrderStatus.OPEN) for index in range(20)]
+        order_book.add_orders([(order, None) for order in orders])
+
+        order_book.update_order_status("7", PerpetualOrderStatus.CLOSED)
+        order_book.update_order_status("3", PerpetualOrderStatus.CLOSED)
+        order_book.remove_order("11")
+
+        assert [order.identifier for order in order_book.get_open_orders()] == [str(index) for index in range(20) if index not in (3, 7, 11)]
+        assert [order.identifier for order in order_book.get_completed_orders()] == ["7", "3"]
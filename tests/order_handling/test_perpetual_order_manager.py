@@ -0,0 +1,106 @@
+from unittest.mock import AsyncMock, Mock
+import pytest
+from config.trading_mode import TradingMode
+from core.order_handling.exceptions import OrderExecutionFailedError
+from core.order_handling.perpetual_order import PerpetualOrderSide, PerpetualOrderType
+from core.order_handling.perpetual_order_manager import PerpetualOrderManager
+from core.validation.perpetual_order_validator import PerpetualOrderValidator
+from strategies.strategy_type import StrategyType
+
+class TestPerpetualOrderManager:
+    @pytest.fixture
+    def setup_order_manager(self):
+        grid_manager = Mock()
+        grid_manager.max_placed_orders = 2
+        order_execution_strategy = Mock()
+        order_execution_strategy.execute_batch_limit_orders = AsyncMock()
+        order_execution_strategy.execute_market_order = AsyncMock()
+        balance_tracker = Mock()
+        exchange_service = Mock()
+        exchange_service.get_current_price = AsyncMock(return_value=50000.0)
+        notification_handler = Mock()
+        notification_handler.async_send_notification = AsyncMock()
+        order_book = Mock()
+        order_manager = PerpetualOrderManager(
+            grid_manager=grid_manager,
+            order_validator=PerpetualOrderValidator(),
+            balance_tracker=balance_tracker,
+            order_book=order_book,
+            event_bus=Mock(),
+            order_execution_strategy=order_execution_strategy,
+            notification_handler=notification_handler,
+            trading_mode=TradingMode.LIVE,
+            trading_pair="BTC/USDT:USDT",
+            strategy_type=StrategyType.SIMPLE_GRID,
+            exchange_service=exchange_service,
+        )
+        return order_manager, grid_manager, order_execution_strategy, notification_handler, order_book
+
+    @staticmethod
+    def _eligible_levels(buy_levels, sell_levels):
+        def eligible_levels(order_side, below=None, above=None, limit=None):
+            levels = buy_levels if order_side == PerpetualOrderSide.BUY_OPEN else sell_levels
+            return levels[:limit] if limit is not None else list(levels)
+        return eligible_levels
+
+    @pytest.mark.asyncio
+    async def test_initialize_grid_orders_backfills_failed_levels(self, setup_order_manager):
+        order_manager, grid_manager, order_execution_strategy, notification_handler, order_book = setup_order_manager
+        buy_levels = [(price, Mock(name=f"buy_{price}")) for price in (49000.0, 48000.0, 47000.0)]
+        grid_manager.eligible_levels.side_effect = self._eligible_levels(buy_levels, [])
+        failure = OrderExecutionFailedError("rejected", PerpetualOrderSide.BUY_OPEN, PerpetualOrderType.LIMIT, "BTC/USDT:USDT", 1.0, 48000.0)
+        first_order, backfill_order = Mock(), Mock()
+        order_execution_strategy.execute_batch_limit_orders.side_effect = [[first_order, failure], [backfill_order]]
+
+        await order_manager.initialize_grid_orders(50000.0)
+
+        second_batch = order_execution_strategy.execute_batch_limit_orders.await_args_list[1].args[0]
+        assert [request.price for request in second_batch] == [47000.0]
+        order_book.add_orders.assert_called_once_with([(first_order, buy_levels[0][1]), (backfill_order, buy_levels[2][1])])
+        notification_handler.async_send_notification.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_initialize_grid_orders_stops_when_no_levels_left(self, setup_order_manager):
+        order_manager, grid_manager, order_execution_strategy, notification_handler, order_book = setup_order_manager
+        sell_levels = [(51000.0, Mock())]
+        grid_manager.eligible_levels.side_effect = self._eligible_levels([], sell_levels)
+        order_execution_strategy.execute_batch_limit_orders.return_value = [None]
+
+        await order_manager.initialize_grid_orders(50000.0)
+
+        order_execution_strategy.execute_batch_limit_orders.assert_awaited_once()
+        order_book.add_orders.assert_called_once_with([])
+        grid_manager.mark_order_pending.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reduce_positions_batch_places_closing_orders(self, setup_order_manager):
+        order_manager, _, order_execution_strategy, _, _ = setup_order_manager
+        order_manager.balance_tracker.long_position = 1.0
+        order_manager.balance_tracker.short_position = 0.5
+
+        await order_manager.reduce_positions_batch([
+            {'position_id': 'long-1', 'size': 0.2, 'is_long': True},
+            {'position_id': 'short-1', 'size': 0.1, 'is_long': False},
+        ])
+
+        calls = order_execution_strategy.execute_market_order.await_args_list
+        assert [call.args for call in calls] == [
+            (PerpetualOrderSide.SELL_OPEN, "BTC/USDT:USDT", 0.2, 50000.0),
+            (PerpetualOrderSide.BUY_OPEN, "BTC/USDT:USDT", 0.1, 50000.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reduce_positions_batch_caps_size_and_skips_failures(self, setup_order_manager):
+        order_manager, _, order_execution_strategy, _, _ = setup_order_manager
+        order_manager.balance_tracker.long_position = 0.3
+        order_manager.balance_tracker.short_position = 0.0
+
+        await order_manager.reduce_positions_batch([
+            {'position_id': 'long-1', 'size': 0.5, 'is_long': True},
+            {'position_id': 'short-1', 'size': 0.1, 'is_long': False},
+        ])
+
+        order_execution_strategy.execute_market_order.assert_awaited_once()
+        side, pair, quantity, price = order_execution_strategy.execute_market_order.await_args.args
+        assert side == PerpetualOrderSide.SELL_OPEN
+        assert quantity == pytest.approx(0.3, abs=1e-5)
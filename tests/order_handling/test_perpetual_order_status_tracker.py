@@ -0,0 +1,124 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+import pytest
+from core.bot_management.event_bus import Events
+from core.order_handling.perpetual_order import MarginType, PerpetualOrder, PerpetualOrderSide, PerpetualOrderStatus, PerpetualOrderType, PositionSide
+from core.order_handling.perpetual_order_book import PerpetualOrderBook
+from core.order_handling.perpetual_order_status_tracker import PerpetualOrderStatusTracker
+from core.services.exceptions import UnsupportedExchangeError
+
+def make_order(identifier: str, status: PerpetualOrderStatus, filled: float = 0.0) -> PerpetualOrder:
+    return PerpetualOrder(
+        identifier=identifier, status=status, order_type=PerpetualOrderType.LIMIT, side=PerpetualOrderSide.BUY_OPEN,
+        price=50000.0, average=None, contracts=1.0, contract_size=1.0, filled=filled, amount=1.0, remaining=1.0 - filled,
+        timestamp=0, datetime=None, last_trade_timestamp=None, symbol="BTC/USDT:USDT", time_in_force=None,
+        leverage=1.0, margin_type=MarginType.CROSS, position_side=PositionSide.LONG,
+    )
+
+class TestPerpetualOrderStatusTracker:
+    @pytest.fixture
+    def setup_tracker(self):
+        order_book = PerpetualOrderBook()
+        order_execution_strategy = Mock()
+        order_execution_strategy.get_open_orders = AsyncMock(return_value=[])
+        order_execution_strategy.get_order = AsyncMock()
+        event_bus = Mock()
+        tracker = PerpetualOrderStatusTracker(order_book, order_execution_strategy, event_bus, "BTC", "USDT")
+        return tracker, order_book, order_execution_strategy, event_bus
+
+    def test_streamed_orders_ignore_unknown_and_closed_orders(self, setup_tracker):
+        tracker, order_book, _, event_bus = setup_tracker
+        order_book.add_order(make_order("closed", PerpetualOrderStatus.CLOSED))
+
+        tracker._handle_streamed_orders([make_order("unknown", PerpetualOrderStatus.CLOSED), make_order("closed", PerpetualOrderStatus.CLOSED)])
+
+        event_bus.publish_nowait.assert_not_called()
+
+    def test_streamed_orders_deduplicate_repeated_pushes(self, setup_tracker):
+        tracker, order_book, _, event_bus = setup_tracker
+        order_book.add_order(make_order("1", PerpetualOrderStatus.OPEN))
+        filled = make_order("1", PerpetualOrderStatus.CLOSED, filled=1.0)
+
+        tracker._handle_streamed_orders([filled, filled])
+        tracker._handle_streamed_orders([filled])
+
+        event_bus.publish_nowait.assert_called_once_with(Events.ORDER_FILLED, filled)
+        assert order_book.orders_by_id["1"].status == PerpetualOrderStatus.CLOSED
+
+    def test_streamed_orders_skip_unchanged_status(self, setup_tracker):
+        tracker, order_book, _, _ = setup_tracker
+        order_book.add_order(make_order("1", PerpetualOrderStatus.OPEN))
+        tracker._handle_order_status_change = Mock()
+
+        tracker._handle_streamed_orders([make_order("1", PerpetualOrderStatus.OPEN)])
+        tracker._handle_streamed_orders([make_order("1", PerpetualOrderStatus.OPEN, filled=0.5)])
+
+        assert tracker._handle_order_status_change.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_keeps_reconciling_open_orders(self, setup_tracker):
+        tracker, order_book, order_execution_strategy, _ = setup_tracker
+        tracker.RECONCILE_INTERVAL = 0.01
+        order_book.add_order(make_order("1", PerpetualOrderStatus.OPEN))
+        async def watch_orders(symbol):
+            await asyncio.sleep(3600)
+        order_execution_strategy.watch_orders = watch_orders
+        order_execution_strategy.get_open_orders.return_value = [make_order("1", PerpetualOrderStatus.OPEN)]
+
+        task = asyncio.create_task(tracker._watch_order_updates())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await task
+
+        # 订阅前轮询一次，之后由后台对账继续轮询
+        assert order_execution_strategy.get_open_orders.await_count > 1
+
+    @pytest.mark.asyncio
+    async def test_unsupported_stream_falls_back_to_polling(self, setup_tracker):
+        tracker, _, order_execution_strategy, _ = setup_tracker
+        order_execution_strategy.watch_orders = AsyncMock(side_effect=UnsupportedExchangeError("no stream"))
+        tracker._track_open_order_statuses = AsyncMock()
+
+        await tracker._watch_order_updates()
+
+        tracker._track_open_order_statuses.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fill_pushed_during_poll_is_published_once(self, setup_tracker):
+        tracker, order_book, order_execution_strategy, event_bus = setup_tracker
+        order_book.add_order(make_order("1", PerpetualOrderStatus.OPEN))
+        filled = make_order("1", PerpetualOrderStatus.CLOSED, filled=1.0)
+        query_started = asyncio.Event()
+        release_query = asyncio.Event()
+
+        async def get_order(order_id, symbol):
+            query_started.set()
+            await release_query.wait()
+            return filled
+        order_execution_strategy.get_order = get_order
+
+        poll = asyncio.create_task(tracker._process_open_orders())
+        await query_started.wait()
+        tracker._handle_streamed_orders([filled])
+        release_query.set()
+        await poll
+
+        event_bus.publish_nowait.assert_called_once_with(Events.ORDER_FILLED, filled)
+
+    @pytest.mark.asyncio
+    async def test_funding_rate_errors_back_off(self, setup_tracker, monkeypatch):
+        tracker, _, order_execution_strategy, _ = setup_tracker
+        tracker.jitter = 0.0
+        order_execution_strategy.get_funding_rate = AsyncMock(side_effect=RuntimeError("exchange down"))
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            if len(sleeps) == 5:
+                raise asyncio.CancelledError
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+        await tracker._check_funding_rate()
+
+        interval = tracker.funding_check_interval
+        assert sleeps == [interval * 2, interval * 4, interval * 8, interval * 8, interval * 8]
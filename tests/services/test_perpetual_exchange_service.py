@@ -0,0 +1,130 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+import pytest
+from ccxt.base.errors import NetworkError, OrderNotFound
+from core.services.exceptions import DataFetchError
+from core.services.perpetual_exchange_service import PerpetualExchangeService
+
+SYMBOL = "BTC/USDT:USDT"
+
+class TestPerpetualExchangeService:
+    @pytest.fixture
+    def config_manager(self):
+        config_manager = Mock()
+        config_manager.get_exchange_name.return_value = "okx"
+        config_manager.get_base_currency.return_value = "BTC"
+        config_manager.get_quote_currency.return_value = "USDT"
+        config_manager.use_ws_trade_api.return_value = False
+        config_manager.get_ws_trade_timeout.return_value = 5.0
+        return config_manager
+
+    @pytest.fixture
+    def service(self, config_manager, monkeypatch):
+        monkeypatch.setenv("EXCHANGE_API_KEY", "key")
+        monkeypatch.setenv("EXCHANGE_SECRET_KEY", "secret")
+        monkeypatch.setenv("PASSWORD", "password")
+        service = PerpetualExchangeService(config_manager, is_paper_trading_activated=False)
+        service.exchange = Mock()
+        service.exchange.fetch_positions = AsyncMock(return_value=[{"symbol": SYMBOL, "contracts": 1.0}])
+        return service
+
+    @staticmethod
+    async def _run_refresh_loop(service, duration: float):
+        task = asyncio.create_task(service._refresh_positions_loop([SYMBOL]))
+        await asyncio.sleep(duration)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    @pytest.mark.asyncio
+    async def test_positions_snapshot_follows_stream(self, service):
+        service.exchange.has = {"watchPositions": True}
+        pushes = [[{"symbol": SYMBOL, "contracts": 2.0}]]
+
+        async def watch_positions(pairs):
+            if pushes:
+                return pushes.pop(0)
+            await asyncio.sleep(3600)
+        service.exchange.watch_positions = watch_positions
+
+        await self._run_refresh_loop(service, 0.05)
+
+        service.exchange.fetch_positions.assert_awaited_once()
+        assert (await service.get_position(SYMBOL))["contracts"] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_order_does_not_drop_streamed_snapshot(self, service):
+        service.exchange.has = {"watchPositions": True}
+        async def watch_positions(pairs):
+            await asyncio.sleep(3600)
+        service.exchange.watch_positions = watch_positions
+
+        task = asyncio.create_task(service._refresh_positions_loop([SYMBOL]))
+        await asyncio.sleep(0.01)
+        service.invalidate_position_cache(SYMBOL)
+        assert (await service.get_position(SYMBOL))["contracts"] == 1.0
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    @pytest.mark.asyncio
+    async def test_positions_polled_without_stream(self, service):
+        service.exchange.has = {}
+        service.POSITION_REFRESH_INTERVAL = 0.01
+
+        await self._run_refresh_loop(service, 0.05)
+
+        assert service.exchange.fetch_positions.await_count > 1
+
+    def test_each_service_owns_its_exchange(self, config_manager, monkeypatch):
+        monkeypatch.setenv("EXCHANGE_API_KEY", "key")
+        monkeypatch.setenv("EXCHANGE_SECRET_KEY", "secret")
+        monkeypatch.setenv("PASSWORD", "password")
+
+        first = PerpetualExchangeService(config_manager, is_paper_trading_activated=False)
+        second = PerpetualExchangeService(config_manager, is_paper_trading_activated=False)
+
+        assert first.exchange is not second.exchange
+
+    @pytest.fixture
+    def ws_service(self, service):
+        service.use_ws_trade_api = True
+        service.ws_trade_timeout = 0.01
+        service.exchange.has = {"createOrderWs": True}
+        service.exchange.amount_to_precision.return_value = "0.01"
+        service.exchange.create_order = AsyncMock(return_value={"id": "rest"})
+
+        async def create_order_ws(*args):
+            await asyncio.sleep(3600)
+        service.exchange.create_order_ws = create_order_ws
+        return service
+
+    @pytest.mark.asyncio
+    async def test_ws_order_timeout_returns_order_found_by_client_id(self, ws_service):
+        ws_service.exchange.fetch_order = AsyncMock(return_value={"id": "ws"})
+
+        order = await ws_service.place_order(SYMBOL, "limit", "buy", 0.01, 50000.0)
+
+        assert order == {"id": "ws"}
+        client_order_id = ws_service.exchange.fetch_order.await_args.args[0]
+        assert ws_service.exchange.fetch_order.await_args.args[2] == {"clientOrderId": client_order_id}
+        ws_service.exchange.create_order.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ws_order_timeout_falls_back_to_rest_when_not_placed(self, ws_service):
+        ws_service.exchange.fetch_order = AsyncMock(side_effect=OrderNotFound("not found"))
+
+        order = await ws_service.place_order(SYMBOL, "limit", "buy", 0.01, 50000.0)
+
+        assert order == {"id": "rest"}
+        client_order_id = ws_service.exchange.fetch_order.await_args.args[0]
+        assert ws_service.exchange.create_order.await_args.args[5] == {"clientOrderId": client_order_id}
+
+    @pytest.mark.asyncio
+    async def test_ws_order_timeout_with_unknown_status_is_not_retried(self, ws_service):
+        ws_service.exchange.fetch_order = AsyncMock(side_effect=NetworkError("unreachable"))
+
+        with pytest.raises(DataFetchError):
+            await ws_service.place_order(SYMBOL, "limit", "buy", 0.01, 50000.0)
+
+        ws_service.exchange.create_order.assert_not_called()
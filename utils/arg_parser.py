@@ -15,9 +15,21 @@ def validate_args(args):
     """
     # Validate --config
     # 验证 --config 参数
+    # Config files usually share a directory: list each directory once instead of stat-ing every path
+    # 配置文件通常位于同一目录：每个目录只列一次目录项，代替逐个 os.path.exists
     if args.config:
+        dir_entries = {}
+        for config_dir in {os.path.dirname(config_path) or '.' for config_path in args.config}:
+            try:
+                with os.scandir(config_dir) as entries:
+                    dir_entries[config_dir] = {entry.name for entry in entries}
+            except OSError:
+                dir_entries[config_dir] = set()
+
         for config_path in args.config:
-            if not os.path.exists(config_path):
+            # Fall back to os.path.exists for names not in the listing (e.g. trailing separator, case-insensitive file systems)
+            # 目录项中找不到时（如路径以分隔符结尾、大小写不敏感的文件系统）再用 os.path.exists 确认
+            if os.path.basename(config_path) not in dir_entries[os.path.dirname(config_path) or '.'] and not os.path.exists(config_path):
                 raise ValueError(f"Config file does not exist: {config_path}")
     
     # Validate --save_performance_results directory
@@ -27,6 +39,55 @@ def validate_args(args):
         if save_performance_dir and not os.path.exists(save_performance_dir):
             raise ValueError(f"The directory for saving performance results does not exist: {save_performance_dir}")
 
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the console argument parser.
+    构建控制台参数解析器。
+
+    Returns:
+        argparse.ArgumentParser: Parser with all supported arguments.
+        argparse.ArgumentParser: 包含所有支持参数的解析器。
+    """
+    parser = argparse.ArgumentParser(
+        description="📈 Spot Grid Trading Bot - Automate your grid trading strategy with confidence\n\n"
+            "This bot lets you automate your trading by implementing a grid strategy. "
+            "Set your parameters, watch it execute, and manage your trades more effectively. "
+            "Ideal for both beginners and experienced traders!",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    required_args = parser.add_argument_group("Required Arguments")
+    required_args.add_argument(
+        '--config', 
+        type=str, 
+        nargs='+', 
+        required=True, 
+        metavar='CONFIG', 
+        help='Path(s) to the configuration file(s) containing strategy details.'  # 包含策略详情的配置文件路径
+    )
+
+    optional_args = parser.add_argument_group("Optional Arguments")
+    optional_args.add_argument(
+        '--save_performance_results', 
+        type=str, 
+        metavar='FILE', 
+        help='Path to save simulation results (e.g., results.json).'  # 保存模拟结果的路径（例如：results.json）
+    )
+    optional_args.add_argument(
+        '--no-plot', 
+        action='store_true', 
+        help='Disable the display of plots at the end of the simulation.'  # 禁用模拟结束时的图表显示
+    )
+    optional_args.add_argument(
+        '--profile', 
+        action='store_true', 
+        help='Enable profiling for performance analysis.'  # 启用性能分析的性能剖析
+    )
+    return parser
+
+# 解析器在模块加载时构建一次，之后每次解析都复用同一个实例
+_PARSER = _build_parser()
+
 def parse_and_validate_console_args(cli_args=None):
     """
     Parses and validates console arguments.
@@ -43,43 +104,7 @@ def parse_and_validate_console_args(cli_args=None):
         RuntimeError: 如果参数解析或验证失败。
     """
     try:
-        parser = argparse.ArgumentParser(
-            description="📈 Spot Grid Trading Bot - Automate your grid trading strategy with confidence\n\n"
-                "This bot lets you automate your trading by implementing a grid strategy. "
-                "Set your parameters, watch it execute, and manage your trades more effectively. "
-                "Ideal for both beginners and experienced traders!",
-            formatter_class=argparse.ArgumentDefaultsHelpFormatter
-        )
-
-        required_args = parser.add_argument_group("Required Arguments")
-        required_args.add_argument(
-            '--config', 
-            type=str, 
-            nargs='+', 
-            required=True, 
-            metavar='CONFIG', 
-            help='Path(s) to the configuration file(s) containing strategy details.'  # 包含策略详情的配置文件路径
-        )
-
-        optional_args = parser.add_argument_group("Optional Arguments")
-        optional_args.add_argument(
-            '--save_performance_results', 
-            type=str, 
-            metavar='FILE', 
-            help='Path to save simulation results (e.g., results.json).'  # 保存模拟结果的路径（例如：results.json）
-        )
-        optional_args.add_argument(
-            '--no-plot', 
-            action='store_true', 
-            help='Disable the display of plots at the end of the simulation.'  # 禁用模拟结束时的图表显示
-        )
-        optional_args.add_argument(
-            '--profile', 
-            action='store_true', 
-            help='Enable profiling for performance analysis.'  # 启用性能分析的性能剖析
-        )
-
-        args = parser.parse_args(cli_args)
+        args = _PARSER.parse_args(cli_args)
         validate_args(args)
         return args
 
@@ -0,0 +1,31 @@
+"""
+可选的 Numba JIT 支持。
+
+安装了 numba 时导出其 njit；未安装时导出一个不做任何事的同名装饰器，
+被装饰的函数按普通 Python 函数执行，调用方无需区分两种情况。
+"""
+
+import os
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba 为可选依赖（pip install .[jit]）
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # 同时支持 @njit 与 @njit(cache=True, ...) 两种写法
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# 默认关闭 fastmath：校验内核的比较和取整依赖 IEEE 语义，重排浮点运算可能让边界值落到另一侧；
+# 设置环境变量 PERP_NUMBA_FASTMATH=1 可开启
+FASTMATH = os.getenv("PERP_NUMBA_FASTMATH", "0") == "1"
+
+# 校验内核使用的编译选项：
+# - fastmath: 是否允许 LLVM 重排浮点运算（默认否，见 FASTMATH）
+# - boundscheck=False: 不做数组越界检查
+# - error_model='numpy': 除零返回 inf/nan 而不抛异常，调用方已保证 price、leverage 大于 0
+KERNEL_OPTIONS = dict(cache=True, fastmath=FASTMATH, boundscheck=False, error_model='numpy')